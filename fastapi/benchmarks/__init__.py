@@ -0,0 +1,4 @@
+"""Benchmarks for the {{project_name}} API.
+
+Run a benchmark module with ``python -m benchmarks.<name> --help``.
+"""
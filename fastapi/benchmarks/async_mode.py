@@ -0,0 +1,78 @@
+"""Compare the sync (threadpool) and async database modes under high concurrency.
+
+Usage::
+
+    python -m benchmarks.async_mode --concurrency 512 --duration 15
+
+Each mode runs in its own uvicorn process against the same database, which
+is seeded with ``--items`` rows first. The workload is a mix of item lookups
+by ID and small list pages.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+from decimal import Decimal
+
+import httpx
+
+from .loadgen import LoadResult, import_project, print_table, run_load, run_server
+
+
+def seed_items(count: int) -> int:
+    """Ensure at least ``count`` items exist and return the highest item ID."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import func, select
+
+    database.init_db()
+    with database.SessionLocal() as session:
+        existing = session.execute(select(func.count(models.Item.id))).scalar_one()
+        session.add_all(
+            models.Item(title=f"Item {n}", price=Decimal("9.99"))
+            for n in range(existing, count)
+        )
+        session.commit()
+        return int(session.execute(select(func.max(models.Item.id))).scalar_one())
+
+
+async def mixed_reads(client: httpx.AsyncClient, max_id: int) -> httpx.Response:
+    if random.random() < 0.8:
+        return await client.get(f"/api/v1/items/{random.randint(1, max_id)}")
+    return await client.get("/api/v1/items/", params={"limit": 20})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--concurrency", type=int, default=512)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    max_id = seed_items(args.items)
+
+    results: list[LoadResult] = []
+    for mode in ("sync", "async"):
+        env = {"DATABASE_ASYNC": "true" if mode == "async" else "false"}
+        with run_server(env=env) as base_url:
+            results.append(
+                asyncio.run(
+                    run_load(
+                        f"{mode} c={args.concurrency}",
+                        base_url,
+                        lambda client: mixed_reads(client, max_id),
+                        concurrency=args.concurrency,
+                        duration=args.duration,
+                    )
+                )
+            )
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
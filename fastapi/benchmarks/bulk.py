@@ -0,0 +1,132 @@
+"""Compare the single-row item endpoints with the bulk endpoints.
+
+Usage::
+
+    python -m benchmarks.bulk --rows 10000 --batch 1000
+
+Creates, updates and deletes ``--rows`` items once through the single-row
+endpoints and once through ``/api/v1/items/bulk`` in batches of ``--batch``
+rows, in-process against ``DATABASE_URL``. Then creates ``--rows`` items one
+request at a time with ``Prefer: respond-async`` (write-behind), timed until
+the last queued row is written.
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+from .loadgen import import_project
+
+
+def timed(label: str, rows: int, action: Callable[[], None], report: Dict) -> None:
+    began = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - began
+    report[label] = (elapsed, rows / elapsed)
+
+
+def single_row(client: TestClient, rows: int, report: Dict) -> None:
+    ids: List[int] = []
+
+    def create() -> None:
+        for n in range(rows):
+            response = client.post(
+                "/api/v1/items/", json={"title": f"Item {n}", "price": "1.00"}
+            )
+            ids.append(response.json()["id"])
+
+    def update() -> None:
+        for item_id in ids:
+            client.put(
+                f"/api/v1/items/{item_id}", json={"price": "2.00"}
+            ).raise_for_status()
+
+    def delete() -> None:
+        for item_id in ids:
+            client.delete(f"/api/v1/items/{item_id}").raise_for_status()
+
+    timed("single-row create", rows, create, report)
+    timed("single-row update", rows, update, report)
+    timed("single-row delete", rows, delete, report)
+
+
+def bulk(client: TestClient, rows: int, batch: int, report: Dict) -> None:
+    ids: List[int] = []
+
+    def create() -> None:
+        for start in range(0, rows, batch):
+            payload = [
+                {"title": f"Item {n}", "price": "1.00"}
+                for n in range(start, min(start + batch, rows))
+            ]
+            response = client.post("/api/v1/items/bulk", json=payload)
+            ids.extend(item["id"] for item in response.json()["items"])
+
+    def update() -> None:
+        for start in range(0, rows, batch):
+            payload = [
+                {"id": item_id, "price": "2.00"}
+                for item_id in ids[start : start + batch]
+            ]
+            client.patch("/api/v1/items/bulk", json=payload).raise_for_status()
+
+    def delete() -> None:
+        for start in range(0, rows, batch):
+            payload = {"ids": ids[start : start + batch]}
+            client.request(
+                "DELETE", "/api/v1/items/bulk", json=payload
+            ).raise_for_status()
+
+    timed(f"bulk create (batch={batch})", rows, create, report)
+    timed(f"bulk update (batch={batch})", rows, update, report)
+    timed(f"bulk delete (batch={batch})", rows, delete, report)
+
+
+def write_behind(client: TestClient, rows: int, report: Dict) -> None:
+    writer = import_project("core.writebehind").item_writer
+
+    def create() -> None:
+        for n in range(rows):
+            response = client.post(
+                "/api/v1/items/",
+                json={"title": f"Item {n}", "price": "1.00", "client_id": f"wb-{n}"},
+                headers={"Prefer": "respond-async"},
+            )
+            assert response.status_code == 202, response.text
+        writer.flush()
+
+    timed("write-behind create", rows, create, report)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # The schema is created without Alembic below
+    os.environ["DATABASE_CHECK_SCHEMA"] = "false"
+    os.environ["WRITE_BEHIND_ENABLED"] = "true"
+    import_project("core.database").init_db()
+    client = TestClient(import_project("main").create_app())
+
+    report: Dict = {}
+    single_row(client, args.rows, report)
+    bulk(client, args.rows, args.batch, report)
+    # The lifespan starts the write-behind queue
+    with client:
+        write_behind(client, args.rows, report)
+
+    print(f"{'scenario':<32}{'seconds':>10}{'rows/s':>12}")
+    for label, (elapsed, rate) in report.items():
+        print(f"{label:<32}{elapsed:>10.2f}{rate:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Weigh the CPU cost of response compression against the bandwidth saved.
+
+Usage::
+
+    python -m benchmarks.compression --limit 100 --repeat 200
+
+Real response bodies are captured uncompressed through the ASGI app: a page
+of ``GET /api/v1/items/`` and of ``GET /api/v1/users/`` at ``--limit``, and
+an NDJSON export chunk of ``export_batch_size`` rows. Each body is then
+compressed at every gzip level and brotli quality with the encoders
+``CompressionMiddleware`` uses, reporting per level:
+
+* the median CPU time to compress one response;
+* the compressed size and ratio;
+* the bytes saved per millisecond of CPU;
+* the time to deliver the response (CPU plus transfer) on links of
+  ``--links`` Mbit/s, against sending it uncompressed.
+
+The level to pick is the cheapest one whose delivery time is close to the
+best on the slowest link clients are expected to have, since CPU spent on
+compression is taken from request handling on the worker.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.testclient import TestClient
+
+from .loadgen import import_project
+from .pagination import seed_items
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def seed_users(total: int) -> None:
+    """Insert users directly, skipping password hashing."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import func, insert, select
+
+    with database.engine.begin() as conn:
+        existing = conn.execute(select(func.count(models.User.id))).scalar_one()
+        start = datetime(2024, 1, 1)
+        conn.execute(
+            insert(models.User),
+            [
+                {
+                    "username": f"user{n}",
+                    "email": f"user{n}@example.com",
+                    "full_name": f"User Number {n}",
+                    "hashed_password": "x",
+                    "is_active": True,
+                    "created_at": start + timedelta(seconds=n),
+                }
+                for n in range(existing, total)
+            ],
+        )
+
+
+def capture_bodies(limit: int) -> Dict[str, bytes]:
+    """Uncompressed bodies of the responses worth compressing."""
+    settings = import_project("core.config").settings
+    client = TestClient(import_project("main").create_app())
+
+    def get(path: str, **params: int) -> bytes:
+        response = client.get(path, params=params, headers=IDENTITY)
+        response.raise_for_status()
+        return response.content
+
+    export = get("/api/v1/items/export").splitlines(keepends=True)
+    return {
+        f"items page ({limit})": get("/api/v1/items/", limit=limit),
+        f"users page ({limit})": get("/api/v1/users/", limit=limit),
+        f"export chunk ({settings.export_batch_size})": b"".join(
+            export[: settings.export_batch_size]
+        ),
+    }
+
+
+def encoders() -> Dict[str, Callable[[], object]]:
+    """Every gzip level and brotli quality, by name."""
+    compression = import_project("core.compression")
+    levels: Dict[str, Callable[[], object]] = {
+        f"gzip {level}": lambda level=level: compression.GzipEncoder(level)
+        for level in range(1, 10)
+    }
+    if compression.brotli_available():
+        levels.update(
+            {
+                f"br {quality}": lambda quality=quality: compression.BrotliEncoder(
+                    quality
+                )
+                for quality in range(12)
+            }
+        )
+    else:
+        print("brotli is not installed; install the brotli extra to include it\n")
+    return levels
+
+
+def time_level(factory: Callable[[], object], body: bytes, repeat: int) -> tuple:
+    """Median compression time in milliseconds and the compressed size."""
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        began = time.perf_counter()
+        size = len(factory().finish(body))  # type: ignore[attr-defined]
+        samples.append(time.perf_counter() - began)
+    return statistics.median(samples) * 1000, size
+
+
+def transfer_ms(size: int, mbits: float) -> float:
+    return size * 8 / (mbits * 1000)
+
+
+def run(bodies: Dict[str, bytes], links: List[float], repeat: int) -> None:
+    levels = encoders()
+    for name, body in bodies.items():
+        print(f"{name}: {len(body):,} bytes uncompressed")
+        header = (
+            f"{'level':<10}{'cpu ms':>9}{'bytes':>10}{'ratio':>8}{'KB/cpu ms':>11}"
+            + "".join(f"{f'@{mbits:g}Mb ms':>12}" for mbits in links)
+        )
+        print(header)
+        print("-" * len(header))
+        print(
+            f"{'none':<10}{0:>9.3f}{len(body):>10,}{1:>8.2f}{'-':>11}"
+            + "".join(f"{transfer_ms(len(body), mbits):>12.2f}" for mbits in links)
+        )
+        for level, factory in levels.items():
+            cpu, size = time_level(factory, body, repeat)
+            saved = (len(body) - size) / 1024 / cpu if cpu else float("inf")
+            print(
+                f"{level:<10}{cpu:>9.3f}{size:>10,}{len(body) / size:>8.2f}"
+                f"{saved:>11.1f}"
+                + "".join(f"{cpu + transfer_ms(size, mbits):>12.2f}" for mbits in links)
+            )
+        print()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument(
+        "--links",
+        type=float,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="link speeds in Mbit/s",
+    )
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ["COMPRESSION_ENABLED"] = "false"
+
+    settings = import_project("core.config").settings
+    seed_items(max(args.limit, settings.export_batch_size))
+    seed_users(args.limit)
+    run(capture_bodies(args.limit), args.links, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
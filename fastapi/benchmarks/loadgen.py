@@ -0,0 +1,232 @@
+"""Load generation helpers shared by the benchmarks."""
+
+import asyncio
+import contextlib
+import importlib
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import (
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+import httpx
+
+PACKAGE = "{{project_name}}"
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+RequestFactory = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+@dataclass
+class LoadResult:
+    """Outcome of a single load run."""
+
+    name: str
+    duration: float
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index] * 1000
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rps": round(self.rps, 1),
+            "mean_ms": round(statistics.fmean(self.latencies) * 1000, 2)
+            if self.latencies
+            else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+        }
+
+
+def import_project(module: str) -> ModuleType:
+    """Import a module of the application package (e.g. ``core.database``)."""
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    return importlib.import_module(f"{PACKAGE}.{module}")
+
+
+def free_port() -> int:
+    """Pick a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@contextlib.contextmanager
+def serve(
+    command: List[str],
+    port: int,
+    env: Optional[Dict[str, str]] = None,
+    startup_timeout: float = 30.0,
+) -> Iterator[str]:
+    """Run a server ``command`` listening on ``port``; yield its base URL."""
+    process = subprocess.Popen(
+        command,
+        cwd=PROJECT_ROOT,
+        env={**os.environ, **(env or {})},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                httpx.get(f"{base_url}/health/", timeout=1.0)
+                break
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Server did not start in time") from None
+                time.sleep(0.2)
+
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def run_server(
+    env: Optional[Dict[str, str]] = None,
+    args: Optional[List[str]] = None,
+    startup_timeout: float = 30.0,
+) -> ContextManager[str]:
+    """Run the application under uvicorn in a subprocess and yield its base URL.
+
+    The lifespan is disabled; benchmarks create and seed the schema themselves.
+    """
+    port = free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        f"{PACKAGE}.main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--lifespan",
+        "off",
+        "--log-level",
+        "warning",
+        "--no-access-log",
+        "--backlog",
+        "4096",
+        *(args or []),
+    ]
+    return serve(command, port, env, startup_timeout)
+
+
+def run_production_server(
+    workers: int,
+    env: Optional[Dict[str, str]] = None,
+    startup_timeout: float = 30.0,
+) -> ContextManager[str]:
+    """Run the production server with ``workers`` and yield its base URL.
+
+    The schema check is disabled, as benchmarks create the schema without
+    Alembic.
+    """
+    port = free_port()
+    server_env = {
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "DATABASE_CHECK_SCHEMA": "false",
+        **(env or {}),
+    }
+    command = [sys.executable, "-m", f"{PACKAGE}.server"]
+    return serve(command, port, server_env, startup_timeout)
+
+
+async def run_load(
+    name: str,
+    base_url: str,
+    request: RequestFactory,
+    concurrency: int,
+    duration: float,
+    warmup: float = 2.0,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> LoadResult:
+    """Drive ``request`` from ``concurrency`` workers for ``duration`` seconds.
+
+    Pass an ``httpx.ASGITransport`` as ``transport`` to drive an app
+    in-process instead of over a socket.
+    """
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0, transport=transport
+    ) as client:
+        result = LoadResult(name=name, duration=duration)
+        start = time.perf_counter()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def worker() -> None:
+            while True:
+                began = time.perf_counter()
+                if began >= stop_at:
+                    return
+                try:
+                    response = await request(client)
+                    ok = response.status_code < 500
+                except httpx.HTTPError:
+                    ok = False
+                if began < measure_from:
+                    continue
+                if ok:
+                    result.latencies.append(time.perf_counter() - began)
+                else:
+                    result.errors += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return result
+
+
+def print_table(results: List[LoadResult]) -> None:
+    """Print load results as an aligned table."""
+    header = f"{'scenario':<32}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        stats = result.summary()
+        print(
+            f"{result.name:<32}{stats['rps']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>8}"
+        )
@@ -0,0 +1,106 @@
+"""Compare offset and keyset pagination on shallow and deep pages.
+
+Usage::
+
+    python -m benchmarks.pagination --page-size 100 --pages 10000
+
+The items table is seeded up to ``page-size * pages`` rows, then page 1 and
+the last page are fetched repeatedly in offset mode (``skip``) and cursor
+mode (``cursor``) through the ASGI app in-process.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from .loadgen import import_project
+
+
+def seed_items(total: int, batch: int = 10_000) -> None:
+    """Bulk insert items until the table holds ``total`` rows."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import func, insert, select
+
+    database.init_db()
+    with database.engine.begin() as conn:
+        existing = conn.execute(select(func.count(models.Item.id))).scalar_one()
+        start = datetime(2024, 1, 1)
+        for offset in range(existing, total, batch):
+            rows = [
+                {
+                    "title": f"Item {n}",
+                    "price": "9.99",
+                    "is_active": True,
+                    "created_at": start + timedelta(seconds=n),
+                }
+                for n in range(offset, min(offset + batch, total))
+            ]
+            conn.execute(insert(models.Item), rows)
+
+
+def cursor_before_page(page: int, page_size: int) -> str:
+    """Cursor pointing at the last row of the page before ``page``."""
+    database = import_project("core.database")
+    pagination = import_project("core.pagination")
+    crud = import_project("crud.items")
+    from sqlalchemy import select
+
+    # The default sort of the item list, backed by ix_items_created_at_id
+    sort_key = crud.SORT_KEYS["created_at"]
+    with database.SessionLocal() as session:
+        row = session.execute(
+            select(*sort_key)
+            .order_by(*sort_key)
+            .offset((page - 1) * page_size - 1)
+            .limit(1)
+        ).one()
+    return pagination.encode_cursor(row)
+
+
+def time_request(client: TestClient, params: dict, repeat: int) -> float:
+    """Median latency of ``GET /api/v1/items/`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        response = client.get("/api/v1/items/", params=params)
+        samples.append(time.perf_counter() - began)
+        response.raise_for_status()
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    seed_items(args.page_size * args.pages)
+
+    client = TestClient(import_project("main").create_app())
+    limit = args.page_size
+    deep_skip = (args.pages - 1) * limit
+    deep_cursor = cursor_before_page(args.pages, limit)
+
+    scenarios = [
+        ("offset page 1", {"limit": limit}),
+        (f"offset page {args.pages}", {"limit": limit, "skip": deep_skip}),
+        ("cursor page 1", {"limit": limit}),
+        (f"cursor page {args.pages}", {"limit": limit, "cursor": deep_cursor}),
+    ]
+
+    print(f"{'scenario':<28}{'median ms':>12}")
+    for name, params in scenarios:
+        print(f"{name:<28}{time_request(client, params, args.repeat):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Measure full-text item search on a large corpus.
+
+Usage::
+
+    python -m benchmarks.search --items 1000000
+    python -m benchmarks.search --database-url postgresql+psycopg2://...
+
+The items table is seeded up to ``--items`` rows of generated titles and
+descriptions, in which word frequencies follow a Zipf-like curve so that
+queries range from very common to rare words. Each query is then timed
+through the ASGI app in-process, for the first page and for a page reached
+by following ``X-Next-Cursor``. For comparison, the same words are looked
+up with the substring scan (``LIKE '%word%'``) that filtering without a
+search index amounts to.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi.testclient import TestClient
+
+from .loadgen import import_project
+
+VOCABULARY_SIZE = 5_000
+
+
+def vocabulary() -> List[str]:
+    """Deterministic pseudo-words; lower indexes are drawn more often."""
+    rng = random.Random(0)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choices(letters, k=rng.randint(4, 9))))
+    return sorted(words)
+
+
+def seed_items(total: int, words: List[str], batch: int = 10_000) -> None:
+    """Bulk insert generated items until the table holds ``total`` rows."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import func, insert, select
+
+    rng = random.Random(1)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+
+    def text(count: int) -> str:
+        return " ".join(rng.choices(words, weights, k=count))
+
+    database.init_db()
+    with database.engine.begin() as conn:
+        existing = conn.execute(select(func.count(models.Item.id))).scalar_one()
+        for offset in range(existing, total, batch):
+            rows = [
+                {
+                    "title": text(3).capitalize(),
+                    "description": text(20),
+                    "price": "9.99",
+                    "is_active": True,
+                }
+                for _ in range(offset, min(offset + batch, total))
+            ]
+            conn.execute(insert(models.Item), rows)
+            print(f"\rseeded {offset + len(rows)}/{total}", end="", flush=True)
+    print()
+
+
+def time_search(
+    client: TestClient, params: Dict[str, str], repeat: int
+) -> Tuple[float, Optional[str]]:
+    """Median latency in milliseconds and the next-page cursor."""
+    samples = []
+    cursor = None
+    for _ in range(repeat):
+        began = time.perf_counter()
+        response = client.get("/api/v1/items/search", params=params)
+        samples.append(time.perf_counter() - began)
+        response.raise_for_status()
+        cursor = response.headers.get("X-Next-Cursor")
+    return statistics.median(samples) * 1000, cursor
+
+
+def time_scan(word: str, limit: int, repeat: int) -> float:
+    """Median latency of a ``LIKE '%word%'`` page in milliseconds."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import or_, select
+
+    Item = models.Item
+    pattern = f"%{word}%"
+    stmt = (
+        select(Item)
+        .where(or_(Item.title.ilike(pattern), Item.description.ilike(pattern)))
+        .order_by(Item.id)
+        .limit(limit)
+    )
+    samples = []
+    with database.SessionLocal() as session:
+        for _ in range(repeat):
+            began = time.perf_counter()
+            session.execute(stmt).scalars().all()
+            samples.append(time.perf_counter() - began)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10, help="depth of the deep page")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # Broad queries are slow by design here; keep the slow-query log quiet
+    os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "0")
+    words = vocabulary()
+    seed_items(args.items, words)
+
+    client = TestClient(import_project("main").create_app())
+    queries = [
+        ("common word", words[0]),
+        ("mid word", words[100]),
+        ("rare word", words[-1]),
+        ("two words", f"{words[3]} {words[40]}"),
+    ]
+
+    header = (
+        f"{'query':<14}{'page 1 ms':>12}{f'page {args.pages} ms':>14}{'LIKE ms':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, q in queries:
+        params = {"q": q, "limit": str(args.limit)}
+        first, cursor = time_search(client, params, args.repeat)
+
+        # Follow the cursor down to the deep page, then time that page
+        for _ in range(args.pages - 2):
+            if cursor is None:
+                break
+            response = client.get(
+                "/api/v1/items/search", params={**params, "cursor": cursor}
+            )
+            cursor = response.headers.get("X-Next-Cursor")
+        deep = "-"
+        if cursor is not None:
+            deep = f"{time_search(client, {**params, 'cursor': cursor}, args.repeat)[0]:.2f}"
+
+        scan = time_scan(q.split()[0], args.limit, args.repeat)
+        print(f"{name:<14}{first:>12.2f}{deep:>14}{scan:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Compare response serialization paths for ``GET /api/v1/items/``.
+
+Usage::
+
+    python -m benchmarks.serialization --limit 100 --repeat 2000
+
+One page of items is loaded once, then served by two routes that differ only
+in how the page is turned into JSON:
+
+* ``before``: validate each row with ``model_validate`` and return the list,
+  so FastAPI validates it again against ``response_model`` and renders it
+  through ``jsonable_encoder`` and ``json.dumps``.
+* ``after``: validate the page in one pydantic-core pass and return it with
+  ``model_response``, which renders it straight to bytes.
+
+Requests are driven through the ASGI interface directly rather than a
+``TestClient``, whose own per-request cost would drown out the difference.
+The real endpoint, database query included, is timed afterwards for scale.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlencode
+
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+
+from .loadgen import import_project
+from .pagination import seed_items
+
+
+def build_app(items: list) -> FastAPI:
+    """App serving the preloaded page through both serialization paths."""
+    responses = import_project("core.responses")
+    schemas = import_project("schemas.item")
+    ItemResponse = schemas.ItemResponse
+
+    app = FastAPI(default_response_class=JSONResponse)
+
+    @app.get("/before", response_model=List[ItemResponse])
+    def before() -> List[ItemResponse]:
+        return [ItemResponse.model_validate(item) for item in items]
+
+    @app.get("/after", response_model=List[ItemResponse])
+    def after() -> Response:
+        return responses.model_response(responses.validate_list(ItemResponse, items))
+
+    return app
+
+
+async def get(app: Any, path: str, params: Dict[str, Any]) -> Tuple[int, bytes]:
+    """Send one GET request straight to an ASGI app."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(params).encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "server": ("bench", 80),
+        "client": ("bench", 1),
+    }
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app(scope, receive, send)
+    body = b"".join(
+        message.get("body", b"")
+        for message in messages
+        if message["type"] == "http.response.body"
+    )
+    return messages[0]["status"], body
+
+
+async def time_request(
+    app: Any, path: str, params: Dict[str, Any], repeat: int
+) -> float:
+    """Median latency in microseconds."""
+    for _ in range(min(repeat, 50)):
+        await get(app, path, params)
+
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        status_code, _ = await get(app, path, params)
+        samples.append(time.perf_counter() - began)
+        assert status_code == 200, f"{path} returned {status_code}"
+    return statistics.median(samples) * 1_000_000
+
+
+async def run(items: list, limit: int, repeat: int) -> None:
+    bench = build_app(items)
+    _, before = await get(bench, "/before", {})
+    _, after = await get(bench, "/after", {})
+    assert before == after, "serialization paths disagree"
+
+    scenarios = [
+        ("before (revalidate + encoder)", bench, "/before", {}),
+        ("after (single pass, bytes)", bench, "/after", {}),
+        (
+            "GET /api/v1/items/ (with DB)",
+            import_project("main").create_app(),
+            "/api/v1/items/",
+            {"limit": limit},
+        ),
+    ]
+
+    print(f"{'scenario':<34}{'median us':>12}")
+    results = []
+    for name, app, path, params in scenarios:
+        results.append(await time_request(app, path, params, repeat))
+        print(f"{name:<34}{results[-1]:>12.1f}")
+
+    print(f"\nserialization speedup at limit={limit}: {results[0] / results[1]:.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    seed_items(args.limit)
+
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import select
+
+    with database.SessionLocal(expire_on_commit=False) as session:
+        items = session.execute(select(models.Item).limit(args.limit)).scalars().all()
+
+    asyncio.run(run(items, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure signup throughput per core with real bcrypt costs.
+
+Usage::
+
+    python -m benchmarks.signup --rounds 12 --hash-workers 1 --hash-workers 4
+
+For every ``--hash-workers`` value a uvicorn process is started with that
+many password hashing threads, then driven with concurrent signups. A few
+clients poll ``/health/`` at the same time: their latency shows whether
+hashing holds up requests that do not hash anything.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import tempfile
+from typing import List, Tuple
+
+import httpx
+
+from .loadgen import LoadResult, import_project, run_load, run_server
+
+
+async def measure(
+    base_url: str, concurrency: int, duration: float
+) -> Tuple[LoadResult, LoadResult]:
+    run = random.getrandbits(32)
+    counter = itertools.count()
+
+    async def signup(client: httpx.AsyncClient) -> httpx.Response:
+        name = f"signup{run:x}n{next(counter)}"
+        return await client.post(
+            "/api/v1/users/",
+            json={
+                "username": name,
+                "email": f"{name}@example.com",
+                "password": "benchmark-password",
+            },
+        )
+
+    async def health(client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/health/")
+
+    signups, probes = await asyncio.gather(
+        run_load("signup", base_url, signup, concurrency, duration),
+        run_load("health", base_url, health, 4, duration),
+    )
+    return signups, probes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--hash-workers", type=int, action="append")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        args.database_url = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+    os.environ["DATABASE_URL"] = args.database_url
+    import_project("core.database").init_db()
+
+    cpus = os.cpu_count() or 1
+    worker_counts: List[int] = args.hash_workers or sorted({1, cpus})
+
+    header = (
+        f"{'hash workers':<14}{'signups/s':>12}{'per core':>10}"
+        f"{'signup p99':>12}{'health p50':>12}{'health p99':>12}"
+    )
+    print(f"bcrypt cost {args.rounds}, {cpus} CPUs, concurrency {args.concurrency}")
+    print(header)
+    print("-" * len(header))
+
+    for workers in worker_counts:
+        env = {
+            "PASSWORD_BCRYPT_ROUNDS": str(args.rounds),
+            "PASSWORD_HASH_WORKERS": str(workers),
+        }
+        with run_server(env=env) as base_url:
+            signups, probes = asyncio.run(
+                measure(base_url, args.concurrency, args.duration)
+            )
+        cores = min(workers, cpus)
+        print(
+            f"{workers:<14}{signups.rps:>12.1f}{signups.rps / cores:>10.1f}"
+            f"{signups.percentile(99):>12.1f}{probes.percentile(50):>12.1f}"
+            f"{probes.percentile(99):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""Regression benchmark suite for the item and user CRUD endpoints.
+
+Usage::
+
+    # Record a baseline on a quiet machine
+    python -m benchmarks.suite --save-baseline benchmarks/baselines/local.json
+
+    # Compare a change against it; exits with status 1 on a regression
+    python -m benchmarks.suite --baseline benchmarks/baselines/local.json
+
+Every workload runs once per transport:
+
+* ``inprocess``: the ASGI app driven through ``httpx.ASGITransport``,
+  which isolates application cost from the network stack;
+* ``uvicorn``: a real uvicorn process driven over a local socket.
+
+Workloads are weighted mixes of requests:
+
+* ``read``: item lookups by ID, item list pages and user lookups;
+* ``write``: item creates and updates, and user signups;
+* ``mixed``: 80% of the read mix and 20% of the write mix.
+
+The database defaults to a throwaway SQLite file; pass ``--database-url``
+to run against a local Postgres instead. Baselines are only comparable when
+taken on the same machine, database and options.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import httpx
+
+from .loadgen import LoadResult, import_project, print_table, run_load, run_server
+
+Request = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+TRANSPORTS = ("inprocess", "uvicorn")
+WORKLOADS = ("read", "write", "mixed")
+
+# Latency percentiles compared against the baseline
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+class Workload:
+    """Weighted request mix over the seeded items and users."""
+
+    def __init__(self, max_item_id: int, max_user_id: int) -> None:
+        self.max_item_id = max_item_id
+        self.max_user_id = max_user_id
+        # Unique across workloads and transports within one run
+        self._signups = itertools.count()
+        self._run = random.getrandbits(32)
+
+    async def get_item(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/api/v1/items/{random.randint(1, self.max_item_id)}")
+
+    async def list_items(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get("/api/v1/items/", params={"limit": 20})
+
+    async def get_user(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.get(f"/api/v1/users/{random.randint(1, self.max_user_id)}")
+
+    async def create_item(self, client: httpx.AsyncClient) -> httpx.Response:
+        return await client.post(
+            "/api/v1/items/", json={"title": "Benchmark item", "price": "9.99"}
+        )
+
+    async def update_item(self, client: httpx.AsyncClient) -> httpx.Response:
+        item_id = random.randint(1, self.max_item_id)
+        return await client.put(
+            f"/api/v1/items/{item_id}", json={"price": f"{random.randint(1, 999)}.00"}
+        )
+
+    async def create_user(self, client: httpx.AsyncClient) -> httpx.Response:
+        name = f"bench{self._run:x}n{next(self._signups)}"
+        return await client.post(
+            "/api/v1/users/",
+            json={
+                "username": name,
+                "email": f"{name}@example.com",
+                "password": "benchmark-password",
+            },
+        )
+
+    def mix(self, workload: str) -> Request:
+        reads: List[Tuple[Request, float]] = [
+            (self.get_item, 0.6),
+            (self.list_items, 0.25),
+            (self.get_user, 0.15),
+        ]
+        writes: List[Tuple[Request, float]] = [
+            (self.create_item, 0.5),
+            (self.update_item, 0.4),
+            (self.create_user, 0.1),
+        ]
+        if workload == "read":
+            choices = reads
+        elif workload == "write":
+            choices = writes
+        else:
+            choices = [(fn, weight * 0.8) for fn, weight in reads] + [
+                (fn, weight * 0.2) for fn, weight in writes
+            ]
+
+        requests = [fn for fn, _ in choices]
+        weights = [weight for _, weight in choices]
+
+        def request(client: httpx.AsyncClient) -> Awaitable[httpx.Response]:
+            return random.choices(requests, weights)[0](client)
+
+        return request
+
+
+def seed(items: int, users: int) -> Tuple[int, int]:
+    """Ensure the seed rows exist and return the highest item and user IDs."""
+    database = import_project("core.database")
+    models = import_project("models")
+    from sqlalchemy import func, insert, select
+
+    database.init_db()
+    with database.engine.begin() as conn:
+        existing = conn.execute(select(func.count(models.Item.id))).scalar_one()
+        if existing < items:
+            conn.execute(
+                insert(models.Item),
+                [
+                    {"title": f"Item {n}", "price": Decimal("9.99")}
+                    for n in range(existing, items)
+                ],
+            )
+        existing = conn.execute(select(func.count(models.User.id))).scalar_one()
+        if existing < users:
+            conn.execute(
+                insert(models.User),
+                [
+                    {
+                        "username": f"seed{n}",
+                        "email": f"seed{n}@example.com",
+                        "hashed_password": "seed",
+                    }
+                    for n in range(existing, users)
+                ],
+            )
+        return (
+            int(conn.execute(select(func.max(models.Item.id))).scalar_one()),
+            int(conn.execute(select(func.max(models.User.id))).scalar_one()),
+        )
+
+
+async def run_inprocess(
+    workload: Workload, names: Sequence[str], concurrency: int, duration: float
+) -> List[LoadResult]:
+    app = import_project("main").create_app()
+    transport = httpx.ASGITransport(app=app)
+    return [
+        await run_load(
+            f"inprocess/{name}",
+            "http://bench",
+            workload.mix(name),
+            concurrency=concurrency,
+            duration=duration,
+            transport=transport,
+        )
+        for name in names
+    ]
+
+
+def run_uvicorn(
+    workload: Workload,
+    names: Sequence[str],
+    concurrency: int,
+    duration: float,
+    server_args: List[str],
+) -> List[LoadResult]:
+    with run_server(args=server_args) as base_url:
+        return [
+            asyncio.run(
+                run_load(
+                    f"uvicorn/{name}",
+                    base_url,
+                    workload.mix(name),
+                    concurrency=concurrency,
+                    duration=duration,
+                )
+            )
+            for name in names
+        ]
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """Describe every scenario that regressed by more than ``threshold``.
+
+    Throughput regresses when it drops and latency when it grows, each
+    relative to the baseline; scenarios missing on either side are skipped.
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["rps"] and current["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {current['rps']} < baseline {base['rps']}")
+        for key in LATENCY_KEYS:
+            if base[key] and current[key] > base[key] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {key} {current[key]} > baseline {base[key]}"
+                )
+        if current["errors"] > base["errors"]:
+            regressions.append(
+                f"{name}: {current['errors']} errors (baseline {base['errors']})"
+            )
+    return regressions
+
+
+def environment(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run options recorded next to the results."""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "database": args.database_url.split(":", 1)[0],
+        "database_async": os.environ.get("DATABASE_ASYNC", "false"),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--transport", choices=TRANSPORTS, action="append")
+    parser.add_argument("--workload", choices=WORKLOADS, action="append")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="compare against a baseline")
+    parser.add_argument("--save-baseline", type=Path, help="write a new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.15,
+        help="relative change treated as a regression (default: 0.15)",
+    )
+    parser.add_argument(
+        "--server-arg",
+        action="append",
+        default=[],
+        help="extra uvicorn argument for the socket transport (repeatable)",
+    )
+    args = parser.parse_args()
+
+    if not args.database_url:
+        args.database_url = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+    # Set before the application is imported, and inherited by uvicorn
+    os.environ["DATABASE_URL"] = args.database_url
+
+    transports = args.transport or list(TRANSPORTS)
+    workloads = args.workload or list(WORKLOADS)
+    workload = Workload(*seed(args.items, args.users))
+
+    results: List[LoadResult] = []
+    if "inprocess" in transports:
+        results.extend(
+            asyncio.run(
+                run_inprocess(workload, workloads, args.concurrency, args.duration)
+            )
+        )
+    if "uvicorn" in transports:
+        results.extend(
+            run_uvicorn(
+                workload, workloads, args.concurrency, args.duration, args.server_arg
+            )
+        )
+
+    print_table(results)
+    summaries = {result.name: result.summary() for result in results}
+    report = {"environment": environment(args), "results": summaries}
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["environment"] != report["environment"]:
+            print("\nwarning: baseline was recorded with different options:")
+            print(f"  baseline: {baseline['environment']}")
+            print(f"  current:  {report['environment']}")
+
+        regressions = compare(summaries, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
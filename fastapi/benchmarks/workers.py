@@ -0,0 +1,79 @@
+"""Compare the production server with one worker and with N workers.
+
+Usage::
+
+    python -m benchmarks.workers --concurrency 256 --duration 15
+
+Both runs use ``python -m {{project_name}}.server`` (gunicorn with uvloop and
+httptools workers) against the same database, seeded with ``--items`` rows.
+``--workers`` defaults to the count the server picks on this machine: the
+CPUs available to the process, within its cgroup quota. The workload mixes
+item lookups by ID with list pages of ``--limit`` rows, whose serialization
+keeps a worker's single core busy, which is what more workers add.
+
+The load generator shares the machine with the server, so run it on a host
+with a few CPUs more than ``--workers``, or the comparison measures the
+generator instead. On SQLite, concurrent readers in separate processes also
+contend for the file; use ``--database-url`` with Postgres for a fair run.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+
+import httpx
+
+from .async_mode import seed_items
+from .loadgen import (
+    LoadResult,
+    import_project,
+    print_table,
+    run_load,
+    run_production_server,
+)
+
+
+async def reads(client: httpx.AsyncClient, max_id: int, limit: int) -> httpx.Response:
+    if random.random() < 0.7:
+        return await client.get(f"/api/v1/items/{random.randint(1, max_id)}")
+    return await client.get("/api/v1/items/", params={"limit": limit})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    workers = args.workers or import_project("server").worker_count()
+    max_id = seed_items(args.items)
+
+    results: list[LoadResult] = []
+    for count in sorted({1, workers}):
+        with run_production_server(workers=count) as base_url:
+            results.append(
+                asyncio.run(
+                    run_load(
+                        f"{count} worker(s) c={args.concurrency}",
+                        base_url,
+                        lambda client: reads(client, max_id, args.limit),
+                        concurrency=args.concurrency,
+                        duration=args.duration,
+                    )
+                )
+            )
+
+    print_table(results)
+    if len(results) > 1 and results[0].rps:
+        print(f"\n{workers} workers: {results[1].rps / results[0].rps:.2f}x throughput")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Test suite for {{project_name}}."""
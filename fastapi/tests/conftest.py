@@ -0,0 +1,74 @@
+"""Shared pytest fixtures."""
+
+import importlib
+import os
+import tempfile
+from typing import Generator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Point the application at a throwaway SQLite database before it is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+# The minimum bcrypt cost keeps password hashing out of the test run time
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+main = importlib.import_module("{{project_name}}.main")
+queries = importlib.import_module("{{project_name}}.core.queries")
+
+
+@pytest.fixture(autouse=True)
+def db_schema() -> Generator[None, None, None]:
+    """Create the schema for each test and drop it afterwards."""
+    database.init_db()
+    yield
+    database.Base.metadata.drop_all(bind=database.engine)
+
+
+@pytest.fixture
+def db() -> Generator:
+    """Database session for arranging and inspecting test data."""
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    """Test client for the sync database mode."""
+    return TestClient(main.create_app())
+
+
+@pytest.fixture
+def async_client(monkeypatch: pytest.MonkeyPatch) -> Generator[TestClient, None, None]:
+    """Test client for the async database mode."""
+    # NullPool: the test client runs each request on a fresh event loop
+    engine = create_async_engine(database.get_async_database_url(), poolclass=NullPool)
+    queries.track_queries(engine)
+    session_factory = async_sessionmaker(
+        bind=engine, autoflush=False, expire_on_commit=False
+    )
+
+    monkeypatch.setattr(config.settings, "database_async", True)
+    monkeypatch.setattr(database, "async_engine", engine)
+    monkeypatch.setattr(database, "AsyncSessionLocal", session_factory)
+
+    yield TestClient(main.create_app())
+
+
+@pytest.fixture(params=["client", "async_client"])
+def client_fixture(request: pytest.FixtureRequest) -> str:
+    """Name of the client fixture ``http`` returns; parametrize it to pick one."""
+    return request.param
+
+
+@pytest.fixture
+def http(request: pytest.FixtureRequest, client_fixture: str) -> TestClient:
+    """Test client for each database mode in turn."""
+    return request.getfixturevalue(client_fixture)
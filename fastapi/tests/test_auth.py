@@ -0,0 +1,160 @@
+"""Tests for access tokens and the verified-token cache."""
+
+import importlib
+import time
+
+import pytest
+from jose import jwt
+
+auth = importlib.import_module("{{project_name}}.core.auth")
+cache = importlib.import_module("{{project_name}}.core.cache")
+models = importlib.import_module("{{project_name}}.models")
+queries = importlib.import_module("{{project_name}}.core.queries")
+security = importlib.import_module("{{project_name}}.core.security")
+routers = [
+    auth,
+    importlib.import_module("{{project_name}}.routers.users"),
+    importlib.import_module("{{project_name}}.routers.users_async"),
+]
+
+SIGNUP = {
+    "username": "alice",
+    "email": "alice@example.com",
+    "password": "correct-horse",
+}
+
+
+@pytest.fixture(autouse=True)
+def token_cache(monkeypatch):
+    """Fresh cache per test: tokens issued within one second are identical."""
+    fresh = cache.TokenCache(max_entries=100, ttl=60)
+    for module in routers:
+        monkeypatch.setattr(module, "token_cache", fresh)
+    return fresh
+
+
+def login(http, username="alice", password="correct-horse"):
+    return http.post(
+        "/api/v1/auth/token", data={"username": username, "password": password}
+    )
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_issue_token_and_read_current_user(http):
+    user_id = http.post("/api/v1/users/", json=SIGNUP).json()["id"]
+
+    response = login(http)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["token_type"] == "bearer"
+    assert body["expires_in"] == 30 * 60
+
+    me = http.get("/api/v1/auth/me", headers=bearer(body["access_token"]))
+    assert me.status_code == 200
+    assert me.json()["id"] == user_id
+    assert me.json()["username"] == "alice"
+
+
+def test_cached_token_skips_signature_check_and_lookup(http, token_cache, monkeypatch):
+    http.post("/api/v1/users/", json=SIGNUP)
+    headers = bearer(login(http).json()["access_token"])
+
+    decodes = []
+    original = jwt.decode
+
+    def counting(*args, **kwargs):
+        decodes.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting)
+
+    with queries.query_budget(max_statements=1):
+        assert http.get("/api/v1/auth/me", headers=headers).status_code == 200
+    with queries.query_budget(max_statements=0):
+        for _ in range(3):
+            assert http.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    assert len(decodes) == 1
+    assert token_cache.hits == 3
+
+
+def test_deactivation_revokes_cached_tokens(http, token_cache):
+    user_id = http.post("/api/v1/users/", json=SIGNUP).json()["id"]
+    headers = bearer(login(http).json()["access_token"])
+    assert http.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert len(token_cache.backend) == 1
+
+    http.put(f"/api/v1/users/{user_id}", json={"is_active": False})
+
+    assert len(token_cache.backend) == 0
+    response = http.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert login(http).status_code == 403
+
+
+def test_rejected_credentials(http):
+    http.post("/api/v1/users/", json=SIGNUP)
+
+    assert login(http, password="wrong-horse").status_code == 401
+    assert login(http, username="bob").status_code == 401
+    assert http.get("/api/v1/auth/me").status_code == 401
+    assert http.get("/api/v1/auth/me", headers=bearer("not-a-token")).status_code == 401
+
+
+def test_expired_token_rejected(client, monkeypatch):
+    user_id = client.post("/api/v1/users/", json=SIGNUP).json()["id"]
+    monkeypatch.setattr(auth.settings, "access_token_expire_minutes", -1)
+    token, _ = auth.create_access_token(user_id)
+
+    assert client.get("/api/v1/auth/me", headers=bearer(token)).status_code == 401
+
+
+def test_login_upgrades_legacy_hash(client, db):
+    user = models.User(
+        username="alice",
+        email="alice@example.com",
+        hashed_password="hashed_correct-horse",
+    )
+    db.add(user)
+    db.commit()
+    updated_at = user.updated_at
+
+    assert login(client).status_code == 200
+
+    db.expire_all()
+    stored = db.get(models.User, user.id)
+    assert security.password_hasher.verify("correct-horse", stored.hashed_password)[0]
+    assert stored.updated_at == updated_at
+
+
+def test_token_cache_bounds_entries_by_token_expiry():
+    tokens = cache.TokenCache(max_entries=100, ttl=60)
+
+    tokens.set("expired", 1, "alice", expires_at=time.time() - 1)
+    assert tokens.get("expired") is None
+
+    tokens.set("secret-token", 1, "alice", expires_at=time.time() + 600)
+    assert tokens.get("secret-token") == "alice"
+    assert "secret-token" not in tokens.backend
+    assert tokens.stats()["size"] == 1
+
+    disabled = cache.TokenCache(max_entries=100, ttl=0)
+    disabled.set("token", 1, "alice", expires_at=time.time() + 600)
+    assert disabled.get("token") is None
+
+
+def test_token_cache_index_is_pruned_after_evictions():
+    tokens = cache.TokenCache(max_entries=2, ttl=60)
+    for n in range(10):
+        tokens.set(f"token{n}", n % 2, f"user{n % 2}", expires_at=time.time() + 600)
+
+    assert len(tokens.backend) == 2
+    assert tokens._indexed <= 4
+
+    tokens.invalidate_user(0, 1)
+    assert len(tokens.backend) == 0
+    assert tokens.invalidations == 2
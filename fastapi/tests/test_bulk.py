@@ -0,0 +1,82 @@
+"""Tests for the bulk item endpoints."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+
+config = importlib.import_module("{{project_name}}.core.config")
+crud = importlib.import_module("{{project_name}}.crud.items")
+schemas = importlib.import_module("{{project_name}}.schemas.item")
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    """Use small chunks so tests cover several statements per request."""
+    monkeypatch.setattr(config.settings, "bulk_chunk_size", 3)
+
+
+def create(client, count):
+    rows = [{"title": f"Item {n}", "price": str(n)} for n in range(count)]
+    response = client.post("/api/v1/items/bulk", json=rows)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_bulk_create_update_delete(request, client_fixture):
+    client = request.getfixturevalue(client_fixture)
+
+    created = create(client, 7)
+    assert created["errors"] == []
+    assert [item["title"] for item in created["items"]] == [
+        f"Item {n}" for n in range(7)
+    ]
+    ids = [item["id"] for item in created["items"]]
+
+    response = client.patch(
+        "/api/v1/items/bulk",
+        json=[
+            {"id": ids[0], "price": "99.00"},
+            {"id": 9999, "price": "1"},
+            {"id": ids[1]},
+        ],
+    )
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [ids[0], ids[1]]
+    assert body["items"][0]["price"] == "99.00"
+    assert body["items"][0]["updated_at"] is not None
+    assert body["errors"] == [{"index": 1, "id": 9999, "detail": "Item not found"}]
+
+    response = client.request(
+        "DELETE", "/api/v1/items/bulk", json={"ids": ids[:4] + [9999]}
+    )
+    body = response.json()
+    assert body["deleted"] == ids[:4]
+    assert body["errors"] == [{"index": 4, "id": 9999, "detail": "Item not found"}]
+    assert len(client.get("/api/v1/items/").json()) == 3
+
+
+def test_bulk_create_isolates_failing_rows(db):
+    """A database error only rejects the offending rows of a chunk."""
+    rows = [{"title": f"Item {n}", "price": Decimal("1.00")} for n in range(5)]
+    rows[1]["title"] = None
+
+    # Bypass request validation to force a NOT NULL violation in the database
+    items = [schemas.ItemCreate.model_construct(**row) for row in rows]
+    result = crud.bulk_create_items(db, items)
+
+    assert [error.index for error in result.errors] == [1]
+    assert [item.title for item in result.items] == [
+        "Item 0",
+        "Item 2",
+        "Item 3",
+        "Item 4",
+    ]
+
+
+def test_bulk_size_limit(client, monkeypatch):
+    monkeypatch.setattr(config.settings, "bulk_max_rows", 2)
+    response = client.post(
+        "/api/v1/items/bulk", json=[{"title": "x", "price": "1"}] * 3
+    )
+    assert response.status_code == 413
@@ -0,0 +1,126 @@
+"""Tests for the read-through entity cache."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+cache = importlib.import_module("{{project_name}}.core.cache")
+database = importlib.import_module("{{project_name}}.core.database")
+models = importlib.import_module("{{project_name}}.models")
+schemas = importlib.import_module("{{project_name}}.schemas")
+routers = [
+    importlib.import_module("{{project_name}}.routers.items"),
+    importlib.import_module("{{project_name}}.routers.items_async"),
+]
+
+
+class FakeRedis:
+    """Dict-backed stand-in for a backend that stores serialized values."""
+
+    stores_objects = False
+    blocking = True
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, _ttl):
+        self.data[key] = value.encode()
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+@pytest.fixture
+def statements():
+    """Record the SQL statements sent to the database."""
+    recorded = []
+
+    def record(_conn, _cursor, statement, *_):
+        recorded.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(database.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture(params=["memory", "serialized"])
+def item_cache(request, monkeypatch):
+    backend = cache.MemoryCache(100) if request.param == "memory" else FakeRedis()
+    entity_cache = cache.EntityCache("item", backend, ttl=60)
+    for router in routers:
+        monkeypatch.setattr(router, "item_cache", entity_cache)
+    return entity_cache
+
+
+@pytest.fixture
+def item_id(db):
+    item = models.Item(title="Widget", price=Decimal("9.99"))
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def test_reads_are_served_from_cache_until_invalidated(
+    request, client_fixture, item_cache, item_id, statements
+):
+    client = request.getfixturevalue(client_fixture)
+
+    first = client.get(f"/api/v1/items/{item_id}").json()
+    queries = len(statements)
+    assert client.get(f"/api/v1/items/{item_id}").json() == first
+    assert item_cache.hits == 1 and item_cache.misses == 1
+    if client_fixture == "client":
+        assert len(statements) == queries
+
+    client.put(f"/api/v1/items/{item_id}", json={"title": "Gadget"})
+    assert client.get(f"/api/v1/items/{item_id}").json()["title"] == "Gadget"
+
+    client.patch("/api/v1/items/bulk", json=[{"id": item_id, "title": "Gizmo"}])
+    assert client.get(f"/api/v1/items/{item_id}").json()["title"] == "Gizmo"
+
+    client.delete(f"/api/v1/items/{item_id}")
+    assert client.get(f"/api/v1/items/{item_id}").status_code == 404
+    assert item_cache.invalidations == 3
+
+
+def test_memory_cache_evicts_least_recently_used():
+    backend = cache.MemoryCache(max_entries=2)
+    backend.set("a", 1, ttl=60)
+    backend.set("b", 2, ttl=60)
+    backend.get("a")
+    backend.set("c", 3, ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1 and backend.get("c") == 3
+    assert backend.evictions == 1
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    backend = cache.MemoryCache(max_entries=10)
+    backend.set("a", 1, ttl=5)
+
+    now += 4
+    assert backend.get("a") == 1
+    now += 2
+    assert backend.get("a") is None
+
+
+def test_disabled_cache_is_a_no_op():
+    entity_cache = cache.build_cache("item", ttl=0, max_entries=10)
+    entity_cache.set(1, schemas.HealthResponse.model_construct())
+    assert entity_cache.get(1, schemas.HealthResponse) is None
+    assert entity_cache.stats()["enabled"] is False
+    assert entity_cache.misses == 0
+
+
+def test_readiness_reports_cache_counters(client):
+    caches = client.get("/health/ready").json()["caches"]
+    assert set(caches) == {"item", "user", "token"}
+    assert caches["item"]["hits"] == 0
@@ -0,0 +1,149 @@
+"""Tests for gzip/brotli response compression."""
+
+import asyncio
+import importlib
+import json
+import zlib
+from decimal import Decimal
+
+import pytest
+from starlette.responses import StreamingResponse
+
+compression = importlib.import_module("{{project_name}}.core.compression")
+config = importlib.import_module("{{project_name}}.core.config")
+models = importlib.import_module("{{project_name}}.models")
+
+GZIP = {"Accept-Encoding": "gzip"}
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+@pytest.fixture
+def items(db):
+    db.add_all(
+        models.Item(title=f"Item {n}", description="A fine item", price=Decimal("9.99"))
+        for n in range(100)
+    )
+    db.commit()
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("GZIP", "gzip"),
+        ("*", "br"),
+        ("*;q=0.1, br;q=0", "gzip"),
+        ("identity", None),
+        ("gzip;q=0", None),
+        ("", None),
+    ],
+)
+def test_negotiate(header, expected):
+    assert compression.negotiate(header, ["br", "gzip"]) == expected
+
+
+@pytest.mark.usefixtures("items")
+def test_list_page_is_compressed(http):
+    params = {"limit": 100}
+    plain = http.get("/api/v1/items/", params=params, headers=IDENTITY)
+    response = http.get("/api/v1/items/", params=params, headers=GZIP)
+
+    assert "content-encoding" not in plain.headers
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) * 5 < len(plain.content)
+    assert response.json() == plain.json()
+    assert response.headers["ETag"] == plain.headers["ETag"]
+
+
+@pytest.mark.usefixtures("items")
+def test_brotli_is_preferred(client):
+    pytest.importorskip("brotli")
+    params = {"limit": 100}
+
+    response = client.get(
+        "/api/v1/items/", params=params, headers={"Accept-Encoding": "gzip, br"}
+    )
+    assert response.headers["content-encoding"] == "br"
+    assert len(response.json()) == 100
+
+    response = client.get(
+        "/api/v1/items/", params=params, headers={"Accept-Encoding": "gzip, br;q=0.5"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.usefixtures("items")
+def test_small_and_empty_responses_are_not_compressed(client):
+    response = client.get("/api/v1/items/1", headers=GZIP)
+    assert len(response.content) < config.settings.compression_minimum_size
+    assert "content-encoding" not in response.headers
+
+    cached = client.get("/api/v1/items/", params={"limit": 100}, headers=GZIP).headers[
+        "ETag"
+    ]
+    response = client.get(
+        "/api/v1/items/",
+        params={"limit": 100},
+        headers={**GZIP, "If-None-Match": cached},
+    )
+    assert response.status_code == 304
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.usefixtures("items")
+def test_compression_can_be_disabled(monkeypatch, request):
+    monkeypatch.setattr(config.settings, "compression_enabled", False)
+    client = request.getfixturevalue("client")
+
+    response = client.get("/api/v1/items/", params={"limit": 100}, headers=GZIP)
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.usefixtures("items")
+def test_export_is_compressed(client):
+    response = client.get("/api/v1/items/export", headers=GZIP)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert len(response.text.splitlines()) == 100
+
+
+def test_streams_are_compressed_chunk_by_chunk():
+    chunks = [json.dumps({"row": n}).encode() + b"\n" for n in range(3)]
+
+    async def app(scope, receive, send):
+        async def rows():
+            for chunk in chunks:
+                yield chunk
+
+        await StreamingResponse(rows(), media_type="application/x-ndjson")(
+            scope, receive, send
+        )
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    scope = {
+        "type": "http",
+        # 2.4: the response streams without polling receive for a disconnect
+        "asgi": {"version": "3.0", "spec_version": "2.4"},
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", b"gzip")],
+    }
+    middleware = compression.CompressionMiddleware(app, minimum_size=10_000)
+    asyncio.run(middleware(scope, receive, send))
+
+    # Each chunk decodes as soon as it arrives, small as it is
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [m for m in sent if m["type"] == "http.response.body"]
+    decoded = [decoder.decompress(message["body"]) for message in bodies]
+    assert decoded[: len(chunks)] == chunks
+    assert decoder.eof
@@ -0,0 +1,188 @@
+"""Tests for the total counts of list pages."""
+
+import importlib
+import json
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql
+
+cache = importlib.import_module("{{project_name}}.core.cache")
+counts = importlib.import_module("{{project_name}}.core.counts")
+models = importlib.import_module("{{project_name}}.models")
+
+
+@pytest.fixture(autouse=True)
+def estimate_cache(monkeypatch):
+    fresh = cache.MemoryCache(100)
+    monkeypatch.setattr(counts, "estimate_cache", fresh)
+    return fresh
+
+
+def add_items(db, active, inactive=0):
+    rows = [{"title": "Active", "price": Decimal("1.00")} for _ in range(active)]
+    rows += [
+        {"title": "Inactive", "price": Decimal("1.00"), "is_active": False}
+        for _ in range(inactive)
+    ]
+    db.execute(insert(models.Item), rows)
+    db.commit()
+
+
+def test_exact_totals_ignore_pagination(http, db):
+    add_items(db, active=3, inactive=2)
+
+    params = {"include_total": "exact", "limit": 2}
+    response = http.get("/api/v1/items/", params=params)
+    assert len(response.json()) == 2
+    assert response.headers[counts.TOTAL_COUNT_HEADER] == "5"
+
+    filtered = http.get(
+        "/api/v1/items/", params={"include_total": "exact", "is_active": "false"}
+    )
+    assert filtered.headers[counts.TOTAL_COUNT_HEADER] == "2"
+
+
+def test_no_total_by_default(http, db):
+    add_items(db, active=1)
+    assert counts.TOTAL_COUNT_HEADER not in http.get("/api/v1/items/").headers
+    assert counts.TOTAL_COUNT_HEADER not in http.get("/api/v1/users/").headers
+
+    response = http.get("/api/v1/items/", params={"include_total": "all"})
+    assert response.status_code == 422
+
+
+def test_user_totals(http, db):
+    rows = [
+        {
+            "email": f"user{n}@example.com",
+            "username": f"user{n}",
+            "hashed_password": "x",
+        }
+        for n in range(3)
+    ]
+    db.execute(insert(models.User), rows)
+    db.commit()
+
+    for include_total in ("exact", "estimate"):
+        response = http.get("/api/v1/users/", params={"include_total": include_total})
+        assert response.headers[counts.TOTAL_COUNT_HEADER] == "3"
+
+
+def test_estimates_are_cached(http, db, estimate_cache):
+    add_items(db, active=2)
+    params = {"include_total": "estimate", "is_active": "true"}
+    assert http.get("/api/v1/items/", params=params).headers["X-Total-Count"] == "2"
+
+    # Within the TTL the estimate is served from the cache...
+    add_items(db, active=3)
+    assert http.get("/api/v1/items/", params=params).headers["X-Total-Count"] == "2"
+    # ...while other filters and exact totals are counted
+    exact = {**params, "include_total": "exact"}
+    assert http.get("/api/v1/items/", params=exact).headers["X-Total-Count"] == "5"
+    unfiltered = {"include_total": "estimate"}
+    response = http.get("/api/v1/items/", params=unfiltered)
+    assert response.headers["X-Total-Count"] == "5"
+
+    estimate_cache._entries.clear()
+    assert http.get("/api/v1/items/", params=params).headers["X-Total-Count"] == "5"
+
+
+def test_list_etags_cover_the_total(http, db):
+    add_items(db, active=3)
+    params = {"include_total": "exact", "limit": 2, "sort": "price"}
+    etag = http.get("/api/v1/items/", params=params).headers["ETag"]
+
+    # A row past the page changes the total, not the rows on the page
+    db.add(models.Item(title="Pricey", price=Decimal("100.00")))
+    db.commit()
+    response = http.get(
+        "/api/v1/items/", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers[counts.TOTAL_COUNT_HEADER] == "4"
+
+
+def test_not_modified_repeats_the_total(http, db):
+    add_items(db, active=3)
+    params = {"include_total": "exact", "limit": 2}
+    etag = http.get("/api/v1/items/", params=params).headers["ETag"]
+
+    response = http.get(
+        "/api/v1/items/", params=params, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers[counts.TOTAL_COUNT_HEADER] == "3"
+
+
+def test_explain_keeps_bound_parameters():
+    stmt = select(models.Item.id).where(models.Item.price >= Decimal("10"))
+    sql = str(counts.explain(stmt).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT items.id")
+    assert "items.price >= %(price_1)s" in sql
+
+
+def test_plan_rows():
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 12345}}]
+    assert counts.plan_rows(plan) == 12345
+    # asyncpg returns the plan as text
+    assert counts.plan_rows(json.dumps(plan)) == 12345
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    scalar_one = scalar
+
+
+class PostgresSession:
+    """Answers the statistics queries the way PostgreSQL would."""
+
+    def __init__(self, reltuples, plan_rows, count):
+        self.answers = {"reltuples": reltuples, "explain": plan_rows, "count": count}
+        self.asked = []
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+    def execute(self, stmt, _params=None):
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        kind = (
+            "reltuples"
+            if "pg_class" in sql
+            else "explain"
+            if sql.startswith("EXPLAIN")
+            else "count"
+        )
+        self.asked.append(kind)
+        value = self.answers[kind]
+        if kind == "explain":
+            value = [{"Plan": {"Plan Rows": value}}]
+        return FakeResult(value)
+
+
+def test_planner_estimates_on_postgres():
+    unfiltered = select(models.Item.id)
+    filtered = unfiltered.where(models.Item.is_active.is_(True))
+
+    db = PostgresSession(reltuples=2_000_000, plan_rows=750_000, count=None)
+    assert counts.estimated_count(db, unfiltered) == 2_000_000
+    assert counts.estimated_count(db, filtered) == 750_000
+    assert db.asked == ["reltuples", "explain"]
+
+    # Never analyzed: the planner's own guess
+    db = PostgresSession(reltuples=-1, plan_rows=5000, count=None)
+    assert counts.planner_estimate(db, unfiltered) == 5000
+    assert db.asked == ["reltuples", "explain"]
+
+
+def test_small_estimates_are_counted_exactly():
+    stmt = select(models.Item.id).where(models.Item.title == "rare")
+    db = PostgresSession(reltuples=None, plan_rows=40, count=37)
+    assert counts.estimated_count(db, stmt) == 37
+    assert db.asked == ["explain", "count"]
@@ -0,0 +1,91 @@
+"""Tests for ETag conditional requests."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+database = importlib.import_module("{{project_name}}.core.database")
+models = importlib.import_module("{{project_name}}.models")
+
+
+@pytest.fixture
+def item_id(db):
+    db.add_all(models.Item(title=f"Item {n}", price=Decimal("1.00")) for n in range(3))
+    db.commit()
+    return 1
+
+
+def test_item_not_modified(http, item_id):
+    response = http.get(f"/api/v1/items/{item_id}")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = http.get(f"/api/v1/items/{item_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    http.put(f"/api/v1/items/{item_id}", json={"title": "Changed"})
+    response = http.get(f"/api/v1/items/{item_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_list_not_modified(http, item_id):
+    etag = http.get("/api/v1/items/").headers["ETag"]
+
+    response = http.get("/api/v1/items/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    http.delete(f"/api/v1/items/{item_id}")
+    assert (
+        http.get("/api/v1/items/", headers={"If-None-Match": etag}).status_code == 200
+    )
+
+
+def test_if_match_guards_updates(http, item_id):
+    etag = http.get(f"/api/v1/items/{item_id}").headers["ETag"]
+
+    response = http.put(
+        f"/api/v1/items/{item_id}", json={"price": "2.00"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    response = http.put(
+        f"/api/v1/items/{item_id}", json={"price": "3.00"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+    assert http.get(f"/api/v1/items/{item_id}").json()["price"] == "2.00"
+
+
+def test_user_not_modified(http):
+    user = http.post(
+        "/api/v1/users/",
+        json={
+            "username": "alice",
+            "email": "alice@example.com",
+            "password": "s3cretpass",
+        },
+    ).json()
+    etag = http.get(f"/api/v1/users/{user['id']}").headers["ETag"]
+    response = http.get(f"/api/v1/users/{user['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_not_modified_skips_full_row_load(client, item_id):
+    etag = client.get(f"/api/v1/items/{item_id}").headers["ETag"]
+
+    statements = []
+    listener = lambda _conn, _cursor, statement, *_: statements.append(statement)  # noqa: E731
+    event.listen(database.engine, "before_cursor_execute", listener)
+    try:
+        client.get(f"/api/v1/items/{item_id}", headers={"If-None-Match": etag})
+    finally:
+        event.remove(database.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert "items.title" not in statements[0]
@@ -0,0 +1,140 @@
+"""Tests for the streaming item export."""
+
+import asyncio
+import csv
+import importlib
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+database = importlib.import_module("{{project_name}}.core.database")
+main = importlib.import_module("{{project_name}}.main")
+models = importlib.import_module("{{project_name}}.models")
+
+
+@pytest.fixture
+def items(db):
+    db.add_all(
+        models.Item(title=f"Item {n}", description='a, "quoted"', price=Decimal("1.50"))
+        for n in range(5)
+    )
+    db.commit()
+
+
+@pytest.mark.usefixtures("items")
+def test_ndjson_export(request, client_fixture):
+    client = request.getfixturevalue(client_fixture)
+    response = client.get("/api/v1/items/export")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == [f"Item {n}" for n in range(5)]
+    # Same encoding as the JSON API
+    assert rows[0] == client.get(f"/api/v1/items/{rows[0]['id']}").json()
+
+
+@pytest.mark.usefixtures("items")
+def test_csv_export(client):
+    response = client.get("/api/v1/items/export", params={"format": "csv"})
+
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="items.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 5
+    assert rows[0]["description"] == 'a, "quoted"'
+    assert rows[0]["price"] == "1.50"
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+async def _drain(app, path: str) -> int:
+    """Run a GET through the ASGI app, discarding the body; return its size."""
+    size = 0
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if requested:
+            # The client never disconnects
+            await asyncio.Event().wait()
+        requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc")
+def test_export_memory_stays_flat():
+    """Exporting 1M rows must not grow RSS with the table size."""
+    total = int(os.environ.get("EXPORT_TEST_ROWS", "1000000"))
+    created = datetime(2024, 1, 1)
+    with database.engine.begin() as conn:
+        for start in range(0, total, 50_000):
+            conn.execute(
+                insert(models.Item),
+                [
+                    {
+                        "title": f"Item {n}",
+                        "price": Decimal("9.99"),
+                        "is_active": True,
+                        "created_at": created + timedelta(seconds=n),
+                    }
+                    for n in range(start, min(start + 50_000, total))
+                ],
+            )
+
+    baseline = peak = _rss_bytes()
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, _rss_bytes())
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sample)
+    sampler.start()
+    try:
+        size = asyncio.run(_drain(main.create_app(), "/api/v1/items/export"))
+    finally:
+        done.set()
+        sampler.join()
+
+    growth_mb = (peak - baseline) / 2**20
+    print(
+        f"exported {total} rows ({size / 2**20:.0f} MiB), peak RSS growth {growth_mb:.1f} MiB"
+    )
+    assert size > total * 50
+    assert growth_mb < 64
@@ -0,0 +1,199 @@
+"""Tests for filtering and sorting the item list."""
+
+import importlib
+import itertools
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert, select, text
+
+crud = importlib.import_module("{{project_name}}.crud.items")
+database = importlib.import_module("{{project_name}}.core.database")
+models = importlib.import_module("{{project_name}}.models")
+pagination = importlib.import_module("{{project_name}}.core.pagination")
+schemas = importlib.import_module("{{project_name}}.schemas")
+
+START = datetime(2024, 1, 1)
+
+# One value per supported filter; combinations of them are planned below
+FILTER_VALUES = {
+    "is_active": True,
+    "min_price": Decimal("10"),
+    "max_price": Decimal("20"),
+    "created_after": START + timedelta(days=10),
+    "created_before": START + timedelta(days=20),
+    "title_prefix": "Lamp",
+}
+FILTER_GROUPS = [
+    ("is_active",),
+    ("min_price", "max_price"),
+    ("created_after", "created_before"),
+    ("title_prefix",),
+]
+SORTS = ["created_at", "-created_at", "price", "-price"]
+
+
+@pytest.fixture
+def items(db):
+    rows = [
+        ("Lamp small", "5.00", True, 1),
+        ("Lamp large", "15.00", True, 2),
+        ("lampshade", "12.00", True, 3),
+        ("Desk", "15.00", False, 4),
+        ("Lamp_old", "25.00", False, 5),
+    ]
+    db.add_all(
+        models.Item(
+            title=title,
+            price=Decimal(price),
+            is_active=active,
+            created_at=START + timedelta(days=day),
+        )
+        for title, price, active, day in rows
+    )
+    db.commit()
+
+
+def titles(response):
+    assert response.status_code == 200, response.text
+    return [item["title"] for item in response.json()]
+
+
+@pytest.mark.usefixtures("items")
+def test_filters(http):
+    def get(**params):
+        return titles(http.get("/api/v1/items/", params=params))
+
+    assert get(is_active="false") == ["Desk", "Lamp_old"]
+    assert get(min_price="12", max_price="15") == ["Lamp large", "lampshade", "Desk"]
+    assert get(created_after="2024-01-03", created_before="2024-01-05") == [
+        "Lamp large",
+        "lampshade",
+    ]
+    assert get(created_after="2024-01-05T00:00:00+02:00") == ["Desk", "Lamp_old"]
+    # Case-sensitive, and LIKE wildcards in the prefix are literal
+    assert get(title_prefix="Lamp") == ["Lamp small", "Lamp large", "Lamp_old"]
+    assert get(title_prefix="Lamp_") == ["Lamp_old"]
+    assert get(is_active="true", title_prefix="Lamp", min_price="10") == ["Lamp large"]
+
+
+@pytest.mark.usefixtures("items")
+def test_sorting_with_keyset_pages(http):
+    def walk(sort):
+        seen, params = [], {"sort": sort, "limit": 2}
+        while True:
+            response = http.get("/api/v1/items/", params=params)
+            seen.extend(titles(response))
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return seen
+            params["cursor"] = cursor
+
+    assert walk("price") == [
+        "Lamp small",
+        "lampshade",
+        "Lamp large",
+        "Desk",
+        "Lamp_old",
+    ]
+    assert walk("-price") == [
+        "Lamp_old",
+        "Desk",
+        "Lamp large",
+        "lampshade",
+        "Lamp small",
+    ]
+    assert walk("-created_at") == [
+        "Lamp_old",
+        "Desk",
+        "lampshade",
+        "Lamp large",
+        "Lamp small",
+    ]
+
+
+@pytest.mark.usefixtures("items")
+def test_filtered_list_etag(client):
+    first = client.get("/api/v1/items/", params={"sort": "-price", "limit": 2})
+    etag = first.headers["ETag"]
+
+    cached = client.get(
+        "/api/v1/items/",
+        params={"sort": "-price", "limit": 2},
+        headers={"If-None-Match": etag},
+    )
+    assert cached.status_code == 304
+    assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+
+@pytest.mark.usefixtures("items")
+def test_invalid_sort_and_cursor(client):
+    assert client.get("/api/v1/items/", params={"sort": "title"}).status_code == 422
+
+    date_cursor = pagination.encode_cursor([START, 1])
+    response = client.get(
+        "/api/v1/items/", params={"sort": "price", "cursor": date_cursor}
+    )
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def large_table():
+    """Seed enough varied rows that a sequential scan would be costly."""
+    rng = random.Random(0)
+    words = ["Lamp", "Desk", "Chair", "Shelf", "Rug", "Vase", "Sofa", "Bed"]
+    with database.engine.begin() as conn:
+        conn.execute(
+            insert(models.Item),
+            [
+                {
+                    "title": f"{rng.choice(words)} {n}",
+                    "price": Decimal(rng.randint(100, 100_000)) / 100,
+                    "is_active": rng.random() < 0.9,
+                    "created_at": START + timedelta(minutes=n),
+                }
+                for n in range(20_000)
+            ],
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def full_scans(plan_rows, dialect):
+    """Plan lines showing a sequential scan of ``items``."""
+    if dialect == "postgresql":
+        return [line for (line,) in plan_rows if "Seq Scan on items" in line]
+    return [row.detail for row in plan_rows if row.detail.strip() == "SCAN items"]
+
+
+@pytest.mark.usefixtures("large_table")
+def test_every_filter_and_sort_combination_uses_an_index(db):
+    dialect = db.get_bind().dialect.name
+    explain = "EXPLAIN" if dialect == "postgresql" else "EXPLAIN QUERY PLAN"
+    cursors = {
+        "created_at": pagination.encode_cursor([START + timedelta(days=5), 100]),
+        "price": pagination.encode_cursor([Decimal("50.00"), 100]),
+    }
+
+    groups = itertools.chain.from_iterable(
+        itertools.combinations(FILTER_GROUPS, size)
+        for size in range(len(FILTER_GROUPS) + 1)
+    )
+    failures = []
+    for group, sort in itertools.product(list(groups), SORTS):
+        names = [name for fields in group for name in fields]
+        filters = schemas.ItemFilters(**{name: FILTER_VALUES[name] for name in names})
+        key, descending = crud.sort_key(sort)
+
+        for cursor in (None, cursors[sort.lstrip("-")]):
+            stmt = crud.filter_items(select(models.Item), filters, dialect)
+            stmt = pagination.paginate(stmt, key, 0, 100, cursor, descending)
+            compiled = stmt.compile(
+                dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+            )
+            plan = db.execute(text(f"{explain} {compiled}")).all()
+            if full_scans(plan, dialect):
+                failures.append((names, sort, cursor is not None))
+
+    assert failures == []
@@ -0,0 +1,92 @@
+"""Tests for request metrics and the /metrics endpoint."""
+
+import importlib
+import inspect
+import re
+from decimal import Decimal
+
+import pytest
+
+metrics = importlib.import_module("{{project_name}}.core.metrics")
+metrics_router = importlib.import_module("{{project_name}}.routers.metrics")
+queries = importlib.import_module("{{project_name}}.core.queries")
+models = importlib.import_module("{{project_name}}.models")
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.routes.clear()
+    metrics.in_flight.clear()
+
+
+def sample(text: str, name: str, **labels: str) -> float:
+    """Value of the sample with ``name`` whose labels include ``labels``."""
+    for line in text.splitlines():
+        match = re.fullmatch(r"(\w+)\{(.*)\} (\S+)", line)
+        if not match or match.group(1) != name:
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', match.group(2)))
+        if all(found.get(key) == value for key, value in labels.items()):
+            return float(match.group(3))
+    raise AssertionError(f"no sample {name} {labels}")
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert list(histogram.cumulative()) == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.sum == pytest.approx(3.65)
+
+
+def test_requests_recorded_by_route_template(http, db):
+    db.add(models.Item(title="Item", price=Decimal("1.00")))
+    db.commit()
+
+    for _ in range(3):
+        assert http.get("/api/v1/items/1").status_code == 200
+    assert http.get("/api/v1/items/999").status_code == 404
+
+    text = http.get("/metrics").text
+    route = "/api/v1/items/{item_id}"
+    assert sample(text, "http_requests_total", route=route, status="200") == 3
+    assert sample(text, "http_requests_total", route=route, status="404") == 1
+    assert (
+        sample(text, "http_request_duration_seconds_count", method="GET", route=route)
+        == 4
+    )
+    assert (
+        sample(text, "http_request_duration_seconds_bucket", route=route, le="+Inf")
+        == 4
+    )
+    # One SELECT per lookup, attributed to the request that ran it
+    assert sample(text, "http_request_db_statements_sum", route=route) == 4
+    assert sample(text, "http_request_db_statements_bucket", route=route, le="1") == 4
+    assert sample(text, "http_request_db_duration_seconds_sum", route=route) > 0
+    assert "/api/v1/items/1" not in text
+
+
+def test_unmatched_and_in_flight(client):
+    assert client.get("/no/such/path").status_code == 404
+    text = client.get("/metrics").text
+
+    assert (
+        sample(text, "http_requests_total", route=queries.UNMATCHED_ROUTE, status="404")
+        == 1
+    )
+    # The /metrics request itself is being served while rendering
+    assert sample(text, "http_requests_in_flight", method="GET") == 1
+
+
+def test_metrics_content_type(client):
+    response = client.get("/metrics")
+    assert response.headers["content-type"] == metrics.CONTENT_TYPE
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "db_pool_checkouts_total" in response.text
+    assert "/metrics" not in client.get("/openapi.json").json()["paths"]
+
+
+def test_metrics_are_rendered_on_the_event_loop():
+    # A threadpool handler would read the route metrics while the
+    # middleware changes them
+    assert inspect.iscoroutinefunction(metrics_router.metrics)
@@ -0,0 +1,74 @@
+"""Tests for offset and keyset pagination of list endpoints."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+
+models = importlib.import_module("{{project_name}}.models")
+pagination = importlib.import_module("{{project_name}}.core.pagination")
+
+
+@pytest.fixture
+def items(db):
+    """Seed 25 items."""
+    db.add_all(models.Item(title=f"Item {n}", price=Decimal("1.00")) for n in range(25))
+    db.commit()
+
+
+def walk(client, url, limit):
+    """Follow X-Next-Cursor until the last page and return all IDs."""
+    ids, params = [], {"limit": limit}
+    while True:
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        ids.extend(row["id"] for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+        params = {"limit": limit, "cursor": cursor}
+
+
+@pytest.mark.usefixtures("items")
+def test_cursor_walk_returns_every_item_once(client):
+    ids = walk(client, "/api/v1/items/", limit=10)
+    assert ids == sorted(ids)
+    assert len(ids) == len(set(ids)) == 25
+
+
+@pytest.mark.usefixtures("items")
+def test_cursor_walk_async_mode(async_client):
+    assert len(walk(async_client, "/api/v1/items/", limit=7)) == 25
+
+
+@pytest.mark.usefixtures("items")
+def test_offset_mode_is_unchanged(client):
+    response = client.get("/api/v1/items/", params={"skip": 20, "limit": 10})
+    assert [row["title"] for row in response.json()] == [
+        f"Item {n}" for n in range(20, 25)
+    ]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_user_cursor_walk(client, db):
+    db.add_all(
+        models.User(
+            username=f"user{n}", email=f"user{n}@example.com", hashed_password="x"
+        )
+        for n in range(5)
+    )
+    db.commit()
+    assert len(walk(client, "/api/v1/users/", limit=2)) == 5
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        pagination.encode_cursor([1]),
+        pagination.encode_cursor(["2024-01-01T00:00:00", 1, 2]),
+    ],
+)
+def test_invalid_cursor_is_rejected(client, cursor):
+    response = client.get("/api/v1/items/", params={"cursor": cursor})
+    assert response.status_code == 400
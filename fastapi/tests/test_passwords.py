@@ -0,0 +1,125 @@
+"""Tests for password hashing."""
+
+import asyncio
+import importlib
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+models = importlib.import_module("{{project_name}}.models")
+security = importlib.import_module("{{project_name}}.core.security")
+
+SIGNUP = {
+    "username": "alice",
+    "email": "alice@example.com",
+    "password": "correct-horse",
+}
+
+
+def stored_hash(db, username: str) -> str:
+    db.expire_all()
+    return db.query(models.User).filter_by(username=username).one().hashed_password
+
+
+def test_hash_and_verify():
+    hasher = security.PasswordHasher(rounds=4, workers=1)
+    hashed = hasher.hash("correct-horse")
+
+    assert hashed.startswith("$2b$04$")
+    assert hasher.verify("correct-horse", hashed) == (True, None)
+    assert hasher.verify("wrong-horse", hashed) == (False, None)
+    assert hasher.verify("correct-horse", "not-a-hash") == (False, None)
+
+
+def test_verify_rehashes_outdated_cost():
+    old = security.PasswordHasher(rounds=4).hash("correct-horse")
+    hasher = security.PasswordHasher(rounds=5)
+
+    valid, replacement = hasher.verify("correct-horse", old)
+    assert valid
+    assert security.hash_rounds(replacement) == 5
+    assert hasher.verify("correct-horse", replacement) == (True, None)
+    # A failed verify never upgrades the hash
+    assert hasher.verify("wrong-horse", old) == (False, None)
+
+
+def test_verify_upgrades_legacy_placeholder_hashes():
+    hasher = security.PasswordHasher(rounds=4)
+
+    valid, replacement = hasher.verify("correct-horse", "hashed_correct-horse")
+    assert valid
+    assert replacement.startswith("$2b$04$")
+    assert hasher.verify("wrong-horse", "hashed_correct-horse") == (False, None)
+
+
+def test_async_hashing_runs_on_the_pool():
+    hasher = security.PasswordHasher(rounds=4, workers=2)
+    threads = []
+    original = hasher.hash
+
+    def recording(password):
+        threads.append(threading.current_thread().name)
+        return original(password)
+
+    hasher.hash = recording
+
+    async def roundtrip():
+        hashed = await hasher.ahash("correct-horse")
+        return await hasher.averify("correct-horse", hashed)
+
+    try:
+        assert asyncio.run(roundtrip()) == (True, None)
+    finally:
+        hasher.shutdown()
+    assert threads[0].startswith("password-hash")
+
+
+def test_hashes_beyond_the_queue_are_shed():
+    hasher = security.PasswordHasher(rounds=4, workers=1, max_queue=1, queue_timeout=5)
+    release = threading.Event()
+    original = hasher.hash
+
+    def blocked(password):
+        release.wait(5)
+        return original(password)
+
+    hasher.hash = blocked
+
+    async def burst():
+        running = asyncio.create_task(hasher.ahash("first"))
+        queued = asyncio.create_task(hasher.ahash("second"))
+        await asyncio.sleep(0.01)
+        assert (hasher.limiter.active, hasher.limiter.queued) == (1, 1)
+        with pytest.raises(HTTPException) as shed:
+            await hasher.ahash("third")
+        release.set()
+        await asyncio.gather(running, queued)
+        return shed.value
+
+    try:
+        shed = asyncio.run(burst())
+    finally:
+        release.set()
+        hasher.shutdown()
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "5"
+    assert (hasher.limiter.active, hasher.limiter.queued) == (0, 0)
+
+
+def test_signup_and_password_change_store_bcrypt_hashes(http, db):
+    response = http.post("/api/v1/users/", json=SIGNUP)
+    assert response.status_code == 201
+    assert "hashed_password" not in response.json()
+
+    first = stored_hash(db, "alice")
+    assert security.password_hasher.verify("correct-horse", first) == (True, None)
+
+    user_id = response.json()["id"]
+    http.put(f"/api/v1/users/{user_id}", json={"full_name": "Alice"})
+    assert stored_hash(db, "alice") == first
+
+    http.put(f"/api/v1/users/{user_id}", json={"password": "battery-staple"})
+    second = stored_hash(db, "alice")
+    assert second != first
+    assert security.password_hasher.verify("battery-staple", second)[0]
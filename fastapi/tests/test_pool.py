@@ -0,0 +1,50 @@
+"""Tests for connection pool configuration and metrics."""
+
+import importlib
+
+import pytest
+from sqlalchemy import create_engine, exc
+
+config = importlib.import_module("{{project_name}}.core.config")
+pool = importlib.import_module("{{project_name}}.core.pool")
+
+
+def test_readiness_reports_pool_metrics(client):
+    client.get("/api/v1/items/")
+
+    status = client.get("/health/ready").json()["pools"]["primary"]
+    assert status["pool_class"] == "TimedQueuePool"
+    assert status["checkouts"] >= 1
+    assert status["checked_out"] == 0
+
+
+def test_null_pool_option(monkeypatch):
+    monkeypatch.setattr(config.settings, "database_pool_class", "null")
+    options = pool.pool_options()
+    assert options["poolclass"] is pool.TimedNullPool
+    assert "pool_size" not in options
+
+
+def test_checkout_timeouts_and_overflow_are_counted(monkeypatch, tmp_path):
+    monkeypatch.setattr(pool, "pool_metrics", {})
+    monkeypatch.setattr(config.settings, "database_pool_size", 1)
+    monkeypatch.setattr(config.settings, "database_max_overflow", 1)
+    monkeypatch.setattr(config.settings, "database_pool_timeout", 0.05)
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", **pool.pool_options())
+    metrics = pool.instrument_engine("test", engine)
+
+    first, second = engine.connect(), engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = pool.pool_status()["test"]
+    assert status["checked_out"] == 2
+    assert status["overflow"] == 1
+    assert status["timeouts"] == 1
+    assert status["wait_ms_max"] >= 50
+
+    first.close()
+    second.close()
+    engine.dispose()
+    assert metrics.snapshot()["checked_out"] == 0
+    assert engine.pool.metrics is metrics
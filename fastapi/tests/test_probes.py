@@ -0,0 +1,172 @@
+"""Tests for the background dependency probes behind /health/ready."""
+
+import asyncio
+import importlib
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+pool = importlib.import_module("{{project_name}}.core.pool")
+probes = importlib.import_module("{{project_name}}.core.probes")
+replicas = importlib.import_module("{{project_name}}.core.replicas")
+
+UNREACHABLE = "sqlite:////nonexistent/probes/unreachable.db"
+
+
+@pytest.fixture
+def http(request, client_fixture, monkeypatch):
+    """A client running the lifespan, which starts the probes."""
+    monkeypatch.setattr(config.settings, "database_check_schema", False)
+    # Only the check on start-up runs during a test
+    monkeypatch.setattr(probes.health_probes, "interval", 60)
+    client = request.getfixturevalue(client_fixture)
+    with client:
+        yield client
+
+
+sync_only = pytest.mark.parametrize("client_fixture", ["client"])
+
+
+def run(timeout=1.0, max_age=60.0):
+    """A fresh set of probes, checked once."""
+    checked = probes.HealthProbes(interval=60, timeout=timeout, max_age=max_age)
+    asyncio.run(checked.run_once())
+    return checked
+
+
+def test_ready_with_every_dependency_checked(http):
+    response = http.get("/health/ready")
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["status"] == "ready"
+    database_check = body["dependencies"]["database"]
+    assert (database_check["status"], database_check["critical"]) == ("ok", True)
+    assert database_check["age_seconds"] < 60
+
+
+@sync_only
+def test_readiness_is_answered_from_the_cache(http):
+    statements = []
+
+    def record(_conn, _cursor, statement, *_):
+        statements.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    try:
+        runs = probes.health_probes.runs
+        for _ in range(100):
+            assert http.get("/health/ready").status_code == 200
+    finally:
+        event.remove(database.engine, "before_cursor_execute", record)
+
+    # No request reached the database, nor triggered a check
+    assert statements == []
+    assert probes.health_probes.runs == runs
+
+
+@sync_only
+def test_pool_headroom(http):
+    pool_check = http.get("/health/ready").json()["dependencies"]["pool"]
+    assert (pool_check["status"], pool_check["headroom"]) == ("ok", 1.0)
+
+    snapshot = {"size": 5, "checked_out": 14}
+    assert probes.pool_headroom(snapshot) == pytest.approx(1 / 15)
+    assert probes.pool_headroom({"size": 0, "checked_out": 3}) is None
+
+
+def test_without_the_lifespan_the_worker_is_starting(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert response.json()["dependencies"] == {}
+
+
+def test_unreachable_database_is_not_ready(monkeypatch):
+    monkeypatch.setattr(database, "engine", create_engine(UNREACHABLE))
+    state, dependencies = run().readiness()
+
+    assert state == "not_ready"
+    assert dependencies["database"]["status"] == "down"
+    assert "OperationalError" in dependencies["database"]["detail"]
+
+
+def test_old_results_are_stale():
+    state, dependencies = run(max_age=0).readiness()
+    assert state == "not_ready"
+    assert dependencies["database"]["status"] == "stale"
+
+
+def test_a_hung_check_times_out_without_piling_up(monkeypatch):
+    release = threading.Event()
+    connects = []
+
+    class HungEngine:
+        def connect(self):
+            connects.append(1)
+            release.wait(5)
+            raise ConnectionError("gave up")
+
+    monkeypatch.setattr(database, "engine", HungEngine())
+    checked = probes.HealthProbes(interval=60, timeout=0.1, max_age=60)
+
+    async def check_twice():
+        await checked.run_once()
+        first = checked.readiness()[1]["database"]["detail"]
+        await checked.run_once()
+        return first, checked.readiness()[1]["database"]["detail"]
+
+    try:
+        first, second = asyncio.run(check_twice())
+    finally:
+        release.set()
+        asyncio.run(checked.stop())
+
+    assert first == "No answer within 0.1s"
+    # The stuck check still holds its thread; no second connection is tried
+    assert "previous check has not finished" in second
+    assert connects == [1]
+
+
+def test_replicas_are_checked_but_not_critical(monkeypatch):
+    healthy = create_engine(database.engine.url)
+    broken = create_engine(UNREACHABLE)
+    monkeypatch.setattr(
+        database,
+        "replicas",
+        replicas.ReplicaSet(
+            [(healthy, pool.PoolMetrics(healthy)), (broken, pool.PoolMetrics(broken))]
+        ),
+    )
+    checked = run()
+    state, dependencies = checked.readiness()
+
+    assert state == "degraded"
+    assert dependencies["replica_0"]["status"] == "ok"
+    # SQLite has no replication lag to report
+    assert dependencies["replica_0"]["lag_seconds"] is None
+    assert dependencies["replica_1"]["status"] == "down"
+    assert not dependencies["replica_1"]["critical"]
+    # A thread for the primary and one for each replica
+    assert checked._executor._max_workers == 3
+
+
+@sync_only
+def test_degraded_pool_keeps_the_worker_ready(http, monkeypatch):
+    monkeypatch.setattr(config.settings, "health_min_pool_headroom", 1.5)
+    asyncio.run(probes.health_probes.run_once())
+
+    response = http.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+    assert "pool is free" in response.json()["dependencies"]["pool"]["detail"]
+
+
+@sync_only
+def test_probe_metrics(http):
+    body = http.get("/metrics").text
+    assert 'health_dependency_up{dependency="database"} 1' in body
+    assert "# TYPE health_dependency_age_seconds gauge" in body
@@ -0,0 +1,106 @@
+"""Tests for the slow-query log, N+1 detection and query budgets."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+from structlog.testing import capture_logs
+
+config = importlib.import_module("{{project_name}}.core.config")
+models = importlib.import_module("{{project_name}}.models")
+queries = importlib.import_module("{{project_name}}.core.queries")
+
+
+@pytest.fixture
+def items(db):
+    db.add_all(models.Item(title=f"Item {n}", price=Decimal("1.00")) for n in range(5))
+    db.commit()
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    assert queries.fingerprint(
+        "SELECT * FROM items WHERE id IN (?, ?, ?) AND price > 10"
+    ) == queries.fingerprint("SELECT *\n  FROM items WHERE id IN (?) AND price > 2.5")
+    assert (
+        queries.fingerprint(
+            "INSERT INTO items (a, b) VALUES (%(a_0)s, %(b_0)s), (%(a_1)s, %(b_1)s)"
+        )
+        == "INSERT INTO items (a, b) VALUES (...)"
+    )
+    assert "'secret'" not in queries.fingerprint("SELECT 1 WHERE name = 'secret'")
+
+
+def test_parameters_shape_hides_values():
+    assert queries.parameters_shape({"email": "a@b.c", "id": 3}) == {
+        "email": "str",
+        "id": "int",
+    }
+    assert queries.parameters_shape(("a@b.c", 3)) == ["str", "int"]
+    assert queries.parameters_shape([{"id": 1}, {"id": 2}]) == {
+        "rows": 2,
+        "row": {"id": "int"},
+    }
+
+
+@pytest.mark.usefixtures("items")
+def test_slow_query_logged_with_route(http, monkeypatch):
+    monkeypatch.setattr(config.settings, "slow_query_threshold_ms", 1e-6)
+
+    with capture_logs() as logs:
+        assert http.get("/api/v1/items/1").status_code == 200
+
+    (slow,) = [log for log in logs if log["event"] == "Slow query"]
+    assert slow["route"] == "/api/v1/items/{item_id}"
+    assert slow["statement"].startswith("SELECT")
+    assert "int" in str(slow["parameters"])
+
+
+@pytest.mark.usefixtures("items")
+def test_slow_query_log_disabled(client, monkeypatch):
+    monkeypatch.setattr(config.settings, "slow_query_threshold_ms", 0)
+
+    with capture_logs() as logs:
+        client.get("/api/v1/items/1")
+
+    assert not [log for log in logs if log["event"] == "Slow query"]
+
+
+@pytest.mark.usefixtures("items")
+def test_repeated_statement_flagged_as_n_plus_one(db, monkeypatch):
+    monkeypatch.setattr(config.settings, "n_plus_one_threshold", 3)
+
+    with capture_logs() as logs, queries.tracking() as tracker:
+        for item_id in range(1, 6):
+            db.execute(select(models.Item).where(models.Item.id == item_id)).one()
+
+    assert tracker.statements == 5
+    assert len(tracker.suspected_n_plus_one) == 1
+    (warning,) = [log for log in logs if log["event"] == "Possible N+1 query"]
+    assert warning["repeats"] == 3
+    assert "FROM items" in warning["statement"]
+
+
+@pytest.mark.usefixtures("items")
+def test_query_budget(http):
+    with queries.query_budget(max_statements=1, max_repeats=1) as seen:
+        http.get("/api/v1/items/", params={"limit": 3})
+        http.get("/api/v1/items/2")
+    assert [tracker.statements for tracker in seen] == [1, 1]
+
+    with (
+        pytest.raises(queries.QueryBudgetExceeded, match="ran 1 statements"),
+        queries.query_budget(max_statements=0),
+    ):
+        http.get("/api/v1/items/2")
+
+
+@pytest.mark.usefixtures("items")
+def test_query_budget_catches_repeats(db):
+    with (
+        pytest.raises(queries.QueryBudgetExceeded, match="same statement 5 times"),
+        queries.query_budget(max_repeats=2),
+        queries.tracking(),
+    ):
+        for item_id in range(1, 6):
+            db.execute(select(models.Item).where(models.Item.id == item_id))
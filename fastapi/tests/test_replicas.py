@@ -0,0 +1,135 @@
+"""Tests for read replica routing and read-your-writes stickiness."""
+
+import importlib
+import tempfile
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+cache = importlib.import_module("{{project_name}}.core.cache")
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+models = importlib.import_module("{{project_name}}.models")
+schemas = importlib.import_module("{{project_name}}.schemas")
+
+ITEM_ROUTERS = [
+    "{{project_name}}.routers.items",
+    "{{project_name}}.routers.items_async",
+]
+pool = importlib.import_module("{{project_name}}.core.pool")
+replicas = importlib.import_module("{{project_name}}.core.replicas")
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A second SQLite database standing in for a lagging replica."""
+    url = f"sqlite:///{tempfile.mkdtemp()}/replica.db"
+    engine = create_engine(url)
+    async_engine = create_async_engine(
+        database.get_async_database_url(url), poolclass=NullPool
+    )
+    database.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(models.Item), [{"title": "From replica", "price": Decimal("1.00")}]
+        )
+
+    metrics = pool.PoolMetrics(engine)
+    monkeypatch.setattr(config.settings, "database_replica_urls", [url])
+    monkeypatch.setattr(database, "replicas", replicas.ReplicaSet([(engine, metrics)]))
+    monkeypatch.setattr(
+        database, "async_replicas", replicas.ReplicaSet([(async_engine, metrics)])
+    )
+    yield engine
+    database.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def http(request, client_fixture):
+    # The replica fixture has to patch the settings before the app is built
+    request.getfixturevalue("replica")
+    return request.getfixturevalue(client_fixture)
+
+
+def test_round_robin():
+    replica_set = replicas.ReplicaSet(
+        [("a", SimpleNamespace(checked_out=0)), ("b", SimpleNamespace(checked_out=0))]
+    )
+    assert [replica_set.choose() for _ in range(4)] == ["a", "b", "a", "b"]
+    assert replicas.ReplicaSet().choose() is None
+
+
+def test_least_connections():
+    busy, idle = SimpleNamespace(checked_out=3), SimpleNamespace(checked_out=1)
+    replica_set = replicas.ReplicaSet(
+        [("a", busy), ("b", idle)], selection="least_connections"
+    )
+    assert {replica_set.choose() for _ in range(4)} == {"b"}
+
+    # Ties rotate instead of always picking the first replica
+    busy.checked_out = 1
+    assert {replica_set.choose() for _ in range(4)} == {"a", "b"}
+
+
+def test_reads_go_to_the_replica(http):
+    assert http.get("/api/v1/items/1").json()["title"] == "From replica"
+    assert [row["title"] for row in http.get("/api/v1/items/").json()] == [
+        "From replica"
+    ]
+
+
+def test_client_reads_its_own_writes(http):
+    created = http.post("/api/v1/items/", json={"title": "Mine", "price": "2.00"})
+    assert replicas.STICKY_COOKIE in created.cookies
+
+    # The client's cookie pins its reads to the primary
+    assert http.get("/api/v1/items/1").json()["title"] == "Mine"
+
+    # Other clients, and this one once the window is over, use the replica
+    http.cookies.clear()
+    assert http.get("/api/v1/items/1").json()["title"] == "From replica"
+    http.cookies.set(replicas.STICKY_COOKIE, str(time.time() - 1))
+    assert http.get("/api/v1/items/1").json()["title"] == "From replica"
+
+
+def test_cache_keeps_a_writers_reads_fresh(http, monkeypatch):
+    item_cache = cache.EntityCache("item", cache.MemoryCache(100), ttl=60)
+    for router in ITEM_ROUTERS:
+        monkeypatch.setattr(importlib.import_module(router), "item_cache", item_cache)
+
+    http.post("/api/v1/items/", json={"title": "Mine", "price": "2.00"})
+    sticky = http.cookies[replicas.STICKY_COOKIE]
+    http.put("/api/v1/items/1", json={"title": "Renamed"})
+
+    # Another client reads the lagging replica, which must not fill the cache
+    http.cookies.clear()
+    assert http.get("/api/v1/items/1").json()["title"] == "From replica"
+    assert item_cache.get(1, schemas.ItemResponse) is None
+
+    # The writer reads past the cache, from the primary, and sees its update
+    http.cookies.set(replicas.STICKY_COOKIE, sticky)
+    assert http.get("/api/v1/items/1").json()["title"] == "Renamed"
+    assert http.get("/api/v1/items/1").json()["title"] == "Renamed"
+    assert item_cache.hits == 0
+
+
+# Listed before the client, which has to be built once the replica is set
+@pytest.mark.usefixtures("replica")
+def test_failed_writes_do_not_pin_reads(client):
+    response = client.put("/api/v1/items/999", json={"title": "Missing"})
+    assert response.status_code == 404
+    assert replicas.STICKY_COOKIE not in response.cookies
+
+    response = client.post("/api/v1/items/", json={"title": "New", "price": "2.00"})
+    assert replicas.STICKY_COOKIE in response.cookies
+
+
+def test_no_replicas_reads_from_primary(client):
+    client.post("/api/v1/items/", json={"title": "Primary", "price": "2.00"})
+    client.cookies.clear()
+    assert client.get("/api/v1/items/1").json()["title"] == "Primary"
@@ -0,0 +1,77 @@
+"""Tests for the single-pass response serialization path."""
+
+import importlib
+import json
+from decimal import Decimal
+
+import fastapi.routing
+import pytest
+
+models = importlib.import_module("{{project_name}}.models")
+responses = importlib.import_module("{{project_name}}.core.responses")
+schemas = importlib.import_module("{{project_name}}.schemas")
+
+
+@pytest.fixture
+def items(db):
+    db.add_all(models.Item(title=f"Item {n}", price=Decimal("9.90")) for n in range(3))
+    db.commit()
+    return db.query(models.Item).order_by(models.Item.id).all()
+
+
+def test_validate_list_matches_model_validate(items):
+    validated = responses.validate_list(schemas.ItemResponse, items)
+    assert validated == [schemas.ItemResponse.model_validate(item) for item in items]
+
+
+def test_model_response_renders_like_json_encoder(items):
+    validated = responses.validate_list(schemas.ItemResponse, items)
+    rendered = responses.model_response(validated).body
+    expected = [json.loads(model.model_dump_json()) for model in validated]
+    assert json.loads(rendered) == expected
+    assert json.loads(rendered)[0]["price"] == "9.90"
+
+
+@pytest.mark.usefixtures("items")
+def test_handlers_bypass_response_model_serialization(http, monkeypatch):
+    calls = []
+    original = fastapi.routing.serialize_response
+
+    async def counting(*args, **kwargs):
+        calls.append(kwargs.get("field"))
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(fastapi.routing, "serialize_response", counting)
+
+    response = http.get("/api/v1/items/", params={"limit": 2})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()] == ["Item 0", "Item 1"]
+    http.get("/api/v1/items/1")
+    http.put("/api/v1/items/1", json={"title": "Changed"})
+    assert calls == []
+
+    # Routes without direct responses still go through FastAPI
+    http.get("/health/")
+    assert len(calls) == 1
+
+
+@pytest.mark.usefixtures("items")
+def test_headers_survive_direct_responses(http):
+    response = http.get("/api/v1/items/", params={"limit": 2})
+    assert response.headers["X-Next-Cursor"]
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers.get_list("content-length") == [str(len(response.content))]
+
+    response = http.post("/api/v1/items/", json={"title": "New", "price": "1.50"})
+    assert response.status_code == 201
+    assert response.json()["price"] == "1.50"
+
+
+def test_openapi_keeps_response_models(client):
+    schema = client.get("/openapi.json").json()
+    list_schema = schema["paths"]["/api/v1/items/"]["get"]["responses"]["200"]
+    assert list_schema["content"]["application/json"]["schema"]["type"] == "array"
+    item_schema = schema["paths"]["/api/v1/items/{item_id}"]["get"]["responses"]["200"]
+    assert item_schema["content"]["application/json"]["schema"]["$ref"].endswith(
+        "/ItemResponse"
+    )
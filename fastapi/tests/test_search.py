@@ -0,0 +1,96 @@
+"""Tests for full-text item search."""
+
+import importlib
+from decimal import Decimal
+
+import pytest
+
+models = importlib.import_module("{{project_name}}.models")
+search = importlib.import_module("{{project_name}}.core.search")
+
+
+@pytest.fixture
+def items(db):
+    db.add_all(
+        [
+            models.Item(
+                title="Red wool scarf", description="Warm", price=Decimal("20")
+            ),
+            models.Item(
+                title="Blue scarf",
+                description="Silk scarf, red trim",
+                price=Decimal("30"),
+            ),
+            models.Item(
+                title="Teapot", description="Holds a red tea blend", price=Decimal("15")
+            ),
+            models.Item(title="Garden hose", description=None, price=Decimal("25")),
+        ]
+    )
+    db.commit()
+
+
+def titles(response):
+    return [item["title"] for item in response.json()]
+
+
+def test_fts5_query_quotes_words():
+    assert search.fts5_query('red "scarf" OR -x*') == '"red" "scarf" "OR" "x"'
+    assert search.fts5_query("!!!") is None
+
+
+@pytest.mark.usefixtures("items")
+def test_search_ranks_title_matches_first(http):
+    response = http.get("/api/v1/items/search", params={"q": "red"})
+
+    assert response.status_code == 200
+    assert titles(response)[0] == "Red wool scarf"
+    assert set(titles(response)) == {"Red wool scarf", "Blue scarf", "Teapot"}
+
+    # Every word has to match; stemming finds "scarfs" in "scarf"
+    both = http.get("/api/v1/items/search", params={"q": "red scarfs"})
+    assert set(titles(both)) == {"Red wool scarf", "Blue scarf"}
+
+
+@pytest.mark.usefixtures("items")
+def test_search_keyset_pages(http):
+    expected = titles(http.get("/api/v1/items/search", params={"q": "red"}))
+
+    seen = []
+    params = {"q": "red", "limit": 1}
+    while True:
+        response = http.get("/api/v1/items/search", params=params)
+        seen.extend(titles(response))
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+
+    assert seen == expected
+
+
+@pytest.mark.usefixtures("items")
+def test_search_follows_writes(client):
+    item_id = client.post(
+        "/api/v1/items/", json={"title": "Kettle", "price": "12.00"}
+    ).json()["id"]
+    assert titles(client.get("/api/v1/items/search", params={"q": "kettle"})) == [
+        "Kettle"
+    ]
+
+    client.put(f"/api/v1/items/{item_id}", json={"title": "Toaster"})
+    assert client.get("/api/v1/items/search", params={"q": "kettle"}).json() == []
+    assert titles(client.get("/api/v1/items/search", params={"q": "toaster"})) == [
+        "Toaster"
+    ]
+
+    client.delete(f"/api/v1/items/{item_id}")
+    assert client.get("/api/v1/items/search", params={"q": "toaster"}).json() == []
+
+
+@pytest.mark.usefixtures("items")
+def test_search_rejects_bad_input(client):
+    assert client.get("/api/v1/items/search").status_code == 422
+    assert client.get("/api/v1/items/search", params={"q": "?!"}).json() == []
+    bad_cursor = client.get("/api/v1/items/search", params={"q": "red", "cursor": "x"})
+    assert bad_cursor.status_code == 400
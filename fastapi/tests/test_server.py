@@ -0,0 +1,143 @@
+"""Tests for the production server entry point."""
+
+import importlib
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from gunicorn.config import Config
+from gunicorn.glogging import Logger
+
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+main = importlib.import_module("{{project_name}}.main")
+server = importlib.import_module("{{project_name}}.server")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_cgroup_v2_quota(tmp_path):
+    write(tmp_path / "cpu.max", "150000 100000\n")
+    assert server.cgroup_cpu_limit(tmp_path) == 1.5
+
+    write(tmp_path / "cpu.max", "max 100000\n")
+    assert server.cgroup_cpu_limit(tmp_path) is None
+
+
+def test_cgroup_v1_quota(tmp_path):
+    write(tmp_path / "cpu" / "cpu.cfs_quota_us", "200000\n")
+    write(tmp_path / "cpu" / "cpu.cfs_period_us", "100000\n")
+    assert server.cgroup_cpu_limit(tmp_path) == 2
+
+    write(tmp_path / "cpu" / "cpu.cfs_quota_us", "-1\n")
+    assert server.cgroup_cpu_limit(tmp_path) is None
+    # Outside a container neither file exists
+    assert server.cgroup_cpu_limit(tmp_path / "missing") is None
+
+
+def test_available_cpus_is_capped_by_the_quota(tmp_path):
+    cpus = len(os.sched_getaffinity(0))
+    assert server.available_cpus(tmp_path) == cpus
+
+    write(tmp_path / "cpu.max", "50000 100000\n")
+    assert server.available_cpus(tmp_path) == 0.5
+
+
+def test_worker_count(monkeypatch):
+    assert server.worker_count(cpus=0.5) == 1
+    assert server.worker_count(cpus=2.5) == 3
+
+    monkeypatch.setattr(config.settings, "server_workers", 6)
+    assert server.worker_count(cpus=2) == 6
+    assert server.gunicorn_options()["workers"] == 6
+
+
+def test_workers_use_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(config.settings, "server_graceful_timeout", 12)
+    cfg = Config()
+    for key, value in server.gunicorn_options().items():
+        cfg.set(key, value)
+
+    worker = cfg.worker_class(0, os.getpid(), [], main.app, 30, cfg, Logger(cfg))
+
+    assert (worker.config.loop, worker.config.http) == ("uvloop", "httptools")
+    assert worker.config.lifespan == "on"
+    assert worker.config.timeout_graceful_shutdown == 12
+    assert cfg.preload_app
+    # The master waits for the drain and the lifespan shutdown
+    assert cfg.graceful_timeout == 12 + server.SHUTDOWN_GRACE_SECONDS
+    # Each worker is recycled after its own, jittered, number of requests
+    assert 10000 <= worker.max_requests <= 11000
+    assert worker.config.limit_max_requests == worker.max_requests
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@pytest.mark.slow
+def test_stopping_drains_in_flight_requests():
+    port = free_port()
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "SERVER_WORKERS": "2",
+        "DATABASE_CHECK_SCHEMA": "false",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "{{project_name}}.server"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            assert process.poll() is None, "server exited"
+            try:
+                httpx.get(f"{base_url}/health/", timeout=1)
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.2)
+
+        # A write lock holds the next read in flight (SQLite waits for it)
+        lock = sqlite3.connect(database.engine.url.database, isolation_level=None)
+        lock.execute("BEGIN EXCLUSIVE")
+        responses = []
+        request = threading.Thread(
+            target=lambda: responses.append(
+                httpx.get(f"{base_url}/api/v1/items/", timeout=30)
+            )
+        )
+        request.start()
+        time.sleep(1)
+
+        process.send_signal(signal.SIGTERM)
+        time.sleep(1)
+        lock.rollback()
+        lock.close()
+        request.join(timeout=30)
+
+        assert [response.status_code for response in responses] == [200]
+        assert process.wait(timeout=30) == 0
+    finally:
+        if process.poll() is None:
+            process.kill()
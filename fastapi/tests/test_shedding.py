@@ -0,0 +1,185 @@
+"""Tests for load shedding: concurrency limits and rate limits."""
+
+import asyncio
+import importlib
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+
+config = importlib.import_module("{{project_name}}.core.config")
+shedding = importlib.import_module("{{project_name}}.core.shedding")
+
+# Simulated backend for the overload test: CAPACITY connections, each busy
+# for SERVICE_TIME per request, so it serves CAPACITY / SERVICE_TIME per second
+CAPACITY = 2
+SERVICE_TIME = 0.05
+# Clients give up after this long; later responses are not goodput
+CLIENT_TIMEOUT = 0.5
+QUEUE_TIMEOUT = 0.1
+
+
+@pytest.fixture(autouse=True)
+def limiters(monkeypatch):
+    monkeypatch.setattr(shedding, "limiters", {})
+    return shedding.limiters
+
+
+def test_token_bucket():
+    limiter = shedding.RateLimiter(rate=2, burst=3, max_clients=2)
+
+    assert [limiter.take("a", now=0) for _ in range(3)] == [0, 0, 0]
+    assert limiter.take("a", now=0) == pytest.approx(0.5)
+    assert limiter.take("a", now=0.5) == 0
+    # Other clients have their own bucket
+    assert limiter.take("b", now=0.5) == 0
+    assert limiter.rejected == 1
+
+
+def test_concurrency_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = shedding.ConcurrencyLimiter(limit=1, max_queue=1)
+        assert await limiter.acquire(timeout=1)
+
+        # One waiter fits in the queue and gets the slot on release
+        waiter = asyncio.create_task(limiter.acquire(timeout=1))
+        await asyncio.sleep(0)
+        assert not await limiter.acquire(timeout=1)  # queue full
+        limiter.release()
+        assert await waiter
+        assert limiter.active == 1
+
+        # Waiting longer than the timeout is shed too
+        assert not await limiter.acquire(timeout=0.01)
+        limiter.release()
+        assert (limiter.active, limiter.queued, limiter.rejected) == (0, 0, 2)
+
+    asyncio.run(scenario())
+
+
+def test_requests_release_their_slot(http, limiters):
+    assert http.get("/api/v1/items/").status_code == 200
+    assert http.get("/api/v1/items/1").status_code == 404
+
+    key = ("GET", "/api/v1/items/{item_id}")
+    assert limiters[key].limit == shedding.route_limit(*key)
+    assert [limiter.active for limiter in limiters.values()] == [0, 0]
+
+
+def test_saturated_route_sheds_with_503(client, limiters, monkeypatch):
+    monkeypatch.setattr(config.settings, "database_check_schema", False)
+    monkeypatch.setattr(config.settings, "concurrency_queue_timeout", 0)
+    busy = limiters[("GET", "/api/v1/items/")] = shedding.ConcurrencyLimiter(1, 0)
+    busy.active = 1
+
+    # Through the lifespan, which runs the readiness checks
+    with client:
+        response = client.get("/api/v1/items/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        # Other routes and the health checks are unaffected
+        assert client.get("/api/v1/users/").status_code == 200
+        assert client.get("/health/ready").status_code == 200
+
+
+def test_route_limit_overrides(monkeypatch):
+    monkeypatch.setattr(
+        config.settings, "concurrency_limits", {"GET /api/v1/items/export": 2}
+    )
+    monkeypatch.setattr(config.settings, "concurrency_limit", None)
+
+    assert shedding.route_limit("GET", "/api/v1/items/export") == 2
+    assert shedding.route_limit("GET", "/api/v1/items/") == (
+        config.settings.database_pool_size + config.settings.database_max_overflow
+    )
+
+
+def test_rate_limit_returns_429(monkeypatch, request):
+    monkeypatch.setattr(config.settings, "rate_limit_per_second", 0.5)
+    monkeypatch.setattr(config.settings, "rate_limit_burst", 2)
+    client = request.getfixturevalue("client")
+
+    assert [client.get("/api/v1/items/").status_code for _ in range(2)] == [200, 200]
+    response = client.get("/api/v1/items/")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "2"
+
+    # Health checks are exempt
+    assert {client.get("/health/live").status_code for _ in range(5)} == {200}
+
+
+def overload_app(shed: bool) -> FastAPI:
+    app = FastAPI()
+    connections = asyncio.Semaphore(CAPACITY)
+    dependencies = [Depends(shedding.limit_concurrency)] if shed else []
+
+    async def query() -> None:
+        async with connections:
+            await asyncio.sleep(SERVICE_TIME)
+
+    @app.get("/work", dependencies=dependencies)
+    async def work() -> dict:
+        # Like a sync handler in the threadpool, the query runs to completion
+        # even when its client has given up
+        await asyncio.shield(query())
+        return {}
+
+    return app
+
+
+async def offer_load(
+    app: FastAPI, rate: float, duration: float = 1.5, warmup: float = 0.5
+) -> tuple:
+    """Open-loop load at ``rate`` per second: goodput per second and p99.
+
+    Only requests sent after ``warmup`` count, when queues have built up.
+    """
+    loop = asyncio.get_running_loop()
+    latencies = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+
+        async def one(counted: bool) -> None:
+            began = loop.time()
+            try:
+                response = await asyncio.wait_for(client.get("/work"), CLIENT_TIMEOUT)
+            except asyncio.TimeoutError:
+                return
+            if response.status_code == 200 and counted:
+                latencies.append(loop.time() - began)
+
+        tasks = []
+        start = loop.time()
+        for n in range(int(rate * duration)):
+            await asyncio.sleep(max(0.0, start + n / rate - loop.time()))
+            tasks.append(asyncio.create_task(one(n / rate >= warmup)))
+        await asyncio.gather(*tasks)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float("inf")
+    return len(latencies) / (duration - warmup), p99
+
+
+def test_goodput_stays_flat_past_saturation(monkeypatch, limiters):
+    monkeypatch.setattr(config.settings, "concurrency_limit", CAPACITY)
+    monkeypatch.setattr(config.settings, "concurrency_queue_timeout", QUEUE_TIMEOUT)
+    saturation = CAPACITY / SERVICE_TIME
+
+    def run(shed: bool, load: float) -> tuple:
+        limiters.clear()
+        return asyncio.run(offer_load(overload_app(shed), saturation * load))
+
+    at_saturation, _ = run(shed=True, load=1)
+    for load in (2, 4):
+        goodput, p99 = run(shed=True, load=load)
+        assert goodput >= 0.8 * at_saturation, (load, goodput, at_saturation)
+        # Admitted requests wait at most the queue timeout
+        assert p99 < QUEUE_TIMEOUT + SERVICE_TIME + 0.1
+
+    # Without shedding the queue outgrows the clients' patience: the backend
+    # is kept busy serving requests whose clients already gave up
+    unshed, _ = run(shed=False, load=4)
+    assert unshed < 0.5 * at_saturation
@@ -0,0 +1,250 @@
+"""Tests for single-flight coalescing of identical reads."""
+
+import asyncio
+import importlib
+import sqlite3
+import threading
+import time
+from decimal import Decimal
+
+import anyio.to_thread
+import httpx
+import pytest
+from sqlalchemy import event
+
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+models = importlib.import_module("{{project_name}}.models")
+shedding = importlib.import_module("{{project_name}}.core.shedding")
+singleflight = importlib.import_module("{{project_name}}.core.singleflight")
+
+ITEM_ROUTE = "/api/v1/items/{item_id}"
+
+ROUTERS = [
+    "{{project_name}}.routers.items",
+    "{{project_name}}.routers.items_async",
+    "{{project_name}}.routers.users",
+    "{{project_name}}.routers.users_async",
+]
+
+
+@pytest.fixture
+def flights(monkeypatch):
+    flights = singleflight.SingleFlight()
+    for router in ROUTERS:
+        monkeypatch.setattr(importlib.import_module(router), "flights", flights)
+    return flights
+
+
+@pytest.fixture
+def http(request, client_fixture, monkeypatch):
+    request.getfixturevalue("flights")
+    # A burst of this size is far beyond the default per-route limit
+    monkeypatch.setattr(config.settings, "concurrency_limit", 0)
+    monkeypatch.setattr(shedding, "limiters", {})
+    return request.getfixturevalue(client_fixture)
+
+
+@pytest.fixture
+def item(db):
+    item = models.Item(title="Hot item", price=Decimal("9.99"))
+    db.add(item)
+    db.commit()
+    return item.id
+
+
+def test_sync_callers_share_one_call():
+    flights = singleflight.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do(("r", 1), load)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    while flights.coalesced["r"] < 9:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len({id(result) for result in results}) == 1
+    assert flights.status() == {"r": {"leaders": 1, "coalesced": 9}}
+
+
+def test_async_callers_share_one_call_and_its_errors():
+    flights = singleflight.SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise LookupError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(flights.ado(("r", 1), load) for _ in range(10))
+        )
+        assert results == [1] * 10
+
+        errors = await asyncio.gather(
+            *(flights.ado(("r", 2), failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(error, LookupError) for error in errors)
+
+        # Once finished, the next call reads again
+        assert await flights.ado(("r", 1), load) == 2
+
+    asyncio.run(scenario())
+    assert flights.status()["r"] == {"leaders": 3, "coalesced": 11}
+
+
+def test_cancelled_leader_hands_over():
+    flights = singleflight.SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "fresh"
+
+    async def scenario():
+        leader = asyncio.create_task(flights.ado(("r", 1), slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.ado(("r", 1), fast))
+        await asyncio.sleep(0)
+        leader.cancel()
+        assert await follower == "fresh"
+
+    asyncio.run(scenario())
+
+
+def test_forget_starts_a_new_read():
+    flights = singleflight.SingleFlight()
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def stale():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "stale"
+
+        async def fresh():
+            return "fresh"
+
+        old = asyncio.create_task(flights.ado(("r", False, "item", 7), stale))
+        other = asyncio.create_task(flights.ado(("r", False, "user", 7), stale))
+        await started.wait()
+        flights.forget("item", 7)
+        # A read arriving after the write does not join the older read...
+        assert await flights.ado(("r", False, "item", 7), fresh) == "fresh"
+        # ...while reads of another entity with the same id still join theirs
+        assert await flights.ado(("r", False, "user", 7), fresh) == "stale"
+        assert await old == "stale"
+        assert await other == "stale"
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def locked_database():
+    """Hold an exclusive lock on the SQLite file until released.
+
+    Reads block on it in their driver thread, which keeps the first request
+    in flight, without blocking the event loop, until every other one joined.
+    """
+    path = database.engine.url.database
+    engines = [database.engine]
+    if database.async_engine is not None:
+        engines.append(database.async_engine.sync_engine)
+
+    def wait_for_lock(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA busy_timeout = 60000")
+        cursor.close()
+
+    for engine in engines:
+        engine.dispose()
+        event.listen(engine, "connect", wait_for_lock)
+
+    lock = sqlite3.connect(path, isolation_level=None)
+    lock.execute("BEGIN EXCLUSIVE")
+    yield lock
+    lock.close()
+    for engine in engines:
+        event.remove(engine, "connect", wait_for_lock)
+        engine.dispose()
+
+
+async def burst(app, path, count, flights, lock):
+    """Send ``count`` concurrent GETs; release the lock once all joined."""
+    # Sync handlers each hold a threadpool thread while they wait
+    anyio.to_thread.current_default_thread_limiter().total_tokens = count + 10
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        tasks = [asyncio.create_task(client.get(path)) for _ in range(count)]
+        deadline = time.monotonic() + 60
+        while flights.coalesced[ITEM_ROUTE] < count - 1:
+            assert time.monotonic() < deadline, flights.status()
+            await asyncio.sleep(0.01)
+        lock.rollback()
+        return await asyncio.gather(*tasks)
+
+
+def test_thousand_concurrent_reads_hit_the_database_once(
+    http, flights, item, locked_database
+):
+    engine = (
+        database.async_engine.sync_engine
+        if config.settings.database_async
+        else database.engine
+    )
+    selects = []
+
+    def count_selects(_conn, _cursor, statement, *_):
+        if statement.lstrip().startswith("SELECT") and "FROM items" in statement:
+            selects.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count_selects)
+    try:
+        responses = asyncio.run(
+            burst(http.app, f"/api/v1/items/{item}", 1000, flights, locked_database)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count_selects)
+
+    assert {response.status_code for response in responses} == {200}
+    assert {response.json()["title"] for response in responses} == {"Hot item"}
+    assert len(selects) == 1
+    assert flights.status()[ITEM_ROUTE] == {"leaders": 1, "coalesced": 999}
+
+
+def test_reads_after_a_write_see_it(http, item):
+    assert http.get(f"/api/v1/items/{item}").json()["title"] == "Hot item"
+    http.put(f"/api/v1/items/{item}", json={"title": "Renamed"})
+    assert http.get(f"/api/v1/items/{item}").json()["title"] == "Renamed"
+    assert http.get("/api/v1/items/999").status_code == 404
+
+
+def test_coalesced_reads_are_in_metrics(client):
+    singleflight.flights.coalesced["/api/v1/users/{user_id}"] += 0
+    body = client.get("/metrics").text
+    assert 'singleflight_coalesced_total{route="/api/v1/users/{user_id}"}' in body
+    assert "# TYPE singleflight_leaders_total counter" in body
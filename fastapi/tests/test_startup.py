@@ -0,0 +1,157 @@
+"""Tests for the migrations, the start-up schema check and import time."""
+
+import asyncio
+import importlib
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+config = importlib.import_module("{{project_name}}.core.config")
+database = importlib.import_module("{{project_name}}.core.database")
+main = importlib.import_module("{{project_name}}.main")
+security = importlib.import_module("{{project_name}}.core.security")
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Start-up import budget for ``{{project_name}}.main``, in milliseconds of
+# import time on top of the interpreter's own
+IMPORT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1500))
+
+# Only needed on first use, by the other database mode or to run the server
+DEFERRED_MODULES = [
+    "alembic",
+    "gunicorn",
+    "jose",
+    "redis",
+    "uvicorn",
+    "{{project_name}}.routers.items_async",
+    "{{project_name}}.routers.users_async",
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/migrated.db")
+    yield engine
+    engine.dispose()
+
+
+def run_lifespan():
+    """Start the application up and shut it down again."""
+
+    async def cycle():
+        async with main.lifespan(main.app):
+            pass
+
+    asyncio.run(cycle())
+
+
+def alembic(engine, *args):
+    """Run an Alembic command against ``engine``."""
+    config = Config(str(ROOT / "alembic.ini"))
+    with engine.begin() as conn:
+        config.attributes["connection"] = conn
+        getattr(command, args[0])(config, *args[1:])
+
+
+def test_migrations_match_the_models(engine):
+    alembic(engine, "upgrade", "head")
+
+    # Autogenerate finds nothing left to migrate
+    alembic(engine, "check")
+    assert database.check_schema_revision(engine) == "0002"
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO items (title, price, is_active, created_at) "
+                "VALUES ('Brass lamp', 10, 1, '2024-01-01')"
+            )
+        )
+        matches = conn.execute(
+            text("SELECT rowid FROM items_fts WHERE items_fts MATCH 'lamp'")
+        ).all()
+    assert len(matches) == 1
+
+    alembic(engine, "downgrade", "base")
+    with engine.connect() as conn:
+        tables = conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ).scalars()
+        assert set(tables) == {"alembic_version"}
+
+
+def test_schema_check_refuses_unmigrated_database(engine):
+    with pytest.raises(RuntimeError, match="alembic upgrade head"):
+        database.check_schema_revision(engine)
+
+    # Tables created without Alembic carry no revision either
+    database.Base.metadata.create_all(bind=engine)
+    with pytest.raises(RuntimeError, match="revision none"):
+        database.check_schema_revision(engine)
+
+
+def test_startup_checks_the_revision_without_creating_tables(engine, monkeypatch):
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(main, "check_schema_revision", database.check_schema_revision)
+
+    with pytest.raises(RuntimeError):
+        run_lifespan()
+    with engine.connect() as conn:
+        assert not conn.exec_driver_sql("SELECT name FROM sqlite_master").all()
+
+    alembic(engine, "upgrade", "head")
+    run_lifespan()
+
+
+def test_shutdown_stops_the_hashing_pool(monkeypatch):
+    monkeypatch.setattr(config.settings, "database_check_schema", False)
+    hasher = security.PasswordHasher(rounds=4, workers=1)
+    monkeypatch.setattr(main, "password_hasher", hasher)
+
+    # Through the ASGI lifespan, as a server runs it
+    with TestClient(main.create_app()) as client:
+        assert client.get("/health/ready").status_code == 200
+        assert asyncio.run(hasher.ahash("secret")).startswith("$2b$04$")
+        assert hasher._executor is not None
+    assert hasher._executor is None
+
+
+def import_times(module: str) -> tuple:
+    """Milliseconds spent importing ``module`` and the modules it loaded."""
+    code = f"import importlib; importlib.import_module({module!r})"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total, modules = 0, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules.add(name.strip())
+        # Top-level imports (one space of indent) include their dependencies
+        if name.startswith(" ") and not name.startswith("  "):
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def test_import_time_budget():
+    # Best of a few runs, net of what the interpreter imports by itself
+    baseline = min(import_times("sys")[0] for _ in range(3))
+    runs = [import_times("{{project_name}}.main") for _ in range(3)]
+    elapsed = min(ms for ms, _ in runs) - baseline
+
+    assert not set(DEFERRED_MODULES) & runs[0][1]
+    assert elapsed < IMPORT_BUDGET_MS, f"importing main took {elapsed:.0f} ms"
@@ -0,0 +1,98 @@
+"""Tests that single-row writes cost one SQL statement."""
+
+import importlib
+
+import pytest
+from sqlalchemy import event
+
+database = importlib.import_module("{{project_name}}.core.database")
+
+USER = {"username": "alice", "email": "alice@example.com", "password": "s3cretpass"}
+
+
+@pytest.fixture
+def statements():
+    """Record the SQL statements sent to the database."""
+    recorded = []
+
+    def record(_conn, _cursor, statement, *_):
+        recorded.append(statement)
+
+    event.listen(database.engine, "before_cursor_execute", record)
+    yield recorded
+    event.remove(database.engine, "before_cursor_execute", record)
+
+
+def one_statement(statements, action):
+    """Run ``action`` and assert it sent exactly one statement."""
+    statements.clear()
+    response = action()
+    assert len(statements) == 1, statements
+    return response
+
+
+def test_item_writes_are_single_statements(client, statements):
+    response = one_statement(
+        statements,
+        lambda: client.post("/api/v1/items/", json={"title": "A", "price": "1"}),
+    )
+    assert response.status_code == 201
+    item = response.json()
+    assert item["created_at"] is not None
+
+    response = one_statement(
+        statements,
+        lambda: client.put(f"/api/v1/items/{item['id']}", json={"price": "2"}),
+    )
+    assert response.json()["price"] == "2.00"
+    assert response.json()["updated_at"] is not None
+
+    response = one_statement(
+        statements, lambda: client.delete(f"/api/v1/items/{item['id']}")
+    )
+    assert response.status_code == 204
+
+    response = one_statement(
+        statements, lambda: client.delete(f"/api/v1/items/{item['id']}")
+    )
+    assert response.status_code == 404
+
+
+def test_user_writes_are_single_statements(client, statements):
+    response = one_statement(
+        statements, lambda: client.post("/api/v1/users/", json=USER)
+    )
+    assert response.status_code == 201
+    user = response.json()
+
+    response = one_statement(
+        statements,
+        lambda: client.put(f"/api/v1/users/{user['id']}", json={"full_name": "Alice"}),
+    )
+    assert response.json()["full_name"] == "Alice"
+
+    response = one_statement(
+        statements, lambda: client.delete(f"/api/v1/users/{user['id']}")
+    )
+    assert response.status_code == 204
+
+
+def test_unique_conflicts_are_reported(request, client_fixture):
+    client = request.getfixturevalue(client_fixture)
+    client.post("/api/v1/users/", json=USER)
+    bob = client.post(
+        "/api/v1/users/", json={**USER, "username": "bob", "email": "bob@example.com"}
+    ).json()
+
+    response = client.post(
+        "/api/v1/users/", json={**USER, "email": "other@example.com"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Username already exists"
+
+    response = client.post("/api/v1/users/", json={**USER, "username": "carol"})
+    assert response.json()["detail"] == "Email already exists"
+
+    response = client.put(f"/api/v1/users/{bob['id']}", json={"email": USER["email"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already exists"
@@ -0,0 +1,214 @@
+"""Tests for write-behind item creation."""
+
+import importlib
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+config = importlib.import_module("{{project_name}}.core.config")
+main = importlib.import_module("{{project_name}}.main")
+models = importlib.import_module("{{project_name}}.models")
+writebehind = importlib.import_module("{{project_name}}.core.writebehind")
+
+ROUTERS = [
+    "{{project_name}}.routers.items",
+    "{{project_name}}.routers.items_async",
+]
+
+PREFER_ASYNC = {"Prefer": "respond-async"}
+
+
+def queue(write, batch_size=3, flush_interval=60.0, max_rows=100):
+    writer = writebehind.WriteBehindQueue(
+        "test", write, batch_size, flush_interval, max_rows
+    )
+    writer.start()
+    return writer
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    """A fresh item queue, started and stopped by the app lifespan."""
+    monkeypatch.setattr(config.settings, "write_behind_enabled", True)
+    monkeypatch.setattr(config.settings, "database_check_schema", False)
+    writer = writebehind.WriteBehindQueue(
+        "items", writebehind._write_items, 500, 0.05, 10000
+    )
+    monkeypatch.setattr(main, "item_writer", writer)
+    for router in ROUTERS:
+        monkeypatch.setattr(importlib.import_module(router), "item_writer", writer)
+    return writer
+
+
+@pytest.fixture
+def http(request, client_fixture):
+    # The routers' writer is patched before the lifespan starts it
+    request.getfixturevalue("writer")
+    client = request.getfixturevalue(client_fixture)
+    with client:
+        yield client
+
+
+def count_items(db, **filters):
+    stmt = select(func.count(models.Item.id)).filter_by(**filters)
+    return db.execute(stmt).scalar_one()
+
+
+def test_flushes_full_batches_then_on_the_interval():
+    batches = []
+
+    def write(rows):
+        batches.append([row["n"] for row in rows])
+        return len(rows), 0
+
+    writer = queue(write, batch_size=3, flush_interval=0.2)
+    for n in range(7):
+        assert writer.put({"n": n}, timeout=1)
+    assert writer.flush(timeout=5)
+    writer.stop(timeout=5)
+
+    # Two full batches at once, the remainder once the oldest row is due
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert writer.stats()["written"] == 7
+
+
+def test_full_queue_applies_backpressure():
+    release = threading.Event()
+
+    def write(rows):
+        release.wait(5)
+        return len(rows), 0
+
+    writer = queue(write, batch_size=2, flush_interval=0, max_rows=2)
+    assert writer.put({}, timeout=1) and writer.put({}, timeout=1)
+    # The batch being written still counts against the bound
+    assert not writer.put({}, timeout=0.05)
+
+    # A waiting producer gets in once the batch is written
+    threading.Timer(0.1, release.set).start()
+    assert writer.put({}, timeout=5)
+    writer.stop(timeout=5)
+    assert (writer.queued, writer.rejected, writer.written) == (0, 1, 3)
+
+
+def test_failed_batches_are_retried_and_flushed_on_stop():
+    calls = []
+
+    def write(rows):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+        return len(rows), 0
+
+    # Nothing is due before the stop, which flushes everything
+    writer = queue(write, batch_size=10, flush_interval=60)
+    for n in range(4):
+        writer.put({"n": n}, timeout=1)
+    writer.stop(timeout=5)
+
+    assert calls == [4, 4]
+    assert writer.stats()["written"] == 4
+    assert writer.stats()["failures"] == 1
+    # A stopped queue takes no more rows
+    assert not writer.put({}, timeout=0)
+
+
+def test_stop_gives_up_after_its_timeout():
+    def write(_rows):
+        raise OperationalError("INSERT", {}, Exception("database down"))
+
+    writer = queue(write, batch_size=10, flush_interval=60)
+    writer.put({}, timeout=1)
+    began = time.monotonic()
+    writer.stop(timeout=0.2)
+
+    assert time.monotonic() - began < 2
+    while writer.queued:
+        time.sleep(0.01)
+    assert writer.stats()["dropped"] == 1
+
+
+def test_async_creation_returns_202_and_writes_later(http, writer, db):
+    payload = {"title": "Queued", "price": "2.50", "client_id": "order-1/a"}
+    response = http.post("/api/v1/items/", json=payload, headers=PREFER_ASYNC)
+
+    assert response.status_code == 202
+    assert response.json() == {"client_id": "order-1/a", "status": "queued"}
+    assert response.headers["Preference-Applied"] == "respond-async"
+
+    # Repeating the request queues it again but writes the item once
+    http.post("/api/v1/items/", json=payload, headers=PREFER_ASYNC)
+    assert writer.flush(timeout=5)
+
+    listed = http.get(response.headers["Location"]).json()
+    assert [(item["title"], item["client_id"]) for item in listed] == [
+        ("Queued", "order-1/a")
+    ]
+    assert count_items(db) == 1
+
+
+def test_async_creation_needs_a_client_id(http):
+    response = http.post(
+        "/api/v1/items/", json={"title": "No ID", "price": "1"}, headers=PREFER_ASYNC
+    )
+    assert response.status_code == 400
+
+
+def test_without_the_preference_items_are_created_at_once(http, db):
+    payload = {"title": "Now", "price": "1.00", "client_id": "now-1"}
+    response = http.post("/api/v1/items/", json=payload)
+    assert response.status_code == 201
+    assert response.json()["client_id"] == "now-1"
+
+    assert http.post("/api/v1/items/", json=payload).status_code == 409
+    assert count_items(db, client_id="now-1") == 1
+
+
+def test_disabled_write_behind_ignores_the_preference(client):
+    response = client.post(
+        "/api/v1/items/", json={"title": "Sync", "price": "1"}, headers=PREFER_ASYNC
+    )
+    assert response.status_code == 201
+    assert "Preference-Applied" not in response.headers
+
+
+def test_full_queue_answers_503(writer, monkeypatch, request):
+    monkeypatch.setattr(config.settings, "write_behind_enqueue_timeout", 0)
+    monkeypatch.setattr(writer, "max_rows", 0)
+    with request.getfixturevalue("client") as client:
+        response = client.post(
+            "/api/v1/items/",
+            json={"title": "Full", "price": "1", "client_id": "full-1"},
+            headers=PREFER_ASYNC,
+        )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert writer.rejected == 1
+
+
+def test_shutdown_flushes_queued_items(writer, db):
+    # Nothing would be due for a minute; the shutdown writes it anyway
+    writer.flush_interval = 60
+    with TestClient(main.create_app()) as client:
+        for n in range(20):
+            response = client.post(
+                "/api/v1/items/",
+                json={"title": f"Item {n}", "price": "1", "client_id": f"c{n}"},
+                headers=PREFER_ASYNC,
+            )
+            assert response.status_code == 202
+        assert count_items(db) == 0
+
+    assert count_items(db) == 20
+    assert writer.stats()["flushes"] == 1
+
+
+def test_write_behind_metrics(client):
+    body = client.get("/metrics").text
+    assert 'write_behind_queued_rows{queue="items"} 0' in body
+    assert "# TYPE write_behind_written_rows_total counter" in body
@@ -0,0 +1,109 @@
+"""Access tokens and the authenticated-user dependency.
+
+Tokens are JWTs signed with ``secret_key`` whose subject is the user ID.
+Once a token was verified and its user loaded, the user is kept in the
+``token_cache``: repeat requests with the same token cost a SHA-256 and a
+dictionary lookup instead of a signature check and a ``users`` SELECT.
+Deactivating or deleting a user drops their cached tokens.
+"""
+
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+
+from ..crud import users as crud
+from ..models.user import User
+from ..schemas.user import UserResponse
+from .cache import token_cache
+from .config import settings
+from .database import run_in_session
+from .security import password_hasher
+
+TOKEN_URL = "/api/v1/auth/token"
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=TOKEN_URL)
+
+# Hash checked for unknown usernames, so they take as long as a wrong password
+_missing_user_hash: Optional[str] = None
+
+
+def credentials_error(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def create_access_token(user_id: int) -> Tuple[str, int]:
+    """Sign a token for ``user_id``; returns it with its lifetime in seconds."""
+    # jose (and the cryptography backend it loads) is imported on first use to
+    # keep it out of the worker's start-up time
+    from jose import jwt
+
+    lifetime = settings.access_token_expire_minutes * 60
+    issued_at = int(time.time())
+    claims = {"sub": str(user_id), "iat": issued_at, "exp": issued_at + lifetime}
+    token = jwt.encode(claims, settings.secret_key, algorithm=settings.algorithm)
+    return token, lifetime
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify the signature and expiry of ``token`` and return its claims."""
+    from jose import JWTError, jwt
+
+    try:
+        claims = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        int(claims["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise credentials_error() from None
+    return claims
+
+
+async def authenticate_user(username: str, password: str) -> User:
+    """Check a username and password on the hashing pool.
+
+    A successful login against an outdated hash stores its replacement.
+    """
+    global _missing_user_hash
+
+    user = await run_in_session(crud.get_user_by_username, username)
+    if user is None:
+        if _missing_user_hash is None:
+            _missing_user_hash = await password_hasher.ahash("missing-user")
+        await password_hasher.averify(password, _missing_user_hash)
+        raise credentials_error("Incorrect username or password")
+
+    valid, replacement = await password_hasher.averify(password, user.hashed_password)
+    if not valid:
+        raise credentials_error("Incorrect username or password")
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
+        )
+
+    if replacement is not None:
+        await run_in_session(crud.store_password_hash, user.id, replacement)
+    return user
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserResponse:
+    """Dependency resolving the bearer token to an active user.
+
+    Works in both database modes; cache hits run no SQL at all.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    claims = decode_access_token(token)
+    user_id = int(claims["sub"])
+    user = await run_in_session(crud.get_active_user, user_id)
+    if user is None:
+        raise credentials_error()
+
+    result = UserResponse.model_validate(user)
+    token_cache.set(token, user_id, result, expires_at=claims["exp"])
+    return result
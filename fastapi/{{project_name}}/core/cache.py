@@ -0,0 +1,348 @@
+"""Read-through entity cache for single-row lookups.
+
+Each cached model gets an ``EntityCache`` with its own TTL and size, backed
+either by an in-process LRU (per worker) or by a Redis-protocol server
+(shared by all workers). Writers invalidate entries after commit; the TTL
+bounds staleness for anything invalidation misses, such as other workers'
+in-process caches.
+
+``TokenCache`` keeps the users behind verified access tokens in the same
+kind of in-process LRU, so repeat requests with a token skip both the
+signature check and the user lookup.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Set, Type, TypeVar, Union
+
+import structlog
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class CacheBackend(Protocol):
+    """Storage for cache entries."""
+
+    # Whether values are stored as model objects rather than JSON bytes
+    stores_objects: bool
+    # Whether calls do network I/O and must stay off the event loop
+    blocking: bool
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class MemoryCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    stores_objects = True
+    blocking = False
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __contains__(self, key: str) -> bool:
+        # Presence only: neither checks expiry nor refreshes the LRU position
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache:
+    """Cache stored on a Redis-protocol server (Redis, Valkey, KeyDB, ...)."""
+
+    stores_objects = False
+    blocking = True
+
+    def __init__(self, url: str, prefix: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the 'redis' extra to be installed"
+            ) from exc
+
+        self.prefix = prefix
+        self.evictions = 0
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=settings.cache_redis_timeout
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            return self._client.get(self.prefix + key)
+        except self._errors as exc:
+            logger.warning("Cache read failed", key=key, error=str(exc))
+            return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+        except self._errors as exc:
+            logger.warning("Cache write failed", key=key, error=str(exc))
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self.prefix + key)
+        except self._errors as exc:
+            logger.warning("Cache invalidation failed", key=key, error=str(exc))
+
+
+class EntityCache:
+    """Cache of response models keyed by entity ID."""
+
+    def __init__(self, name: str, backend: Optional[CacheBackend], ttl: float) -> None:
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl > 0
+
+    def _key(self, entity_id: Any) -> str:
+        return f"{self.name}:{entity_id}"
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, entity_id: Any, schema: Type[ModelT]) -> Optional[ModelT]:
+        """Cached model for ``entity_id``, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+        assert self.backend is not None
+
+        value = self.backend.get(self._key(entity_id))
+        self._count(value is not None)
+        if value is None or self.backend.stores_objects:
+            return value
+        return schema.model_validate_json(value)
+
+    def set(self, entity_id: Any, model: BaseModel) -> None:
+        if not self.enabled:
+            return
+        assert self.backend is not None
+
+        value = model if self.backend.stores_objects else model.model_dump_json()
+        self.backend.set(self._key(entity_id), value, self.ttl)
+
+    def invalidate(self, *entity_ids: Any) -> None:
+        """Drop entries after their rows were changed or deleted."""
+        if not self.enabled:
+            return
+        assert self.backend is not None
+
+        for entity_id in entity_ids:
+            self.backend.delete(self._key(entity_id))
+        with self._lock:
+            self.invalidations += len(entity_ids)
+
+    async def aget(self, entity_id: Any, schema: Type[ModelT]) -> Optional[ModelT]:
+        if self.enabled and self.backend.blocking:  # type: ignore[union-attr]
+            return await run_in_threadpool(self.get, entity_id, schema)
+        return self.get(entity_id, schema)
+
+    async def aset(self, entity_id: Any, model: BaseModel) -> None:
+        if self.enabled and self.backend.blocking:  # type: ignore[union-attr]
+            await run_in_threadpool(self.set, entity_id, model)
+        else:
+            self.set(entity_id, model)
+
+    async def ainvalidate(self, *entity_ids: Any) -> None:
+        if self.enabled and self.backend.blocking:  # type: ignore[union-attr]
+            await run_in_threadpool(self.invalidate, *entity_ids)
+        else:
+            self.invalidate(*entity_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the health endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "size": len(self.backend)
+            if isinstance(self.backend, MemoryCache)
+            else None,
+        }
+
+
+class TokenCache:
+    """Users behind verified access tokens, keyed by the token's SHA-256.
+
+    Entries live for ``ttl`` seconds at most and never past the token's own
+    expiry. The cache is always in-process: a shared backend would put a
+    network round trip back on every authenticated request. Entries are
+    indexed by user so that deactivating or deleting a user drops all of
+    their tokens in this worker; other workers catch up within ``ttl``.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = MemoryCache(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._keys_by_user: Dict[Any, Set[str]] = {}
+        self._indexed = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        # Raw tokens are credentials; only their digest is kept in memory
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """User cached for ``token``, or ``None`` on a miss."""
+        if not self.enabled:
+            return None
+
+        value = self.backend.get(self._key(token))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, token: str, user_id: Any, user: Any, expires_at: float) -> None:
+        """Cache ``user`` for ``token`` until ``expires_at`` (a UNIX time)."""
+        ttl = min(self.ttl, expires_at - time.time())
+        if not self.enabled or ttl <= 0:
+            return
+
+        key = self._key(token)
+        self.backend.set(key, user, ttl)
+        with self._lock:
+            keys = self._keys_by_user.setdefault(user_id, set())
+            if key not in keys:
+                keys.add(key)
+                self._indexed += 1
+            # Evicted and expired entries leave keys behind in the index
+            if self._indexed > 2 * self.max_entries:
+                self._prune()
+
+    def _prune(self) -> None:
+        for user_id, keys in list(self._keys_by_user.items()):
+            keys.intersection_update(key for key in list(keys) if key in self.backend)
+            if not keys:
+                del self._keys_by_user[user_id]
+        self._indexed = sum(len(keys) for keys in self._keys_by_user.values())
+
+    def invalidate_user(self, *user_ids: Any) -> None:
+        """Drop every cached token of users that were changed or deleted."""
+        with self._lock:
+            for user_id in user_ids:
+                keys = self._keys_by_user.pop(user_id, set())
+                self._indexed -= len(keys)
+                for key in keys:
+                    if key in self.backend:
+                        self.backend.delete(key)
+                        self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the health endpoint."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "size": len(self.backend),
+        }
+
+
+def build_cache(name: str, ttl: float, max_entries: int) -> EntityCache:
+    """Create the cache for one model from the configured backend."""
+    if ttl <= 0:
+        return EntityCache(name, None, ttl)
+
+    backend: CacheBackend
+    if settings.cache_backend == "redis":
+        backend = RedisCache(settings.cache_redis_url, prefix="{{project_name}}:")
+    else:
+        backend = MemoryCache(max_entries)
+    return EntityCache(name, backend, ttl)
+
+
+item_cache = build_cache(
+    "item", settings.cache_item_ttl, settings.cache_item_max_entries
+)
+user_cache = build_cache(
+    "user", settings.cache_user_ttl, settings.cache_user_max_entries
+)
+
+token_cache = TokenCache(
+    settings.auth_token_cache_max_entries, settings.auth_token_cache_ttl
+)
+
+caches: Dict[str, Union[EntityCache, TokenCache]] = {
+    "item": item_cache,
+    "user": user_cache,
+    "token": token_cache,
+}
+
+
+def cache_status() -> Dict[str, Dict[str, Any]]:
+    """Counters for every cache."""
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,198 @@
+"""Response compression with gzip and brotli.
+
+``CompressionMiddleware`` picks an encoding from the request's
+``Accept-Encoding``: brotli when the client accepts it and the ``brotli``
+extra is installed, gzip otherwise, honouring the client's q-values. Then:
+
+* a complete response of at least ``compression_minimum_size`` bytes is
+  compressed in one go, smaller ones are sent as they are;
+* a streaming response (the exports) is compressed chunk by chunk, with a
+  flush after each chunk so the client still receives rows as they are read.
+
+Responses that already have a ``Content-Encoding``, a content type that does
+not compress well, or no body (``HEAD``, ``204``, ``304``) pass through.
+"""
+
+import zlib
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+# Content types worth compressing; anything else (images, archives) is not
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+)
+
+NO_BODY_STATUSES = frozenset({204, 304})
+
+
+class Encoder(Protocol):
+    def chunk(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush it, so it can be decoded on arrival."""
+        ...
+
+    def finish(self, data: bytes) -> bytes:
+        """Compress the last ``data`` and end the stream."""
+        ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        import brotli
+
+        self._brotli = brotli.Compressor(quality=quality)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.finish()
+
+
+def brotli_available() -> bool:
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """Encoding to use for an ``Accept-Encoding`` header, or ``None``.
+
+    ``available`` is in order of preference, which breaks ties between
+    encodings the client accepts equally.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name.strip():
+            weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class CompressionMiddleware:
+    """Compress response bodies with the best encoding the client accepts."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        gzip_level: Optional[int] = None,
+        brotli_quality: Optional[int] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            settings.compression_minimum_size if minimum_size is None else minimum_size
+        )
+        # Encoders in order of preference
+        self.encoders: Dict[str, Callable[[], Encoder]] = {}
+        if brotli_available():
+            self.encoders["br"] = partial(
+                BrotliEncoder,
+                settings.compression_brotli_quality
+                if brotli_quality is None
+                else brotli_quality,
+            )
+        self.encoders["gzip"] = partial(
+            GzipEncoder,
+            settings.compression_gzip_level if gzip_level is None else gzip_level,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The start message is held back until the first body chunk shows
+        # whether the response is small, complete or streaming
+        start: Optional[Message] = None
+        encoder: Optional[Encoder] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder
+            if message["type"] == "http.response.start":
+                if message["status"] not in NO_BODY_STATUSES and is_compressible(
+                    Headers(raw=message["headers"])
+                ):
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if not more_body and len(body) < self.minimum_size:
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+
+                encoder = self.encoders[encoding]()
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    body = encoder.chunk(body)
+                else:
+                    body = encoder.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                await send({**start, "headers": headers.raw})
+                start = None
+                message = {**message, "body": body}
+            elif message["type"] == "http.response.body" and encoder is not None:
+                body = message.get("body", b"")
+                if message.get("more_body", False):
+                    body = encoder.chunk(body)
+                else:
+                    body = encoder.finish(body)
+                message = {**message, "body": body}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
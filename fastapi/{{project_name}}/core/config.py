@@ -1,7 +1,7 @@
 """Application configuration settings."""
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -19,7 +19,28 @@ class Settings(BaseSettings):
     # Server settings
     host: str = Field(default="127.0.0.1", description="Host to bind the server to")
     port: int = Field(default=8000, description="Port to bind the server to")
-    debug: bool = Field(default=True, description="Enable debug mode")
+    debug: bool = Field(
+        default=False, description="Enable debug mode (reloads the dev server)"
+    )
+
+    # Production server settings (python -m {{project_name}}.server)
+    server_workers: Optional[int] = Field(
+        default=None,
+        description="Worker processes (defaults to the CPUs the container may use)",
+    )
+    server_max_requests: int = Field(
+        default=10000, description="Requests a worker serves before it is recycled"
+    )
+    server_max_requests_jitter: int = Field(
+        default=1000,
+        description="Up to this many extra requests, so workers recycle apart",
+    )
+    server_graceful_timeout: int = Field(
+        default=30, description="Seconds a stopping worker lets requests finish"
+    )
+    server_keepalive: int = Field(
+        default=5, description="Seconds an idle keep-alive connection stays open"
+    )
 
     # CORS settings
     cors_origins: List[str] = Field(
@@ -35,8 +56,215 @@ class Settings(BaseSettings):
     database_echo: bool = Field(
         default=False, description="Enable SQLAlchemy query logging"
     )
+    database_async: bool = Field(
+        default=False,
+        description="Use the asyncio engine and async route handlers",
+    )
+    async_database_url: Optional[str] = Field(
+        default=None,
+        description="Async driver URL (derived from database_url when unset)",
+    )
+    database_check_schema: bool = Field(
+        default=True,
+        description="Refuse to start unless the schema is at the latest migration",
+    )
+
+    # Read replica settings (reads go to the primary when no replica is set)
+    database_replica_urls: List[str] = Field(
+        default=[], description="Read replica URLs for GET handlers"
+    )
+    database_replica_selection: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin", description="How a read picks its replica"
+    )
+    read_your_writes_seconds: float = Field(
+        default=5.0,
+        description="Seconds a client reads from the primary after a write",
+    )
+
+    # Connection pool settings
+    database_pool_class: Literal["queue", "null"] = Field(
+        default="queue",
+        description="Connection pool type; use 'null' behind PgBouncer",
+    )
+    database_pool_size: int = Field(
+        default=5, description="Connections kept open in the pool"
+    )
+    database_max_overflow: int = Field(
+        default=10, description="Extra connections allowed beyond the pool size"
+    )
+    database_pool_timeout: float = Field(
+        default=30.0, description="Seconds to wait for a pooled connection"
+    )
+    database_pool_recycle: int = Field(
+        default=-1, description="Recycle connections after this many seconds"
+    )
+    database_pool_pre_ping: bool = Field(
+        default=False, description="Test connections for liveness on checkout"
+    )
+
+    # Total counts for list pages (include_total=estimate)
+    count_estimate_ttl: float = Field(
+        default=30.0, description="Seconds an estimated total is cached"
+    )
+    count_estimate_exact_below: int = Field(
+        default=1000, description="Estimates below this are counted exactly"
+    )
+    count_estimate_max_entries: int = Field(
+        default=1000, description="Estimated totals cached per worker"
+    )
+
+    # Bulk endpoint settings
+    bulk_max_rows: int = Field(
+        default=10000, description="Maximum rows accepted by a bulk request"
+    )
+    bulk_chunk_size: int = Field(
+        default=500, description="Rows written per bulk SQL statement"
+    )
+
+    # Write-behind item creation (POST /items with "Prefer: respond-async")
+    write_behind_enabled: bool = Field(
+        default=False,
+        description="Queue items posted with Prefer: respond-async (202)",
+    )
+    write_behind_batch_size: int = Field(
+        default=500, description="Queued rows that trigger a flush"
+    )
+    write_behind_flush_interval_ms: float = Field(
+        default=50, description="Longest a queued row waits for its flush"
+    )
+    write_behind_max_queue: int = Field(
+        default=10000, description="Rows held in memory before producers wait"
+    )
+    write_behind_enqueue_timeout: float = Field(
+        default=1.0, description="Seconds a producer waits for room before a 503"
+    )
+    write_behind_shutdown_timeout: float = Field(
+        default=10.0, description="Seconds shutdown waits to flush queued rows"
+    )
+
+    # Export settings
+    export_batch_size: int = Field(
+        default=1000, description="Rows fetched per server-side cursor batch"
+    )
+
+    # Load shedding settings (/health/* is never limited)
+    concurrency_limit: Optional[int] = Field(
+        default=None,
+        description=(
+            "Requests a route serves at once (0 unlimited; defaults to the pool "
+            "size plus overflow)"
+        ),
+    )
+    concurrency_limits: Dict[str, int] = Field(
+        default={},
+        description='Per-route limits, e.g. {"GET /api/v1/items/export": 2}',
+    )
+    concurrency_queue_timeout: float = Field(
+        default=1.0, description="Seconds a request waits for a slot before a 503"
+    )
+    concurrency_max_queue: int = Field(
+        default=100, description="Requests queued per route before shedding at once"
+    )
+    rate_limit_per_second: float = Field(
+        default=0, description="Requests per second per client (0 disables)"
+    )
+    rate_limit_burst: int = Field(
+        default=20, description="Requests a client may send in a burst"
+    )
+    rate_limit_max_clients: int = Field(
+        default=10000, description="Clients tracked by the rate limiter per worker"
+    )
+
+    # Readiness probes (run in the background; /health/ready reads the results)
+    health_probe_interval: float = Field(
+        default=5.0, description="Seconds between dependency checks"
+    )
+    health_probe_timeout: float = Field(
+        default=2.0, description="Seconds a dependency check may take"
+    )
+    health_probe_max_age: float = Field(
+        default=15.0, description="Age in seconds past which a result is stale"
+    )
+    health_min_pool_headroom: float = Field(
+        default=0.1,
+        description="Share of the pool that must be free for it to be healthy",
+    )
+    health_max_replica_lag: float = Field(
+        default=30.0, description="Replication lag in seconds a replica may have"
+    )
+
+    # Request coalescing
+    singleflight_enabled: bool = Field(
+        default=True,
+        description="Serve concurrent identical reads from one query",
+    )
+
+    # Response compression settings (brotli needs the brotli extra)
+    compression_enabled: bool = Field(
+        default=True, description="Compress responses with gzip or brotli"
+    )
+    compression_minimum_size: int = Field(
+        default=1024, description="Smallest response body, in bytes, to compress"
+    )
+    compression_gzip_level: int = Field(
+        default=6, ge=1, le=9, description="gzip level (1 fastest, 9 smallest)"
+    )
+    compression_brotli_quality: int = Field(
+        default=4, ge=0, le=11, description="brotli quality (0 fastest, 11 smallest)"
+    )
+
+    # Entity cache settings (a TTL of 0 disables the cache for that model)
+    cache_backend: Literal["memory", "redis"] = Field(
+        default="memory", description="Entity cache backend"
+    )
+    cache_redis_url: str = Field(
+        default="redis://localhost:6379/0", description="Redis cache URL"
+    )
+    cache_redis_timeout: float = Field(
+        default=0.1, description="Redis socket timeout in seconds"
+    )
+    cache_item_ttl: float = Field(
+        default=0, description="Seconds an item stays cached"
+    )
+    cache_item_max_entries: int = Field(
+        default=10000, description="Items kept by the in-process cache"
+    )
+    cache_user_ttl: float = Field(
+        default=0, description="Seconds a user stays cached"
+    )
+    cache_user_max_entries: int = Field(
+        default=10000, description="Users kept by the in-process cache"
+    )
+
+    # Observability settings
+    metrics_enabled: bool = Field(
+        default=True, description="Record request metrics and serve /metrics"
+    )
+    slow_query_threshold_ms: float = Field(
+        default=200, description="Log statements slower than this (0 disables)"
+    )
+    n_plus_one_threshold: int = Field(
+        default=10,
+        description="Log a statement repeated this often in one request (0 disables)",
+    )
 
     # Security settings
+    password_bcrypt_rounds: int = Field(
+        default=12,
+        ge=4,
+        le=31,
+        description="bcrypt work factor; stored hashes are upgraded on login",
+    )
+    password_hash_workers: Optional[int] = Field(
+        default=None,
+        description="Threads hashing passwords (defaults to the CPU count)",
+    )
+    password_hash_max_queue: int = Field(
+        default=100, description="Hashes waiting for a thread before shedding at once"
+    )
+    password_hash_queue_timeout: float = Field(
+        default=5.0, description="Seconds a hash waits for a thread before a 503"
+    )
     secret_key: str = Field(
         default="your-secret-key-change-in-production",
         description="Secret key for JWT tokens",
@@ -45,6 +273,13 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(
         default=30, description="Access token expiration time in minutes"
     )
+    auth_token_cache_ttl: float = Field(
+        default=60,
+        description="Seconds a verified token's user stays cached (0 disables)",
+    )
+    auth_token_cache_max_entries: int = Field(
+        default=10000, description="Verified tokens kept per worker"
+    )
 
 
 @lru_cache()
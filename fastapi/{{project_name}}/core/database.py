@@ -1,11 +1,33 @@
 """Database configuration and connection management."""
 
-from typing import Generator
+from pathlib import Path
+from typing import Any, AsyncGenerator, Callable, Generator, Optional, TypeVar
 
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .pool import instrument_engine, pool_options
+from .queries import track_queries
+from .replicas import ReplicaSet, reads_from_primary
+
+T = TypeVar("T")
+E = TypeVar("E", Engine, AsyncEngine)
+
+# Async drivers used when deriving the async URL from ``database_url``
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
 
 
 class Base(DeclarativeBase):
@@ -14,10 +36,30 @@ class Base(DeclarativeBase):
     pass
 
 
+def get_async_database_url(database_url: Optional[str] = None) -> str:
+    """Get the async driver URL for the configured database (or ``database_url``)."""
+    if database_url is None:
+        if settings.async_database_url:
+            return settings.async_database_url
+        database_url = settings.database_url
+
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for database backend '{backend}'")
+
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
 engine = create_engine(
     settings.database_url,
     echo=settings.database_echo,
+    **pool_options(),
 )
+instrument_engine("primary", engine)
+track_queries(engine)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -26,6 +68,50 @@ SessionLocal = sessionmaker(
 )
 
 
+def _build_replicas(build: Callable[[str], E], suffix: str = "") -> ReplicaSet[E]:
+    """Create, instrument and track an engine per configured replica URL."""
+    engines = []
+    for index, url in enumerate(settings.database_replica_urls):
+        replica = build(url)
+        engines.append((replica, instrument_engine(f"replica_{index}{suffix}", replica)))
+        track_queries(replica)
+    return ReplicaSet(engines, settings.database_replica_selection)
+
+
+replicas: ReplicaSet[Engine] = _build_replicas(
+    lambda url: create_engine(url, echo=settings.database_echo, **pool_options())
+)
+
+# The async engine is only built in async mode so the async driver stays optional
+async_engine: Optional[AsyncEngine] = None
+AsyncSessionLocal: Optional[async_sessionmaker[AsyncSession]] = None
+async_replicas: ReplicaSet[AsyncEngine] = ReplicaSet()
+
+if settings.database_async:
+    async_engine = create_async_engine(
+        get_async_database_url(),
+        echo=settings.database_echo,
+        **pool_options(use_async=True),
+    )
+    instrument_engine("primary_async", async_engine)
+    track_queries(async_engine)
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+    async_replicas = _build_replicas(
+        lambda url: create_async_engine(
+            get_async_database_url(url),
+            echo=settings.database_echo,
+            **pool_options(use_async=True),
+        ),
+        suffix="_async",
+    )
+
+
 def get_db() -> Generator[Session, None, None]:
     """Get database session."""
     session = SessionLocal()
@@ -35,10 +121,134 @@ def get_db() -> Generator[Session, None, None]:
         session.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled (set DATABASE_ASYNC=true)")
+
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def read_engine(request: Request) -> Engine:
+    """Engine for a read: a replica, unless the client needs the primary.
+
+    Clients that wrote within ``read_your_writes_seconds`` read from the
+    primary, so they always see their own writes.
+    """
+    replica = None if reads_from_primary(request) else replicas.choose()
+    return engine if replica is None else replica
+
+
+def async_read_engine(request: Request) -> AsyncEngine:
+    """Async engine for a read (see ``read_engine``)."""
+    if async_engine is None:
+        raise RuntimeError("Async database mode is disabled (set DATABASE_ASYNC=true)")
+
+    replica = None if reads_from_primary(request) else async_replicas.choose()
+    return async_engine if replica is None else replica
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Get a read-only database session, on a replica when one is configured."""
+    session = SessionLocal(bind=read_engine(request))
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Get a read-only async database session (see ``get_read_db``)."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled (set DATABASE_ASYNC=true)")
+
+    async with AsyncSessionLocal(bind=async_read_engine(request)) as session:
+        yield session
+
+
+def on_primary(session: Any) -> bool:
+    """Whether ``session`` (sync or async) reads from the primary."""
+    return session.bind is not None and session.bind in (engine, async_engine)
+
+
+async def run_in_session(fn: Callable[..., T], *args: Any) -> T:
+    """Call ``fn(session, *args)`` with a short-lived session of either mode.
+
+    For async code that is shared by both database modes and only needs the
+    database briefly: async mode runs ``fn`` through ``AsyncSession.run_sync``,
+    sync mode runs it on the threadpool. ``fn`` commits its own writes.
+    """
+    if settings.database_async:
+        if AsyncSessionLocal is None:
+            raise RuntimeError("Async database mode has no session factory")
+        async with AsyncSessionLocal() as session:
+            return await session.run_sync(fn, *args)
+
+    def call() -> T:
+        with SessionLocal() as session:
+            return fn(session, *args)
+
+    return await run_in_threadpool(call)
+
+
+async def dispose_engines() -> None:
+    """Close the pooled connections of every engine (on shutdown)."""
+    for sync_engine in (engine, *replicas.engines):
+        sync_engine.dispose()
+    for aengine in (async_engine, *async_replicas.engines):
+        if aengine is not None:
+            await aengine.dispose()
+
+
+def forget_inherited_connections() -> None:
+    """Drop pooled connections inherited from a parent process.
+
+    Called in a forked worker: the connections belong to the parent, so
+    they are dereferenced without being closed, and the worker opens its own.
+    """
+    for aengine in (async_engine, *async_replicas.engines):
+        if aengine is not None:
+            aengine.sync_engine.dispose(close=False)
+    for sync_engine in (engine, *replicas.engines):
+        sync_engine.dispose(close=False)
+
+
 def init_db() -> None:
-    """Initialize database tables."""
+    """Create the tables directly from the models (tests and benchmarks).
+
+    Deployed databases are managed with Alembic; see ``check_schema_revision``.
+    """
     # Import all models here to ensure they are registered
     from ..models.item import Item  # noqa: F401
     from ..models.user import User  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+
+
+# Alembic scripts, shipped inside the package so deployments can find them
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def check_schema_revision(bind: Optional[Engine] = None) -> str:
+    """Check that the database is migrated to the latest revision.
+
+    Costs a single read of ``alembic_version`` instead of the reflection
+    ``create_all`` does, and never changes the schema, so any number of
+    workers can start at once. Raises ``RuntimeError`` when the database is
+    behind (or ahead of) the migrations shipped with the application.
+    """
+    # Alembic is only needed here, keep it out of the import of the app
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    head = ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+    with (bind or engine).connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at revision {current or 'none'}, expected {head}; "
+            "run 'alembic upgrade head'"
+        )
+    return current
@@ -0,0 +1,80 @@
+"""Weak ETags and conditional request helpers.
+
+An entity's ETag is derived from its ``id`` and ``updated_at`` (falling back
+to ``created_at`` for rows never updated), so it can be computed from a
+cheap ``SELECT id, created_at, updated_at`` without loading or serializing
+the full row. A list ETag covers the IDs and versions of every row on the
+page, and the list's total when the client asked for one. Only weak ETags are issued, as a version says nothing about the bytes
+of a representation (compression, for one, changes them).
+
+``If-None-Match`` uses the weak comparison, as RFC 9110 specifies.
+``If-Match`` does too, which RFC 9110 does not allow: it requires the strong
+comparison, under which a weak ETag never matches. ``check_weak_if_match``
+is therefore a version check for optimistic concurrency, not a
+spec-compliant ``If-Match``; clients send back the ETag they last read.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import HTTPException, Response, status
+
+ETAG_HEADER = "ETag"
+
+
+def _version(row: Any) -> str:
+    updated_at: Optional[datetime] = row.updated_at
+    return f"{row.id}:{(updated_at or row.created_at).isoformat()}"
+
+
+def _weak(payload: str) -> str:
+    return f'W/"{hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()}"'
+
+
+def entity_etag(row: Any) -> str:
+    """ETag for one row (ORM object, column row or response model)."""
+    return _weak(_version(row))
+
+
+def list_etag(rows: Iterable[Any], total: Optional[int] = None) -> str:
+    """ETag for a page of rows, and the total of the list if counted."""
+    payload = ",".join(_version(row) for row in rows)
+    if total is not None:
+        payload += f"#{total}"
+    return _weak(payload)
+
+
+def weak_etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weakly compare ``etag`` with an ``If-None-Match`` (or ``If-Match``) header."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Empty ``304 Not Modified`` response."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={ETAG_HEADER: etag, **(headers or {})},
+    )
+
+
+def check_weak_if_match(header: Optional[str], etag: str) -> None:
+    """Reject a write whose ``If-Match`` version no longer matches, weakly.
+
+    Not RFC 9110 ``If-Match``, which compares strongly (see the module
+    docstring).
+    """
+    if header is not None and not weak_etag_matches(header, etag):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Resource has been modified",
+        )
@@ -0,0 +1,233 @@
+"""Request and database metrics in Prometheus text format.
+
+``MetricsMiddleware`` times every request and files it under its route
+template (``/api/v1/items/{item_id}``, never the raw path, so label
+cardinality stays bounded). Statement counts and DB time come from the
+request's ``QueryTracker`` (see ``core.queries``).
+
+Request metrics are only updated from the event loop thread, once per
+request, so they are plain integer and float fields without locks.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import cache_status
+from .pool import pool_status
+from .probes import OK, probe_status
+from .queries import current_tracker, route_template
+from .singleflight import flights
+from .writebehind import write_behind_status
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds in seconds; the implicit last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class Histogram:
+    """Fixed-bucket histogram."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """``(le, count)`` pairs in Prometheus' cumulative form."""
+        total = 0
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts, strict=True):
+            total += count
+            yield str(bound), total
+
+
+class RouteMetrics:
+    """Counters for one ``(method, route)`` pair."""
+
+    __slots__ = ("latency", "db_latency", "db_statements", "statuses")
+
+    def __init__(self) -> None:
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_latency = Histogram(LATENCY_BUCKETS)
+        self.db_statements = Histogram(STATEMENT_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+# Only touched on the event loop, which is what keeps them consistent
+routes: Dict[Tuple[str, str], RouteMetrics] = {}
+in_flight: Dict[str, int] = {}
+
+
+class MetricsMiddleware:
+    """Record latency, status and database usage per route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_flight[method] = in_flight.get(method, 0) + 1
+        tracker = current_tracker.get()
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight[method] -= 1
+
+            key = (method, route_template(scope))
+            metrics = routes.get(key)
+            if metrics is None:
+                metrics = routes[key] = RouteMetrics()
+            metrics.latency.observe(elapsed)
+            if tracker is not None:
+                metrics.db_latency.observe(tracker.seconds)
+                metrics.db_statements.observe(tracker.statements)
+            metrics.statuses[status_code] = metrics.statuses.get(status_code, 0) + 1
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: List[str], name: str, help_text: str, attribute: str) -> None:
+    _header(lines, name, "histogram", help_text)
+    for (method, route), metrics in sorted(routes.items()):
+        histogram: Histogram = getattr(metrics, attribute)
+        labels = _labels(method=method, route=route)
+        for le, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {sum(histogram.counts)}")
+
+
+def render_metrics() -> str:
+    """Every metric in the Prometheus text exposition format.
+
+    Call it from the event loop: the route metrics are read without a lock.
+    """
+    lines: List[str] = []
+
+    _header(lines, "http_requests_total", "counter", "Requests by route and status.")
+    for (method, route), metrics in sorted(routes.items()):
+        for status_code, count in sorted(metrics.statuses.items()):
+            labels = _labels(method=method, route=route, status=status_code)
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+    _header(lines, "http_requests_in_flight", "gauge", "Requests being served.")
+    for method, count in sorted(in_flight.items()):
+        lines.append(f"http_requests_in_flight{{{_labels(method=method)}}} {count}")
+
+    _histogram(
+        lines,
+        "http_request_duration_seconds",
+        "Request latency by route.",
+        "latency",
+    )
+    _histogram(
+        lines,
+        "http_request_db_duration_seconds",
+        "Time spent executing SQL per request.",
+        "db_latency",
+    )
+    _histogram(
+        lines,
+        "http_request_db_statements",
+        "SQL statements executed per request.",
+        "db_statements",
+    )
+
+    pools = pool_status()
+    for field, kind, help_text in (
+        ("checked_out", "gauge", "Connections checked out of the pool."),
+        ("overflow", "gauge", "Connections open beyond the pool size."),
+        ("checkouts", "counter", "Connection checkouts."),
+        ("timeouts", "counter", "Checkouts that timed out."),
+    ):
+        name = f"db_pool_{field}" + ("_total" if kind == "counter" else "")
+        _header(lines, name, kind, help_text)
+        for pool, snapshot in sorted(pools.items()):
+            lines.append(f"{name}{{{_labels(pool=pool)}}} {snapshot[field]}")
+
+    caches = cache_status()
+    for field in ("hits", "misses", "evictions"):
+        name = f"cache_{field}_total"
+        _header(lines, name, "counter", f"Cache {field}.")
+        for cache, stats in sorted(caches.items()):
+            lines.append(f"{name}{{{_labels(cache=cache)}}} {stats[field]}")
+
+    coalescing = flights.status()
+    for field, help_text in (
+        ("leaders", "Reads that ran their query."),
+        ("coalesced", "Reads served by a concurrent identical read."),
+    ):
+        name = f"singleflight_{field}_total"
+        _header(lines, name, "counter", help_text)
+        for route, counts in sorted(coalescing.items()):
+            lines.append(f"{name}{{{_labels(route=route)}}} {counts[field]}")
+
+    queues = write_behind_status()
+    _header(lines, "write_behind_queued_rows", "gauge", "Rows waiting to be written.")
+    for queue, stats in sorted(queues.items()):
+        lines.append(
+            f"write_behind_queued_rows{{{_labels(queue=queue)}}} {stats['queued']}"
+        )
+    for field, help_text in (
+        ("accepted", "Rows queued."),
+        ("written", "Rows inserted."),
+        ("dropped", "Rows the database rejected or shutdown lost."),
+        ("rejected", "Rows refused because the queue was full."),
+    ):
+        name = f"write_behind_{field}_rows_total"
+        _header(lines, name, "counter", help_text)
+        for queue, stats in sorted(queues.items()):
+            lines.append(f"{name}{{{_labels(queue=queue)}}} {stats[field]}")
+    for field, help_text in (
+        ("flushes", "Batches written."),
+        ("failures", "Batch writes that failed and were retried."),
+    ):
+        name = f"write_behind_{field}_total"
+        _header(lines, name, "counter", help_text)
+        for queue, stats in sorted(queues.items()):
+            lines.append(f"{name}{{{_labels(queue=queue)}}} {stats[field]}")
+
+    dependencies = probe_status()
+    _header(lines, "health_dependency_up", "gauge", "Dependency checked ok.")
+    for dependency, result in sorted(dependencies.items()):
+        up = int(result["status"] == OK)
+        lines.append(f"health_dependency_up{{{_labels(dependency=dependency)}}} {up}")
+    _header(lines, "health_dependency_age_seconds", "gauge", "Age of the last check.")
+    for dependency, result in sorted(dependencies.items()):
+        labels = _labels(dependency=dependency)
+        age = result["age_seconds"]
+        lines.append(f"health_dependency_age_seconds{{{labels}}} {age}")
+
+    lines.append("")
+    return "\n".join(lines)
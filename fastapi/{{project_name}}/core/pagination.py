@@ -0,0 +1,103 @@
+"""Keyset (cursor) pagination helpers.
+
+Pages are ordered by a tuple of key columns, e.g. ``(created_at, id)``. The
+cursor is an opaque, URL-safe encoding of the last row's key values, and the
+next page is fetched with ``WHERE (created_at, id) > (:created_at, :id)`` so
+the database can seek straight into the matching composite index instead of
+scanning and discarding ``skip`` rows. Descending pages use ``<`` and walk
+the same index backwards.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode key values into an opaque cursor."""
+    payload = [_json_value(value) for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, columns: Sequence[InstrumentedAttribute[Any]]
+) -> Tuple[Any, ...]:
+    """Decode a cursor into key values for ``columns``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(payload, list):
+            raise ValueError("cursor does not match the sort key")
+
+        values = []
+        # A cursor for another sort key has a different number of values
+        for column, value in zip(columns, payload, strict=True):
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif column.type.python_type is Decimal:
+                value = Decimal(value)
+            elif not isinstance(value, column.type.python_type):
+                raise ValueError("cursor value has the wrong type")
+            values.append(value)
+    except (binascii.Error, InvalidOperation, TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        ) from exc
+
+    return tuple(values)
+
+
+def paginate(
+    stmt: Select[Any],
+    columns: Sequence[InstrumentedAttribute[Any]],
+    skip: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> Select[Any]:
+    """Order ``stmt`` by ``columns`` and restrict it to one page.
+
+    With a cursor the page starts after the encoded row (keyset mode);
+    otherwise ``skip`` rows are skipped (offset mode).
+    """
+    if descending:
+        stmt = stmt.order_by(*(column.desc() for column in columns))
+    else:
+        stmt = stmt.order_by(*columns)
+    stmt = stmt.limit(limit)
+
+    if cursor is None:
+        return stmt.offset(skip)
+
+    key, after = tuple_(*columns), tuple_(*decode_cursor(cursor, columns))
+    return stmt.where(key < after if descending else key > after)
+
+
+def next_cursor(
+    rows: Sequence[Any], columns: Sequence[InstrumentedAttribute[Any]], limit: int
+) -> Optional[str]:
+    """Cursor for the page after ``rows``, or ``None`` on the last page."""
+    if not rows or len(rows) < limit:
+        return None
+
+    last = rows[-1]
+    return encode_cursor([getattr(last, column.key) for column in columns])
@@ -0,0 +1,158 @@
+"""Connection pool configuration and live pool metrics."""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Union
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from .config import settings
+
+
+class PoolMetrics:
+    """Checkout counters and wait times for one engine's connection pool."""
+
+    def __init__(self, engine: Engine, window: int = 1000) -> None:
+        self.engine = engine
+        self.checked_out = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def on_connect(self, *_: Any) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def on_checkout(self, *_: Any) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def on_checkin(self, *_: Any) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool state, with wait times over the recent checkout window."""
+        pool = self.engine.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            checked_out = self.checked_out
+            checkouts = self.checkouts
+            timeouts = self.timeouts
+            opened = self.connections_opened
+
+        def wait_ms(pct: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[int(pct * (len(waits) - 1))] * 1000, 3)
+
+        return {
+            "pool_class": type(pool).__name__,
+            "size": pool.size() if isinstance(pool, QueuePool) else 0,
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "connections_opened": opened,
+            "wait_ms_avg": round(sum(waits) / len(waits) * 1000, 3) if waits else 0.0,
+            "wait_ms_p99": wait_ms(0.99),
+            "wait_ms_max": wait_ms(1.0),
+        }
+
+
+class _TimedCheckoutMixin:
+    """Measure how long callers wait for a connection from the pool.
+
+    Pool events only fire once a connection has been handed out, so the wait
+    itself is timed around ``Pool.connect``.
+    """
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self) -> Any:
+        metrics = self.metrics
+        if metrics is None:
+            return super().connect()  # type: ignore[misc]
+
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            metrics.observe_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self) -> Pool:
+        pool = super().recreate()  # type: ignore[misc]
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    """QueuePool that records checkout wait times."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout wait times."""
+
+
+class TimedNullPool(_TimedCheckoutMixin, NullPool):
+    """NullPool that records connection setup times."""
+
+
+def pool_options(use_async: bool = False) -> Dict[str, Any]:
+    """Engine keyword arguments for the configured pool."""
+    options: Dict[str, Any] = {"pool_pre_ping": settings.database_pool_pre_ping}
+
+    if settings.database_pool_class == "null":
+        # Behind PgBouncer the pooler owns the connections
+        options["poolclass"] = TimedNullPool
+        return options
+
+    options.update(
+        poolclass=TimedAsyncAdaptedQueuePool if use_async else TimedQueuePool,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=settings.database_pool_timeout,
+        pool_recycle=settings.database_pool_recycle,
+    )
+    return options
+
+
+# Metrics for every instrumented engine, keyed by a descriptive name
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(name: str, engine: Union[Engine, AsyncEngine]) -> PoolMetrics:
+    """Attach pool event listeners to ``engine`` and register its metrics."""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    metrics = PoolMetrics(sync_engine)
+
+    event.listen(sync_engine, "connect", metrics.on_connect)
+    event.listen(sync_engine, "checkout", metrics.on_checkout)
+    event.listen(sync_engine, "checkin", metrics.on_checkin)
+    if isinstance(sync_engine.pool, _TimedCheckoutMixin):
+        sync_engine.pool.metrics = metrics
+
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def pool_status() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every registered pool."""
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
@@ -0,0 +1,265 @@
+"""Background dependency probes behind ``/health/ready``.
+
+Every worker checks its dependencies every ``health_probe_interval``
+seconds, from a task started by the lifespan:
+
+* ``database``: a ``SELECT 1`` on the primary. Critical: the worker is not
+  ready while it fails.
+* ``pool``: the share of the primary's connection pool that is free, from the
+  pool metrics. Degraded below ``health_min_pool_headroom``.
+* ``replica_<n>``: a ``SELECT 1`` on each read replica and, on PostgreSQL,
+  its replication lag. Degraded past ``health_max_replica_lag`` seconds.
+
+``/health/ready`` only reads the last results, so answering it costs no
+query and the probe traffic stays the same however often Kubernetes (or
+anything else) asks. A result older than ``health_probe_max_age`` is
+reported as ``stale``; a stale or failing critical dependency answers
+``503``, while a degraded one is reported but keeps the worker ready, as
+every worker would see the same degradation.
+
+Checks on sync engines run on the probes' own threads, one per engine, so
+they neither wait behind request handlers in the threadpool nor behind each
+other, and never pile up: while a check is still stuck, the next one reports
+the engine down instead of starting.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from . import database
+from .config import settings
+from .pool import pool_metrics
+
+logger = structlog.get_logger()
+
+OK = "ok"
+DEGRADED = "degraded"
+DOWN = "down"
+STALE = "stale"
+
+PING = text("SELECT 1")
+
+# Seconds since a PostgreSQL replica replayed its last transaction: 0 when it
+# has replayed everything it received, NULL on a primary
+REPLICATION_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+Result = Dict[str, Any]
+Check = Callable[[], Awaitable[Result]]
+
+
+def _query(conn: Connection, lag: bool) -> Optional[float]:
+    """Ping ``conn``; with ``lag``, also return its replication lag."""
+    conn.execute(PING)
+    if lag and conn.dialect.name == "postgresql":
+        value = conn.execute(REPLICATION_LAG).scalar()
+        return None if value is None else float(value)
+    return None
+
+
+def pool_headroom(snapshot: Dict[str, Any]) -> Optional[float]:
+    """Share of a pool's connections that are free, or ``None`` unbounded."""
+    if snapshot["size"] <= 0:
+        return None  # NullPool: a connection per checkout
+    capacity = snapshot["size"] + max(settings.database_max_overflow, 0)
+    return max(0.0, 1 - snapshot["checked_out"] / capacity)
+
+
+class HealthProbes:
+    """Dependency checks run on an interval, with their last results."""
+
+    def __init__(self, interval: float, timeout: float, max_age: float) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self.runs = 0
+        self._results: Dict[str, Result] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._threads = 0
+        self._pending: Dict[str, Future] = {}
+
+    async def start(self) -> None:
+        """Check once, so the worker starts with results, then keep checking."""
+        if self._task is not None:
+            return
+        await self.run_once()
+        self._task = asyncio.create_task(self._loop(), name="health-probes")
+
+    async def stop(self) -> None:
+        """Stop checking; a stopping worker is no longer ready."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        if self._executor is not None:
+            # A check stuck on the database is left to its connect timeout
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pending.clear()
+        self._results = {}
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                # Results age into "stale" until a later run succeeds
+                logger.exception("Health probes failed")
+
+    async def run_once(self) -> None:
+        """Run every check concurrently and replace the results."""
+        checks = self.checks()
+        results = await asyncio.gather(
+            *(self._check(name, critical, check) for name, critical, check in checks)
+        )
+        # Replaced at once, so readers never see a half-updated set
+        self._results = {
+            name: result for (name, _, _), result in zip(checks, results, strict=True)
+        }
+        self.runs += 1
+
+    def checks(self) -> List[Tuple[str, bool, Check]]:
+        """(name, critical, check) for the engines of the database mode in use."""
+        primary: Union[Engine, AsyncEngine, None]
+        if settings.database_async:
+            primary = database.async_engine
+            replicas: List[Any] = database.async_replicas.engines
+        else:
+            primary = database.engine
+            replicas = database.replicas.engines
+
+        checks: List[Tuple[str, bool, Check]] = []
+        # First, so it reads the pool before the ping checks a connection out
+        pool_name = "primary_async" if settings.database_async else "primary"
+        if pool_name in pool_metrics:
+            checks.append(("pool", False, self._pool_check(pool_name)))
+        if primary is not None:
+            checks.append(("database", True, self._ping_check("database", primary)))
+        for index, replica in enumerate(replicas):
+            name = f"replica_{index}"
+            checks.append((name, False, self._ping_check(name, replica, lag=True)))
+        return checks
+
+    async def _check(self, name: str, critical: bool, check: Check) -> Result:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"status": DOWN, "detail": f"No answer within {self.timeout:g}s"}
+        except Exception as exc:
+            logger.warning("Health probe failed", dependency=name, error=str(exc))
+            result = {"status": DOWN, "detail": f"{type(exc).__name__}: {exc}"}
+        return {
+            "critical": critical,
+            "checked_at": datetime.utcnow(),
+            "checked": time.monotonic(),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            **result,
+        }
+
+    def _ping_check(
+        self, name: str, engine: Union[Engine, AsyncEngine], lag: bool = False
+    ) -> Check:
+        async def check() -> Result:
+            if isinstance(engine, AsyncEngine):
+                async with engine.connect() as conn:
+                    lag_seconds = await conn.run_sync(_query, lag)
+            else:
+                lag_seconds = await self._in_thread(name, engine, lag)
+
+            result: Result = {"status": OK}
+            if lag:
+                result["lag_seconds"] = lag_seconds
+                max_lag = settings.health_max_replica_lag
+                if lag_seconds is not None and lag_seconds > max_lag:
+                    result["status"] = DEGRADED
+                    result["detail"] = f"Replication lag {lag_seconds:.1f}s"
+            return result
+
+        return check
+
+    def _pool_check(self, pool_name: str) -> Check:
+        async def check() -> Result:
+            headroom = pool_headroom(pool_metrics[pool_name].snapshot())
+            result: Result = {"status": OK, "headroom": headroom}
+            if headroom is not None and headroom < settings.health_min_pool_headroom:
+                result["status"] = DEGRADED
+                result["detail"] = f"{headroom:.0%} of the {pool_name} pool is free"
+            return result
+
+        return check
+
+    async def _in_thread(self, name: str, engine: Engine, lag: bool) -> Optional[float]:
+        pending = self._pending.get(name)
+        if pending is not None and not pending.done():
+            raise RuntimeError("The previous check has not finished")
+        # The primary and each replica
+        executor = self._executor_for(1 + len(database.replicas.engines))
+
+        def ping() -> Optional[float]:
+            with engine.connect() as conn:
+                return _query(conn, lag)
+
+        future = self._pending[name] = executor.submit(ping)
+        return await asyncio.wrap_future(future)
+
+    def _executor_for(self, engines: int) -> ThreadPoolExecutor:
+        """The probe threads, one per engine, replaced when the engines change."""
+        if self._executor is None or self._threads != engines:
+            if self._executor is not None:
+                # Checks still running keep their threads until they finish
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(
+                max_workers=engines, thread_name_prefix="health-probe"
+            )
+            self._threads = engines
+        return self._executor
+
+    def readiness(self) -> Tuple[str, Dict[str, Result]]:
+        """Overall status and each dependency's last result, aged."""
+        now = time.monotonic()
+        dependencies: Dict[str, Result] = {}
+        for name, result in self._results.items():
+            age = now - result["checked"]
+            reported = {key: value for key, value in result.items() if key != "checked"}
+            reported["age_seconds"] = round(age, 3)
+            if age > self.max_age:
+                reported["status"] = STALE
+            dependencies[name] = reported
+
+        if not dependencies:
+            return "starting", dependencies
+        if any(
+            dependency["critical"] and dependency["status"] in (DOWN, STALE)
+            for dependency in dependencies.values()
+        ):
+            return "not_ready", dependencies
+        if any(dependency["status"] != OK for dependency in dependencies.values()):
+            return "degraded", dependencies
+        return "ready", dependencies
+
+
+health_probes = HealthProbes(
+    interval=settings.health_probe_interval,
+    timeout=settings.health_probe_timeout,
+    max_age=settings.health_probe_max_age,
+)
+
+
+def probe_status() -> Dict[str, Result]:
+    """Last result of every dependency (for the metrics)."""
+    return health_probes.readiness()[1]
@@ -0,0 +1,212 @@
+"""Request-scoped SQL tracking: slow-query log and N+1 detection.
+
+``before/after_cursor_execute`` listeners on the engines time every
+statement and charge it to the ``QueryTracker`` of the active request,
+found through a context variable that also reaches sync handlers in the
+threadpool and the async engine's greenlets. Statements slower than
+``slow_query_threshold_ms`` are logged with the route and the shape (never
+the values) of their parameters; a statement fingerprint seen
+``n_plus_one_threshold`` times in one request is logged as a likely N+1.
+
+Tests can wrap requests in ``query_budget(...)`` to fail when a request runs
+more statements than expected or repeats one.
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Iterator, List, Optional, Set, Union
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+
+logger = structlog.get_logger()
+
+# Route label for requests that matched no route
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Longest statement text written to the log
+MAX_LOGGED_STATEMENT = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Expanded IN lists and multi-row VALUES vary in length between calls
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_PLACEHOLDER_LISTS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_VALUES_LISTS = re.compile(r"(VALUES \(\.\.\.\))(?:, \(\.\.\.\))+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and variable-length lists normalized."""
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _PLACEHOLDER_LISTS.sub("(...)", normalized)
+    return _VALUES_LISTS.sub(r"\1", normalized)
+
+
+def parameters_shape(parameters: Any) -> Any:
+    """Parameter names and types, without their values."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: one parameter set per row
+            return {"rows": len(parameters), "row": parameters_shape(parameters[0])}
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route that handled the request."""
+    # Newer FastAPI releases keep included routes unprefixed in scope["route"]
+    # and record the prefixed route separately
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get(
+        "route"
+    )
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class QueryTracker:
+    """Statements executed on behalf of one request."""
+
+    __slots__ = ("scope", "statements", "seconds", "repeats", "suspected_n_plus_one")
+
+    def __init__(self, scope: Optional[Scope] = None) -> None:
+        self.scope = scope
+        self.statements = 0
+        self.seconds = 0.0
+        self.repeats: Counter[str] = Counter()
+        self.suspected_n_plus_one: Set[str] = set()
+
+    @property
+    def route(self) -> Optional[str]:
+        return route_template(self.scope) if self.scope is not None else None
+
+    def record(self, statement: str, parameters: Any, elapsed: float) -> None:
+        self.statements += 1
+        self.seconds += elapsed
+
+        slow_ms = settings.slow_query_threshold_ms
+        if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+            logger.warning(
+                "Slow query",
+                duration_ms=round(elapsed * 1000, 3),
+                route=self.route,
+                statement=statement[:MAX_LOGGED_STATEMENT],
+                parameters=parameters_shape(parameters),
+            )
+
+        key = fingerprint(statement)
+        self.repeats[key] += 1
+        if self.repeats[key] == settings.n_plus_one_threshold:
+            self.suspected_n_plus_one.add(key)
+            logger.warning(
+                "Possible N+1 query",
+                route=self.route,
+                repeats=self.repeats[key],
+                statement=key[:MAX_LOGGED_STATEMENT],
+            )
+
+
+current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar(
+    "current_tracker", default=None
+)
+
+# Called with every finished request's tracker (see ``query_budget``)
+_observers: List[Callable[[QueryTracker], None]] = []
+
+
+def _before_cursor_execute(
+    _conn: Any, _cursor: Any, _statement: str, _parameters: Any, context: Any, *_: Any
+) -> None:
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(
+    _conn: Any, _cursor: Any, statement: str, parameters: Any, context: Any, *_: Any
+) -> None:
+    tracker = current_tracker.get()
+    if tracker is not None:
+        elapsed = time.perf_counter() - context._query_started
+        tracker.record(statement, parameters, elapsed)
+
+
+def track_queries(engine: Union[Engine, AsyncEngine]) -> None:
+    """Charge statements run on ``engine`` to the active request's tracker."""
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def tracking(scope: Optional[Scope] = None) -> Iterator[QueryTracker]:
+    """Track the statements executed inside the block."""
+    tracker = QueryTracker(scope)
+    token = current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        current_tracker.reset(token)
+        for observer in _observers:
+            observer(tracker)
+
+
+class QueryTrackingMiddleware:
+    """Give every HTTP request its own ``QueryTracker``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with tracking(scope):
+            await self.app(scope, receive, send)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more statements than its budget allows."""
+
+
+@contextmanager
+def query_budget(
+    max_statements: Optional[int] = None, max_repeats: Optional[int] = None
+) -> Iterator[List[QueryTracker]]:
+    """Fail if any request finished inside the block exceeds the budget.
+
+    ``max_statements`` caps the statements per request and ``max_repeats``
+    caps how often one statement fingerprint may run per request. Yields the
+    trackers of the requests seen so far.
+    """
+    seen: List[QueryTracker] = []
+    observer = seen.append
+    _observers.append(observer)
+    try:
+        yield seen
+    finally:
+        _observers.remove(observer)
+
+    for tracker in seen:
+        if max_statements is not None and tracker.statements > max_statements:
+            raise QueryBudgetExceeded(
+                f"{tracker.route} ran {tracker.statements} statements "
+                f"(budget {max_statements})"
+            )
+        if max_repeats is not None:
+            for statement, count in tracker.repeats.most_common(1):
+                if count > max_repeats:
+                    raise QueryBudgetExceeded(
+                        f"{tracker.route} ran the same statement {count} times "
+                        f"(budget {max_repeats}): {statement}"
+                    )
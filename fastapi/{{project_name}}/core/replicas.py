@@ -0,0 +1,107 @@
+"""Read replica selection and read-your-writes stickiness.
+
+GET handlers take their session from ``get_read_db`` (``get_async_read_db``
+in async mode), which binds it to a replica picked by ``ReplicaSet``:
+
+* ``round_robin`` cycles through the replicas;
+* ``least_connections`` picks the replica with the fewest checked-out
+  connections, as counted by the pool metrics.
+
+Replicas lag behind the primary, so a client that just wrote could read its
+own write back as missing. After a successful write, ``ReadYourWritesMiddleware``
+sets a short-lived cookie holding the time until which that client's reads
+stay on the primary. The cookie keeps the window working across workers
+without any shared state.
+"""
+
+import itertools
+import math
+import time
+from typing import Generic, List, Literal, Optional, Sequence, Tuple, TypeVar
+
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+from .pool import PoolMetrics
+
+E = TypeVar("E")
+
+Selection = Literal["round_robin", "least_connections"]
+
+STICKY_COOKIE = "read_primary_until"
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class ReplicaSet(Generic[E]):
+    """Engines of the read replicas with their pool metrics."""
+
+    def __init__(
+        self,
+        replicas: Sequence[Tuple[E, PoolMetrics]] = (),
+        selection: Selection = "round_robin",
+    ) -> None:
+        self.engines: List[E] = [engine for engine, _ in replicas]
+        self.metrics: List[PoolMetrics] = [metrics for _, metrics in replicas]
+        self.selection = selection
+        # itertools.count is atomic under the GIL
+        self._turns = itertools.count()
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def choose(self) -> Optional[E]:
+        """Replica for the next read, or ``None`` without replicas."""
+        if not self.engines:
+            return None
+
+        count = len(self.engines)
+        start = next(self._turns) % count
+        if self.selection == "least_connections":
+            # Ties rotate so that idle replicas share the load
+            index = min(
+                range(count),
+                key=lambda i: (self.metrics[i].checked_out, (i - start) % count),
+            )
+            return self.engines[index]
+        return self.engines[start]
+
+
+def reads_from_primary(conn: HTTPConnection) -> bool:
+    """Whether the client wrote recently enough to need the primary."""
+    try:
+        return float(conn.cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pin a client's reads to the primary for a while after it writes."""
+
+    def __init__(self, app: ASGIApp, window: Optional[float] = None) -> None:
+        self.app = app
+        self.window = settings.read_your_writes_seconds if window is None else window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] in SAFE_METHODS
+            or self.window <= 0
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.window
+                cookie = (
+                    f"{STICKY_COOKIE}={until:.3f}; Max-Age={math.ceil(self.window)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,55 @@
+"""JSON responses rendered by pydantic-core.
+
+When a handler returns data, FastAPI validates it against ``response_model``
+again and walks it with ``jsonable_encoder`` before ``json.dumps`` renders
+it. Handlers that already hold validated response models return
+``model_response(...)`` instead: the models are serialized to bytes in one
+pydantic-core call and nothing is validated twice. ``response_model`` is
+still declared on the route for the OpenAPI schema.
+"""
+
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Type, TypeVar
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ModelJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core instead of ``json.dumps``.
+
+    Accepts models, lists of models and plain JSON-compatible data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: Type[ModelT]) -> TypeAdapter[List[ModelT]]:
+    return TypeAdapter(List[schema])  # type: ignore[valid-type]
+
+
+def validate_list(schema: Type[ModelT], rows: Sequence[Any]) -> List[ModelT]:
+    """Validate ORM rows into response models in a single pydantic-core pass."""
+    return _list_adapter(schema).validate_python(rows, from_attributes=True)
+
+
+def model_response(
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = 200,
+) -> ModelJSONResponse:
+    """Render already validated models, bypassing FastAPI's revalidation.
+
+    Headers set on the injected ``response`` parameter are carried over,
+    since FastAPI only applies them to responses it builds itself.
+    """
+    rendered = ModelJSONResponse(content, status_code=status_code)
+    if response is not None:
+        rendered.raw_headers.extend(response.raw_headers)
+    return rendered
@@ -0,0 +1,90 @@
+"""Ranked full-text search over item titles and descriptions.
+
+PostgreSQL matches ``websearch_to_tsquery`` (quoted phrases, ``or`` and
+``-term`` work) against the GIN-indexed ``search_vector`` column and ranks
+with ``ts_rank_cd``. SQLite, for local runs, matches every word of the query
+against the ``items_fts`` FTS5 table and ranks with ``bm25``. See
+``models.item`` for the schema.
+
+Pages are ordered by ``(rank DESC, id)`` and continued by keyset: the cursor
+holds the last row's rank and ID, and the next page starts strictly after
+that pair.
+"""
+
+import re
+from typing import Any, Optional
+
+from sqlalchemy import (
+    Float,
+    Select,
+    and_,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+
+from ..models.item import SEARCH_CONFIG, Item
+from .pagination import decode_cursor
+
+# Typed stand-ins for the cursor values; ``rank`` is computed per query
+RANK = literal_column("rank", Float())
+SEARCH_KEY = (RANK, Item.id)
+
+# Relative weight of title and description matches under bm25
+FTS_WEIGHTS = (10.0, 1.0)
+
+_fts = table("items_fts", column("rowid"))
+_fts_table = literal_column("items_fts")
+
+_WORD = re.compile(r"\w+")
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """FTS5 MATCH expression requiring every word of ``q``, or ``None``.
+
+    Words are quoted so user input is never parsed as FTS5 syntax.
+    """
+    words = _WORD.findall(q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def search_statement(
+    dialect: str, q: str, limit: int, cursor: Optional[str] = None
+) -> Optional[Select[Any]]:
+    """Select ``(Item, rank)`` rows of one result page, best match first.
+
+    Returns ``None`` when ``q`` holds nothing to search for.
+    """
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        vector = literal_column("items.search_vector")
+        rank = func.ts_rank_cd(vector, query)
+        stmt = select(Item, rank.label("rank")).where(vector.op("@@")(query))
+    elif dialect == "sqlite":
+        match = fts5_query(q)
+        if match is None:
+            return None
+        # bm25 is only available next to the MATCH, so rank in a subquery
+        matches = select(
+            _fts.c.rowid.label("id"),
+            (-func.bm25(_fts_table, *FTS_WEIGHTS)).label("rank"),
+        ).where(_fts_table.op("MATCH")(match))
+        ranked = matches.subquery("ranked")
+        rank = ranked.c.rank
+        stmt = select(Item, rank).join(ranked, ranked.c.id == Item.id)
+    else:
+        raise ValueError(f"Full-text search is not supported on '{dialect}'")
+
+    stmt = stmt.order_by(rank.desc(), Item.id).limit(limit)
+
+    if cursor is not None:
+        last_rank, last_id = decode_cursor(cursor, SEARCH_KEY)
+        stmt = stmt.where(
+            or_(rank < last_rank, and_(rank == last_rank, Item.id > last_id))
+        )
+    return stmt
@@ -0,0 +1,159 @@
+"""Password hashing.
+
+bcrypt is deliberately expensive (about 250 ms of CPU at cost 12), so it
+never runs on the event loop or in the request threadpool. Hashes are
+computed on a dedicated pool of ``password_hash_workers`` threads; bcrypt
+releases the GIL while hashing, so the threads use separate cores and a
+burst of signups queues in that pool instead of starving other requests.
+The queue is bounded like a route's (see ``core.shedding``): at most
+``password_hash_max_queue`` hashes wait for a thread, for up to
+``password_hash_queue_timeout`` seconds; others get a ``503``.
+
+Stored hashes carry their own cost. A successful verify against a hash
+made with a different cost than ``password_bcrypt_rounds`` (or against a
+legacy ``hashed_<password>`` value) returns a replacement hash for the
+caller to store.
+"""
+
+import asyncio
+import hmac
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from ..schemas.user import UserCreate, UserUpdate
+from .config import settings
+from .shedding import ConcurrencyLimiter, retry_after
+
+T = TypeVar("T")
+
+# bcrypt only looks at the first 72 bytes of a password
+BCRYPT_MAX_BYTES = 72
+
+# Prefix of the placeholder hashes stored by earlier versions
+LEGACY_PREFIX = "hashed_"
+
+
+def _secret(password: str) -> bytes:
+    return password.encode()[:BCRYPT_MAX_BYTES]
+
+
+def hash_rounds(hashed: str) -> Optional[int]:
+    """Cost factor of a ``$2b$12$...`` hash, or ``None`` if it is not bcrypt."""
+    parts = hashed.split("$")
+    if len(parts) != 4 or not parts[1].startswith("2") or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """bcrypt hashing on a bounded thread pool."""
+
+    def __init__(
+        self,
+        rounds: int,
+        workers: Optional[int] = None,
+        max_queue: int = 100,
+        queue_timeout: float = 5.0,
+    ) -> None:
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_timeout = queue_timeout
+        # A slot per thread, held until its hash finishes
+        self.limiter = ConcurrencyLimiter(self.workers, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created on first use so importing the app starts no threads
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hash"
+                    )
+        return self._executor
+
+    def hash(self, password: str) -> str:
+        """Hash ``password`` on the calling thread."""
+        return bcrypt.hashpw(_secret(password), bcrypt.gensalt(self.rounds)).decode()
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hash_rounds(hashed) != self.rounds
+
+    def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check ``password`` on the calling thread.
+
+        Returns whether it matched and, for a match against an outdated
+        hash, the replacement hash to store.
+        """
+        if hashed.startswith(LEGACY_PREFIX):
+            valid = hmac.compare_digest(LEGACY_PREFIX + password, hashed)
+        elif hash_rounds(hashed) is None:
+            valid = False
+        else:
+            valid = bcrypt.checkpw(_secret(password), hashed.encode())
+
+        if valid and self.needs_rehash(hashed):
+            return True, self.hash(password)
+        return valid, None
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not await self.limiter.acquire(self.queue_timeout):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password checks in progress, retry later",
+                headers=retry_after(self.queue_timeout),
+            )
+        loop = asyncio.get_running_loop()
+        future: Future[T] = self.executor.submit(fn, *args)
+
+        def release(_: Future[T]) -> None:
+            # A caller that goes away still holds the slot until its hash ends
+            loop.call_soon_threadsafe(self.limiter.release)
+
+        future.add_done_callback(release)
+        return await asyncio.wrap_future(future)
+
+    async def ahash(self, password: str) -> str:
+        """Hash ``password`` on the hashing pool."""
+        return await self._run(self.hash, password)
+
+    async def averify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Verify ``password`` on the hashing pool (see ``verify``)."""
+        return await self._run(self.verify, password, hashed)
+
+    def shutdown(self) -> None:
+        """Stop the pool once the hashes already running finish.
+
+        Blocks; the lifespan calls it from the threadpool.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.password_bcrypt_rounds,
+    settings.password_hash_workers,
+    settings.password_hash_max_queue,
+    settings.password_hash_queue_timeout,
+)
+
+
+async def hash_new_password(user_data: UserCreate) -> str:
+    """Dependency hashing the password of a signup off the request threads."""
+    return await password_hasher.ahash(user_data.password)
+
+
+async def hash_updated_password(user_data: UserUpdate) -> Optional[str]:
+    """Dependency hashing a changed password, if the update sets one."""
+    if user_data.password is None:
+        return None
+    return await password_hasher.ahash(user_data.password)
@@ -0,0 +1,209 @@
+"""Load shedding: per-route concurrency limits and per-client rate limits.
+
+When the database slows down, requests that keep being admitted only queue
+up in the threadpool and on pool checkout until all of them time out. Two
+guards reject the excess early instead, so the requests that are admitted
+still finish in bounded time:
+
+* ``limit_concurrency``, a dependency of the API routers, lets a route serve
+  at most ``concurrency_limit`` requests at once (by default as many as the
+  connection pool has connections). Others queue for a slot for up to
+  ``concurrency_queue_timeout`` seconds, then get a ``503``. A full queue
+  rejects them at once. It runs after routing, so it is keyed by the route
+  template, and before a sync handler enters the threadpool.
+* ``RateLimitMiddleware`` gives each client (by address) a token bucket of
+  ``rate_limit_burst`` tokens refilled at ``rate_limit_per_second``, and
+  answers ``429`` once it is empty.
+
+Both responses carry ``Retry-After``. ``/health/*`` is never limited, so
+probes keep working under overload.
+
+Limiter state is per worker and only touched from the event loop thread.
+"""
+
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import AsyncGenerator, Deque, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .queries import route_template
+
+EXEMPT_PREFIX = "/health"
+
+
+class ConcurrencyLimiter:
+    """Slots for one route, handed to waiters in arrival order."""
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to ``timeout`` seconds; ``False`` if shed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue or timeout <= 0:
+            self.rejected += 1
+            return False
+
+        # A released slot is handed over by resolving the waiter
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        acquired = False
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            self.rejected += 1
+        finally:
+            if not acquired:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot arrived just as the wait ended; pass it on
+                    self.release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return acquired
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot passes to the waiter, active stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+limiters: Dict[Tuple[str, str], ConcurrencyLimiter] = {}
+
+
+def route_limit(method: str, route: str) -> int:
+    """Concurrency limit for a route; 0 means unlimited."""
+    override = settings.concurrency_limits.get(f"{method} {route}")
+    if override is not None:
+        return override
+    if settings.concurrency_limit is not None:
+        return settings.concurrency_limit
+    # A route cannot use more connections than the pool has; requests beyond
+    # that would only wait for a checkout
+    return settings.database_pool_size + settings.database_max_overflow
+
+
+def retry_after(seconds: float) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+async def limit_concurrency(request: Request) -> AsyncGenerator[None, None]:
+    """Hold a slot of the route's concurrency limit for the request."""
+    key = (request.method, route_template(request.scope))
+    limiter = limiters.get(key)
+    if limiter is None:
+        limit = route_limit(*key)
+        if limit <= 0:
+            yield
+            return
+        limiter = limiters[key] = ConcurrencyLimiter(
+            limit, settings.concurrency_max_queue
+        )
+
+    timeout = settings.concurrency_queue_timeout
+    if not await limiter.acquire(timeout):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is overloaded, retry later",
+            headers=retry_after(timeout),
+        )
+    try:
+        yield
+    finally:
+        limiter.release()
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated = now
+
+
+class RateLimiter:
+    """Token buckets per client, for the most recently seen clients."""
+
+    def __init__(self, rate: float, burst: int, max_clients: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.rejected = 0
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def take(self, client: str, now: Optional[float] = None) -> float:
+        """Spend a token of ``client``; returns 0, or seconds until one is due."""
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = self._buckets[client] = TokenBucket(self.burst, now)
+            # Clients dropped here had not been seen for longest, so their
+            # buckets would mostly have refilled anyway
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+            bucket.tokens = min(
+                self.burst, bucket.tokens + (now - bucket.updated) * self.rate
+            )
+            bucket.updated = now
+
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            return 0.0
+        self.rejected += 1
+        return (1 - bucket.tokens) / self.rate
+
+
+class RateLimitMiddleware:
+    """Answer ``429`` to clients that exceed their request rate."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+    ) -> None:
+        self.app = app
+        self.limiter = RateLimiter(
+            settings.rate_limit_per_second if rate is None else rate,
+            settings.rate_limit_burst if burst is None else burst,
+            settings.rate_limit_max_clients,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        wait = self.limiter.take(client[0] if client else "")
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too many requests"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=retry_after(wait),
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
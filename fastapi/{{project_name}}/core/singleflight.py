@@ -0,0 +1,172 @@
+"""Single-flight coalescing of identical in-flight reads.
+
+During a spike, many requests for the same entity arrive while the first
+one's SELECT is still running. ``SingleFlight`` lets the first request (the
+leader) run the read, and hands its result, or its exception, to every
+request with the same key that arrives before it finishes. One query and
+one ``model_validate`` then serve them all. Once the leader is done the key
+is released and the next request reads afresh. Writes call ``forget`` for the
+entities they changed, so requests arriving after a write never join a read
+that started before it.
+
+``do`` is for sync handlers, whose followers block their threadpool thread
+on an event. ``ado`` is for async handlers, whose followers await a future.
+Keys come from ``flight_key``: the route template, whether the client reads
+from the primary (see ``core.replicas``), the entity type and the handler's
+parameters. ``forget`` matches the entity type too, so a write to user 5
+leaves reads of item 5 alone.
+
+Counts of leaders and coalesced followers per route are served on
+``/metrics``.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from starlette.requests import Request
+
+from .config import settings
+from .queries import route_template
+from .replicas import reads_from_primary
+
+T = TypeVar("T")
+
+FlightKey = Tuple[Hashable, ...]
+
+
+class _Call:
+    """A read in flight in the threadpool."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def flight_key(request: Request, entity: str, *params: Hashable) -> FlightKey:
+    """Key of a read: its route, its read target, its entity and parameters."""
+    return (
+        route_template(request.scope),
+        reads_from_primary(request),
+        entity,
+        *params,
+    )
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[FlightKey, _Call] = {}
+        self._futures: Dict[FlightKey, asyncio.Future] = {}
+        # By route (the first element of the key)
+        self.leaders: Counter[str] = Counter()
+        self.coalesced: Counter[str] = Counter()
+
+    def do(self, key: FlightKey, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of the same call already running."""
+        if not settings.singleflight_enabled:
+            return fn()
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders[key[0]] += 1
+            else:
+                self.coalesced[key[0]] += 1
+        assert call is not None
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: FlightKey, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async ``do``: await ``fn()`` or the same call already running."""
+        if not settings.singleflight_enabled:
+            return await fn()
+
+        counted = False
+        while (future := self._futures.get(key)) is not None:
+            if not counted:
+                with self._lock:
+                    self.coalesced[key[0]] += 1
+                counted = True
+            try:
+                # Shielded: a follower that goes away must not cancel the read
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled; the next caller takes over
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        with self._lock:
+            self.leaders[key[0]] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark it retrieved; without followers nobody else would
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+        return result
+
+    def forget(self, entity: str, *entity_ids: Hashable) -> None:
+        """Start new reads of these entities instead of joining running ones.
+
+        Called after a write commits; reads already in flight finish for the
+        requests that joined them.
+        """
+        ids = set(entity_ids)
+        with self._lock:
+            for calls in (self._calls, self._futures):
+                stale = [
+                    key for key in calls if key[2:3] == (entity,) and key[-1] in ids
+                ]
+                for key in stale:
+                    del calls[key]
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        """Leaders and coalesced followers by route."""
+        with self._lock:
+            routes = set(self.leaders) | set(self.coalesced)
+            return {
+                route: {
+                    "leaders": self.leaders[route],
+                    "coalesced": self.coalesced[route],
+                }
+                for route in routes
+            }
+
+
+flights = SingleFlight()
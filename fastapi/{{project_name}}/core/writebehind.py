@@ -0,0 +1,284 @@
+"""Write-behind item creation: accept now, insert in batches.
+
+A ``POST /api/v1/items/`` sent with ``Prefer: respond-async`` and a
+``client_id`` is answered ``202 Accepted`` as soon as the row is queued in
+memory. A background thread writes the queue as one multi-row ``INSERT``
+when ``write_behind_batch_size`` rows are waiting, or once the oldest row
+has waited ``write_behind_flush_interval_ms``. That is one statement and
+one commit per batch instead of per item.
+
+* Memory is bounded: at most ``write_behind_max_queue`` rows are held,
+  including the batch being written. A producer finding the queue full waits
+  up to ``write_behind_enqueue_timeout`` seconds for room, then gets a
+  ``503`` with ``Retry-After``.
+* A batch that fails, for instance on a lost connection, stays queued and
+  is retried with backoff. Rows are inserted with ``ON CONFLICT (client_id)
+  DO NOTHING``, so a retry or a repeated request writes an item only once.
+* The lifespan starts the writer and, on shutdown, stops taking rows and
+  flushes what is queued for up to ``write_behind_shutdown_timeout`` seconds.
+
+A ``202`` means the row is held by this worker. A worker that is killed
+(rather than stopped) loses its queue. Producers that need every row should
+retry rows they cannot find by ``client_id`` afterwards.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import structlog
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from ..crud import items as crud
+from ..schemas.item import ItemAccepted, ItemCreate
+from .config import settings
+from .database import SessionLocal
+from .responses import model_response
+from .shedding import retry_after
+
+logger = structlog.get_logger()
+
+Row = Dict[str, Any]
+
+# Wait before retrying a failing batch, doubling up to the longest wait
+RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 1.0
+
+
+class WriteBehindQueue:
+    """Rows written in batches by a background thread.
+
+    ``write`` inserts a batch and returns how many rows were written and
+    dropped; it raises to have the batch retried.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[List[Row]], Tuple[int, int]],
+        batch_size: int,
+        flush_interval: float,
+        max_rows: int,
+    ) -> None:
+        self.name = name
+        self.write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.accepted = self.written = self.dropped = self.rejected = 0
+        self.flushes = self.failures = 0
+        # (accepted at, row), oldest first
+        self._rows: Deque[Tuple[float, Row]] = deque()
+        self._writing = 0
+        self._running = False
+        self._deadline = float("inf")
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+
+    @property
+    def queued(self) -> int:
+        """Rows accepted but not written yet."""
+        with self._cond:
+            return len(self._rows) + self._writing
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._deadline = float("inf")
+            self._thread = threading.Thread(
+                target=self._run, name=f"write-behind-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def _append(self, row: Row) -> bool:
+        # Called with the lock held
+        if not self._running or len(self._rows) + self._writing >= self.max_rows:
+            return False
+        self._rows.append((time.monotonic(), row))
+        self.accepted += 1
+        # The writer sleeps until the first row or a full batch arrives
+        if len(self._rows) == 1 or len(self._rows) >= self.batch_size:
+            self._cond.notify_all()
+        return True
+
+    def put(self, row: Row, timeout: float) -> bool:
+        """Queue ``row``, waiting up to ``timeout`` for room; ``False`` if not."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._append(row):
+                remaining = deadline - time.monotonic()
+                if not self._running or remaining <= 0:
+                    self.rejected += 1
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    async def aput(self, row: Row, timeout: float) -> bool:
+        """``put`` for the event loop; only waits in the threadpool when full."""
+        with self._cond:
+            if self._append(row):
+                return True
+        return await run_in_threadpool(self.put, row, timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued row is written; ``False`` on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._cond.notify_all()
+            while self._rows or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float) -> None:
+        """Stop taking rows and write the queued ones, for up to ``timeout``."""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._running = False
+            self._deadline = time.monotonic() + timeout
+            self._cond.notify_all()
+        if thread is None:
+            return
+        thread.join(timeout)
+        if thread.is_alive():
+            self._give_up()
+
+    def _give_up(self) -> None:
+        """Drop the rows still queued once stopping ran out of time."""
+        with self._cond:
+            lost = len(self._rows)
+            self._rows.clear()
+            self.dropped += lost
+            self._cond.notify_all()
+        if lost:
+            logger.error(
+                "Write-behind rows lost on shutdown", queue=self.name, rows=lost
+            )
+
+    def _next_batch(self) -> List[Row]:
+        """Wait for a full batch, the flush interval or a stop; take the batch."""
+        with self._cond:
+            while self._running and len(self._rows) < self.batch_size:
+                if not self._rows:
+                    self._cond.wait()
+                    continue
+                due = self._rows[0][0] + self.flush_interval - time.monotonic()
+                if due <= 0:
+                    break
+                self._cond.wait(due)
+
+            count = min(self.batch_size, len(self._rows))
+            batch = [self._rows.popleft()[1] for _ in range(count)]
+            self._writing = count
+            return batch
+
+    def _run(self) -> None:
+        delay = RETRY_DELAY
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return  # stopped with nothing left
+
+            try:
+                written, dropped = self.write(batch)
+            except Exception:
+                logger.exception(
+                    "Write-behind flush failed", queue=self.name, rows=len(batch)
+                )
+                with self._cond:
+                    self.failures += 1
+                    self._writing = 0
+                    self._rows.extendleft((0.0, row) for row in reversed(batch))
+                    if time.monotonic() >= self._deadline:
+                        # Stopping, and out of time
+                        break
+                    self._cond.wait(min(delay, self._deadline - time.monotonic()))
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+
+            delay = RETRY_DELAY
+            with self._cond:
+                self.flushes += 1
+                self.written += written
+                self.dropped += dropped
+                self._writing = 0
+                # Room for waiting producers, and flush() may be done
+                self._cond.notify_all()
+        self._give_up()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "queued": len(self._rows) + self._writing,
+                "accepted": self.accepted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "failures": self.failures,
+            }
+
+
+def _write_items(rows: List[Row]) -> Tuple[int, int]:
+    with SessionLocal() as db:
+        return crud.write_queued_items(db, rows)
+
+
+item_writer = WriteBehindQueue(
+    "items",
+    _write_items,
+    batch_size=settings.write_behind_batch_size,
+    flush_interval=settings.write_behind_flush_interval_ms / 1000,
+    max_rows=settings.write_behind_max_queue,
+)
+
+
+def respond_async(prefer: Optional[str]) -> bool:
+    """Whether to queue the write: enabled, and the client prefers it."""
+    if not settings.write_behind_enabled or not prefer:
+        return False
+    preferences = (part.split(";")[0].strip().lower() for part in prefer.split(","))
+    return "respond-async" in preferences
+
+
+def queued_item(item_data: ItemCreate) -> Row:
+    """The row to queue for ``item_data``, stamped with its acceptance time."""
+    if item_data.client_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="client_id is required with Prefer: respond-async",
+        )
+    return {**item_data.model_dump(), "created_at": datetime.utcnow()}
+
+
+def accepted(row: Row, queued: bool) -> Response:
+    """``202`` for a queued row, or ``503`` when the queue had no room."""
+    if not queued:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Write queue is full, retry later",
+            headers=retry_after(settings.write_behind_enqueue_timeout),
+        )
+    response = model_response(
+        ItemAccepted(client_id=row["client_id"]),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+    response.headers["Preference-Applied"] = "respond-async"
+    # Where the item will be listed once it is written
+    response.headers["Location"] = (
+        f"/api/v1/items/?client_id={quote(row['client_id'], safe='')}"
+    )
+    return response
+
+
+def write_behind_status() -> Dict[str, Dict[str, int]]:
+    return {item_writer.name: item_writer.stats()}
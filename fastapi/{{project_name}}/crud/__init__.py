@@ -0,0 +1,5 @@
+"""Database operations shared by the sync and async routers.
+
+Functions take a sync ``Session``; async handlers call them through
+``AsyncSession.run_sync``.
+"""
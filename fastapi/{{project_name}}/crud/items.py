@@ -0,0 +1,274 @@
+"""Item database operations."""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import structlog
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Select, and_, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from ..core.config import settings
+from ..core.pagination import encode_cursor
+from ..core.responses import validate_list
+from ..core.search import search_statement
+from ..models.item import Item
+from ..schemas.item import (
+    BulkError,
+    ItemBulkDeleteResponse,
+    ItemBulkResponse,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemFilters,
+    ItemResponse,
+    ItemSort,
+)
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+SortKey = Tuple[InstrumentedAttribute[Any], ...]
+
+# Keyset sort keys of the item list; see the indexes on ``Item``
+SORT_KEYS: Dict[str, SortKey] = {
+    "created_at": (Item.created_at, Item.id),
+    "price": (Item.price, Item.id),
+}
+
+# Sorts after every character, closing the range of a title prefix
+_MAX_CHAR = "\U0010ffff"
+
+
+def sort_key(sort: ItemSort) -> Tuple[SortKey, bool]:
+    """Key columns of a list sort order and whether it is descending."""
+    return SORT_KEYS[sort.lstrip("-")], sort.startswith("-")
+
+
+def title_prefix_clause(prefix: str, dialect: str) -> ColumnElement[bool]:
+    """Index-friendly, case-sensitive ``title`` prefix match."""
+    if dialect == "postgresql":
+        # Served by the varchar_pattern_ops index ix_items_title_pattern
+        escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return Item.title.like(escaped + "%", escape="\\")
+    # SQLite's LIKE ignores case and skips the index; a range seeks it
+    return and_(Item.title >= prefix, Item.title < prefix + _MAX_CHAR)
+
+
+def filter_items(stmt: Select[Any], filters: ItemFilters, dialect: str) -> Select[Any]:
+    """Restrict an item select to the rows matching ``filters``."""
+    if filters.is_active is not None:
+        stmt = stmt.where(Item.is_active == filters.is_active)
+    if filters.min_price is not None:
+        stmt = stmt.where(Item.price >= filters.min_price)
+    if filters.max_price is not None:
+        stmt = stmt.where(Item.price <= filters.max_price)
+    if filters.created_after is not None:
+        stmt = stmt.where(Item.created_at >= filters.created_after)
+    if filters.created_before is not None:
+        stmt = stmt.where(Item.created_at < filters.created_before)
+    if filters.title_prefix is not None:
+        stmt = stmt.where(title_prefix_clause(filters.title_prefix, dialect))
+    if filters.client_id is not None:
+        stmt = stmt.where(Item.client_id == filters.client_id)
+    return stmt
+
+
+def check_bulk_size(count: int) -> None:
+    """Reject bulk requests above the configured row limit."""
+    if count > settings.bulk_max_rows:
+        raise HTTPException(
+            # Content Too Large; Starlette renamed its constant, so no alias
+            status_code=413,
+            detail=f"At most {settings.bulk_max_rows} rows per bulk request",
+        )
+
+
+def chunked(rows: Sequence[T]) -> Iterator[Tuple[int, Sequence[T]]]:
+    """Yield ``(offset, chunk)`` pairs of at most ``bulk_chunk_size`` rows."""
+    size = settings.bulk_chunk_size
+    for offset in range(0, len(rows), size):
+        yield offset, rows[offset : offset + size]
+
+
+def _write_chunk(
+    db: Session,
+    rows: List[Tuple[int, Dict[str, Any]]],
+    write: Callable[[List[Dict[str, Any]]], List[R]],
+    errors: List[BulkError],
+) -> List[Tuple[int, R]]:
+    """Write a chunk in one statement, falling back to row by row on failure.
+
+    ``write`` returns one result per row, in row order. Each chunk is its own
+    transaction, so a failing chunk only rolls back itself. Returns the
+    request index and result of every row that was written.
+    """
+    if not rows:
+        return []
+
+    try:
+        results = write([values for _, values in rows])
+        db.commit()
+        return list(zip([index for index, _ in rows], results, strict=True))
+    except DBAPIError:
+        db.rollback()
+
+    written = []
+    for index, values in rows:
+        try:
+            (result,) = write([values])
+            db.commit()
+            written.append((index, result))
+        except DBAPIError as exc:
+            db.rollback()
+            errors.append(
+                BulkError(index=index, id=values.get("id"), detail=str(exc.orig))
+            )
+    return written
+
+
+def bulk_create_items(db: Session, items_data: List[ItemCreate]) -> ItemBulkResponse:
+    """Create items with one multi-row ``INSERT ... RETURNING`` per chunk."""
+    check_bulk_size(len(items_data))
+    created: List[ItemResponse] = []
+    errors: List[BulkError] = []
+
+    def write(values: List[Dict[str, Any]]) -> List[ItemResponse]:
+        stmt = insert(Item).returning(Item, sort_by_parameter_order=True)
+        items = db.execute(stmt, values).scalars().all()
+        # Validate before commit expires the returned rows
+        return validate_list(ItemResponse, items)
+
+    for offset, chunk in chunked(items_data):
+        rows = [(offset + n, row.model_dump()) for n, row in enumerate(chunk)]
+        created.extend(item for _, item in _write_chunk(db, rows, write, errors))
+
+    return ItemBulkResponse(items=created, errors=errors)
+
+
+def bulk_update_items(
+    db: Session, items_data: List[ItemBulkUpdate]
+) -> ItemBulkResponse:
+    """Update items with one executemany ``UPDATE`` per chunk."""
+    check_bulk_size(len(items_data))
+    updated: List[ItemResponse] = []
+    errors: List[BulkError] = []
+
+    def write(values: List[Dict[str, Any]]) -> List[int]:
+        changes = [row for row in values if len(row) > 1]
+        if changes:
+            db.execute(update(Item), changes)
+        return [row["id"] for row in values]
+
+    for offset, chunk in chunked(items_data):
+        ids = {row.id for row in chunk}
+        existing = set(db.execute(select(Item.id).where(Item.id.in_(ids))).scalars())
+
+        rows = []
+        for index, row in enumerate(chunk, start=offset):
+            if row.id in existing:
+                rows.append((index, row.model_dump(exclude_unset=True)))
+            else:
+                errors.append(
+                    BulkError(index=index, id=row.id, detail="Item not found")
+                )
+
+        written = [item_id for _, item_id in _write_chunk(db, rows, write, errors)]
+        items = db.execute(select(Item).where(Item.id.in_(written))).scalars().all()
+        by_id = {item.id: item for item in validate_list(ItemResponse, items)}
+        updated.extend(by_id[item_id] for item_id in written)
+
+    return ItemBulkResponse(
+        items=updated, errors=sorted(errors, key=lambda error: error.index)
+    )
+
+
+def bulk_delete_items(db: Session, ids: List[int]) -> ItemBulkDeleteResponse:
+    """Delete items with one ``DELETE ... WHERE id IN (...) RETURNING id`` per chunk."""
+    check_bulk_size(len(ids))
+    deleted: List[int] = []
+
+    for _, chunk in chunked(ids):
+        result = db.execute(delete(Item).where(Item.id.in_(chunk)).returning(Item.id))
+        deleted.extend(result.scalars())
+        db.commit()
+
+    found = set(deleted)
+    errors = [
+        BulkError(index=index, id=item_id, detail="Item not found")
+        for index, item_id in enumerate(ids)
+        if item_id not in found
+    ]
+    return ItemBulkDeleteResponse(deleted=sorted(found), errors=errors)
+
+
+def _insert_new(dialect: str) -> Any:
+    """``INSERT`` that skips rows whose ``client_id`` already exists."""
+    if dialect == "postgresql":
+        return postgresql.insert(Item).on_conflict_do_nothing(
+            index_elements=[Item.client_id]
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(Item).on_conflict_do_nothing(
+            index_elements=[Item.client_id]
+        )
+    return insert(Item)
+
+
+def write_queued_items(db: Session, rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Insert rows queued by write-behind creation in one statement.
+
+    Rows whose ``client_id`` was already written are skipped, so a retried
+    flush writes each item once. If the database rejects a row, the rows are
+    written one by one and the rejected ones dropped; other errors, such as a
+    lost connection, propagate so the caller retries the batch. Returns the
+    number of rows written and dropped.
+    """
+    stmt = _insert_new(db.get_bind().dialect.name).returning(Item.id)
+
+    try:
+        written = len(db.execute(stmt, rows).all())
+        db.commit()
+        return written, 0
+    except (DataError, IntegrityError):
+        db.rollback()
+
+    written = dropped = 0
+    for row in rows:
+        try:
+            written += len(db.execute(stmt, [row]).all())
+            db.commit()
+        except (DataError, IntegrityError) as exc:
+            db.rollback()
+            dropped += 1
+            logger.warning(
+                "Dropped a queued item", client_id=row["client_id"], error=str(exc.orig)
+            )
+    return written, dropped
+
+
+def search_items(
+    db: Session, q: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[ItemResponse], Optional[str]]:
+    """One page of ranked search results and the cursor of the next page."""
+    stmt = search_statement(db.get_bind().dialect.name, q, limit, cursor)
+    if stmt is None:
+        return [], None
+
+    rows = db.execute(stmt).all()
+    page_cursor = None
+    if len(rows) == limit:
+        page_cursor = encode_cursor([rows[-1].rank, rows[-1].Item.id])
+    return validate_list(ItemResponse, [row.Item for row in rows]), page_cursor
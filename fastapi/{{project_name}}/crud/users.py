@@ -0,0 +1,59 @@
+"""User database operations."""
+
+from typing import Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models.user import User
+
+
+def duplicate_user_detail(
+    db: Session,
+    username: Optional[str],
+    email: Optional[str],
+    exclude_id: Optional[int] = None,
+) -> str:
+    """Explain which unique field a rejected user write collided with.
+
+    Writes rely on the unique constraints instead of checking up front, so
+    this single lookup only runs once an ``IntegrityError`` was raised.
+    """
+    stmt = select(User.username, User.email).where(
+        or_(User.username == username, User.email == email)
+    )
+    if exclude_id is not None:
+        stmt = stmt.where(User.id != exclude_id)
+
+    conflicts = db.execute(stmt).all()
+    if any(row.username == username for row in conflicts):
+        return "Username already exists"
+    if conflicts:
+        return "Email already exists"
+    return "Username or email already exists"
+
+
+def get_user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.execute(
+        select(User).where(User.username == username)
+    ).scalar_one_or_none()
+
+
+def get_active_user(db: Session, user_id: int) -> Optional[User]:
+    stmt = select(User).where(User.id == user_id, User.is_active.is_(True))
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def store_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    """Replace a stored hash after a login upgraded it.
+
+    ``updated_at`` is written back unchanged: an upgraded hash is not a
+    change clients can see, so it must not change the user's ETag.
+    """
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(hashed_password=hashed_password, updated_at=User.updated_at)
+    )
+    db.execute(stmt)
+    db.commit()
@@ -1,31 +1,61 @@
 """Main FastAPI application module."""
 
-from contextlib import contextmanager
-from typing import Generator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 
 import structlog
-import uvicorn
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
+from .core.compression import CompressionMiddleware
 from .core.config import settings
-from .core.database import init_db
-from .routers import health, items, users
+from .core.counts import TOTAL_COUNT_HEADER
+from .core.database import check_schema_revision, dispose_engines
+from .core.etag import ETAG_HEADER
+from .core.metrics import MetricsMiddleware
+from .core.pagination import NEXT_CURSOR_HEADER
+from .core.probes import health_probes
+from .core.queries import QueryTrackingMiddleware
+from .core.replicas import ReadYourWritesMiddleware
+from .core.responses import ModelJSONResponse
+from .core.security import password_hasher
+from .core.shedding import RateLimitMiddleware, limit_concurrency
+from .core.writebehind import item_writer
+from .routers import auth, health, metrics
 
 logger = structlog.get_logger()
 
 
-@contextmanager
-def lifespan(app: FastAPI) -> Generator[None, None, None]:
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager."""
     logger.info("Starting {{project_name}} application", version="0.1.0")
 
-    # Initialize database
-    init_db()
+    # The schema is migrated ahead of the deploy (alembic upgrade head); a
+    # worker only checks the revision instead of creating tables
+    if settings.database_check_schema:
+        revision = check_schema_revision()
+        logger.info("Database schema is up to date", revision=revision)
 
-    yield
+    if settings.write_behind_enabled:
+        item_writer.start()
 
-    logger.info("Shutting down {{project_name}} application")
+    # Readiness is answered from these checks (see core.probes)
+    await health_probes.start()
+
+    try:
+        yield
+    finally:
+        # In-flight requests have drained by now; nothing is left queued on
+        # the hashing pool, and no more rows join the write-behind queue
+        logger.info("Shutting down {{project_name}} application")
+        await health_probes.stop()
+        await run_in_threadpool(password_hasher.shutdown)
+        await run_in_threadpool(
+            item_writer.stop, settings.write_behind_shutdown_timeout
+        )
+        await dispose_engines()
 
 
 def create_app() -> FastAPI:
@@ -38,6 +68,7 @@ def create_app() -> FastAPI:
         redoc_url="/redoc",
         openapi_url="/openapi.json",
         lifespan=lifespan,
+        default_response_class=ModelJSONResponse,
     )
 
     # Add CORS middleware
@@ -47,12 +78,53 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER, TOTAL_COUNT_HEADER],
     )
 
-    # Include routers
+    # gzip/brotli for list pages and exports; wraps the routes only, so the
+    # metrics below include the compression time
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+
+    # Keep clients on the primary for a while after they write
+    if settings.database_replica_urls:
+        app.add_middleware(ReadYourWritesMiddleware)
+
+    # Per-client token buckets; inside the metrics so 429s are counted
+    if settings.rate_limit_per_second > 0:
+        app.add_middleware(RateLimitMiddleware)
+
+    # Per-route latency, status and database metrics
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+    # Request-scoped SQL tracking (slow-query log, N+1 detection); added last
+    # so it wraps the metrics middleware, which reads its statement counts
+    app.add_middleware(QueryTrackingMiddleware)
+
+    # Include routers (async handlers when the async database mode is enabled);
+    # only the mode in use is imported
+    if settings.database_async:
+        from .routers import items_async as items
+        from .routers import users_async as users
+    else:
+        from .routers import items, users
+
+    # API routes shed load past their concurrency limit; health checks do not
+    limited = [Depends(limit_concurrency)]
+
     app.include_router(health.router, prefix="/health", tags=["health"])
-    app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-    app.include_router(items.router, prefix="/api/v1/items", tags=["items"])
+    if settings.metrics_enabled:
+        app.include_router(metrics.router, tags=["metrics"])
+    app.include_router(
+        auth.router, prefix="/api/v1/auth", tags=["auth"], dependencies=limited
+    )
+    app.include_router(
+        users.router, prefix="/api/v1/users", tags=["users"], dependencies=limited
+    )
+    app.include_router(
+        items.router, prefix="/api/v1/items", tags=["items"], dependencies=limited
+    )
 
     return app
 
@@ -61,6 +133,9 @@ app = create_app()
 
 
 if __name__ == "__main__":
+    # Development server; run ``python -m {{project_name}}.server`` in production
+    import uvicorn
+
     uvicorn.run(
         "{{project_name}}.main:app",
         host=settings.host,
@@ -0,0 +1,92 @@
+"""Alembic environment.
+
+Migrations run against ``settings.database_url`` (or the ``-x url=...``
+override, or a connection passed in ``config.attributes["connection"]``)
+with the models' metadata as the autogenerate target.
+"""
+
+import importlib
+from logging.config import fileConfig
+from typing import Any, Optional
+
+from alembic import context
+from sqlalchemy import Connection, create_engine, pool
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+database = importlib.import_module("{{project_name}}.core.database")
+importlib.import_module("{{project_name}}.models")
+
+target_metadata = database.Base.metadata
+
+# Full-text search schema that is created outside the mapped models
+UNMAPPED_TABLES = {"items_fts"}
+UNMAPPED_COLUMNS = {("items", "search_vector")}
+# Indexes the models only create on one dialect
+DIALECT_INDEXES = {"ix_items_title_pattern": "postgresql"}
+
+
+def include_object(
+    obj: Any, name: Optional[str], type_: str, _reflected: bool, _compare_to: Any
+) -> bool:
+    """Keep autogenerate from dropping the search schema."""
+    if type_ == "table":
+        return not (name or "").startswith(tuple(UNMAPPED_TABLES))
+    if type_ == "column":
+        return (obj.table.name, name) not in UNMAPPED_COLUMNS
+    if type_ == "index":
+        if name == "ix_items_search_vector":
+            return False
+        dialect = DIALECT_INDEXES.get(name or "")
+        return dialect is None or dialect == context.get_context().dialect.name
+    return True
+
+
+def database_url() -> str:
+    return context.get_x_argument(as_dictionary=True).get(
+        "url", database.settings.database_url
+    )
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL without connecting."""
+    context.configure(
+        url=database_url(),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection: Connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can only alter tables by copying them
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    connectable = create_engine(database_url(), poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,106 @@
+"""Initial schema: items with full-text search, and users.
+
+Revision ID: 0001
+Revises:
+Create Date: 2024-06-01 00:00:00
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSTGRES_SEARCH = [
+    "ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_items_search_vector ON items USING gin (search_vector)",
+]
+
+SQLITE_SEARCH = [
+    "CREATE VIRTUAL TABLE items_fts USING fts5("
+    "title, description, content='items', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN "
+    "INSERT INTO items_fts (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN "
+    "INSERT INTO items_fts (items_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER items_fts_update AFTER UPDATE OF title, description "
+    "ON items BEGIN "
+    "INSERT INTO items_fts (items_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO items_fts (rowid, title, description) "
+    "VALUES (new.id, new.title, new.description); END",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    op.create_table(
+        "items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("price", sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_items_id", "items", ["id"])
+    op.create_index("ix_items_title", "items", ["title"])
+    op.create_index("ix_items_created_at_id", "items", ["created_at", "id"])
+    op.create_index("ix_items_price_id", "items", ["price", "id"])
+    op.create_index(
+        "ix_items_is_active_created_at_id", "items", ["is_active", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_items_is_active_price_id", "items", ["is_active", "price", "id"]
+    )
+    if dialect == "postgresql":
+        op.create_index(
+            "ix_items_title_pattern",
+            "items",
+            ["title"],
+            postgresql_ops={"title": "varchar_pattern_ops"},
+        )
+        for statement in POSTGRES_SEARCH:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_SEARCH:
+            op.execute(statement)
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("full_name", sa.String(length=100), nullable=True),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_created_at_id", "users", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("users")
+    if op.get_bind().dialect.name == "sqlite":
+        # The triggers go with the items table
+        op.execute("DROP TABLE IF EXISTS items_fts")
+    op.drop_table("items")
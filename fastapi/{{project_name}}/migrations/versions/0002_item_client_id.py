@@ -0,0 +1,29 @@
+"""Producer-assigned client_id on items, for write-behind creation.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-07-01 00:00:00
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A plain ADD COLUMN: a batch rebuild of the table on SQLite would drop
+    # the full-text search triggers
+    op.add_column("items", sa.Column("client_id", sa.String(length=64), nullable=True))
+    op.create_index("ix_items_client_id", "items", ["client_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_items_client_id", table_name="items")
+    op.drop_column("items", "client_id")
@@ -1,10 +1,21 @@
-"""Item database model."""
+"""Item database model.
+
+Full-text search needs dialect-specific schema that is created next to the
+table rather than mapped on the model:
+
+* PostgreSQL: a stored ``search_vector`` tsvector generated from the title
+  (weight A) and description (weight B), with a GIN index;
+* SQLite: an external-content FTS5 table ``items_fts`` kept in sync with
+  ``items`` by triggers.
+
+Neither is loaded with the model; ``core.search`` queries them.
+"""
 
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import DateTime, Numeric, String, Text
+from sqlalchemy import DDL, DateTime, Index, Numeric, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from ..core.database import Base
@@ -14,8 +25,27 @@ class Item(Base):
     """Item database model."""
 
     __tablename__ = "items"
+    __table_args__ = (
+        # Back keyset pagination of the list, sorted by either key
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_price_id", "price", "id"),
+        # The same sort keys behind an is_active filter
+        Index("ix_items_is_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_items_is_active_price_id", "is_active", "price", "id"),
+        # Title prefix filter: under a non-C collation LIKE 'prefix%' can only
+        # use an index with pattern ops (SQLite uses ix_items_title instead)
+        Index(
+            "ix_items_title_pattern",
+            "title",
+            postgresql_ops={"title": "varchar_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Producer-assigned ID; write-behind creation skips rows it has already seen
+    client_id: Mapped[Optional[str]] = mapped_column(
+        String(64), nullable=True, unique=True, index=True
+    )
     title: Mapped[str] = mapped_column(String(200), index=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     price: Mapped[Decimal] = mapped_column(Numeric(10, 2))
@@ -25,4 +55,55 @@ class Item(Base):
     )
     updated_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime, nullable=True, onupdate=datetime.utcnow
-    )
\ No newline at end of file
+    )
+
+
+# Text search configuration of the PostgreSQL search vector and queries
+SEARCH_CONFIG = "english"
+
+_postgres_search = [
+    DDL(
+        "ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+        ") STORED"
+    ),
+    DDL("CREATE INDEX ix_items_search_vector ON items USING gin (search_vector)"),
+]
+
+_sqlite_search = [
+    DDL(
+        "CREATE VIRTUAL TABLE items_fts USING fts5("
+        "title, description, content='items', content_rowid='id', "
+        "tokenize='porter unicode61')"
+    ),
+    DDL(
+        "CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN "
+        "INSERT INTO items_fts (rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END"
+    ),
+    DDL(
+        "CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN "
+        "INSERT INTO items_fts (items_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END"
+    ),
+    DDL(
+        "CREATE TRIGGER items_fts_update AFTER UPDATE OF title, description "
+        "ON items BEGIN "
+        "INSERT INTO items_fts (items_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO items_fts (rowid, title, description) "
+        "VALUES (new.id, new.title, new.description); END"
+    ),
+]
+
+for _ddl in _postgres_search:
+    event.listen(Item.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+for _ddl in _sqlite_search:
+    event.listen(Item.__table__, "after_create", _ddl.execute_if(dialect="sqlite"))
+# The triggers go with the table, the FTS5 table has to be dropped explicitly
+event.listen(
+    Item.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS items_fts").execute_if(dialect="sqlite"),
+)
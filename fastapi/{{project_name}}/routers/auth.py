@@ -0,0 +1,31 @@
+"""Authentication router (both database modes)."""
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.security import OAuth2PasswordRequestForm
+
+from ..core.auth import authenticate_user, create_access_token, get_current_user
+from ..core.responses import model_response
+from ..schemas.auth import Token
+from ..schemas.user import UserResponse
+
+router = APIRouter()
+
+
+@router.post("/token", response_model=Token)
+async def issue_token(form: OAuth2PasswordRequestForm = Depends()) -> Response:
+    """Exchange a username and password for a bearer token.
+
+    The password is checked on the password hashing pool, so this handler
+    is shared by the sync and async database modes.
+    """
+    user = await authenticate_user(form.username, form.password)
+    token, lifetime = create_access_token(user.id)
+    return model_response(Token(access_token=token, expires_in=lifetime))
+
+
+@router.get("/me", response_model=UserResponse)
+async def read_current_user(
+    user: UserResponse = Depends(get_current_user),
+) -> Response:
+    """The user the bearer token belongs to."""
+    return model_response(user)
@@ -3,8 +3,13 @@
 import time
 from datetime import datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from starlette.responses import Response
 
+from ..core.cache import cache_status
+from ..core.pool import pool_status
+from ..core.probes import health_probes
+from ..core.responses import model_response
 from ..schemas.health import HealthResponse
 
 router = APIRouter()
@@ -24,14 +29,32 @@ def health_check() -> HealthResponse:
     )
 
 
-@router.get("/ready", response_model=HealthResponse)
-def readiness_check() -> HealthResponse:
-    """Readiness check endpoint for Kubernetes."""
-    return HealthResponse(
-        status="ready",
-        timestamp=datetime.utcnow(),
-        version="0.1.0",
-        uptime=time.time() - _start_time,
+@router.get(
+    "/ready",
+    response_model=HealthResponse,
+    responses={503: {"model": HealthResponse, "description": "Not ready"}},
+)
+async def readiness_check() -> Response:
+    """Readiness check endpoint for Kubernetes, with pool and cache metrics.
+
+    Answered on the event loop from the background dependency checks (see
+    ``core.probes``), without touching the database: ``503`` while the
+    database check fails, is stale or has not run yet.
+    """
+    state, dependencies = health_probes.readiness()
+    ready = state in ("ready", "degraded")
+    status_code = status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return model_response(
+        HealthResponse(
+            status=state,
+            timestamp=datetime.utcnow(),
+            version="0.1.0",
+            uptime=time.time() - _start_time,
+            pools=pool_status(),
+            caches=cache_status(),
+            dependencies=dependencies,
+        ),
+        status_code=status_code,
     )
 
 
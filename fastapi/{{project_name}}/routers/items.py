@@ -1,66 +1,315 @@
 """Item management router."""
 
-from typing import List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import Select, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 
-from ..core.database import get_db
+from ..core.cache import item_cache
+from ..core.config import settings
+from ..core.counts import (
+    IncludeTotal,
+    set_total_count,
+    total_count,
+    total_count_headers,
+)
+from ..core.database import get_db, get_read_db, on_primary, read_engine
+from ..core.etag import (
+    ETAG_HEADER,
+    check_weak_if_match,
+    entity_etag,
+    list_etag,
+    not_modified,
+    weak_etag_matches,
+)
+from ..core.export import MEDIA_TYPES, ExportFormat, stream_export
+from ..core.pagination import NEXT_CURSOR_HEADER, next_cursor, paginate
+from ..core.replicas import reads_from_primary
+from ..core.responses import model_response, validate_list
+from ..core.singleflight import flight_key, flights
+from ..core.writebehind import accepted, item_writer, queued_item, respond_async
+from ..crud import items as crud
 from ..models.item import Item
-from ..schemas.item import ItemCreate, ItemResponse, ItemUpdate
+from ..schemas.item import (
+    ItemAccepted,
+    ItemBulkDelete,
+    ItemBulkDeleteResponse,
+    ItemBulkResponse,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemFilters,
+    ItemResponse,
+    ItemSort,
+    ItemUpdate,
+)
 
 router = APIRouter()
 
+# Columns an ETag is derived from
+VERSION_COLUMNS = (Item.id, Item.created_at, Item.updated_at)
 
-@router.post("/", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
+# Column-only select for exports, so rows never become ORM objects
+EXPORT_QUERY = select(
+    Item.id,
+    Item.title,
+    Item.description,
+    Item.price,
+    Item.is_active,
+    Item.client_id,
+    Item.created_at,
+    Item.updated_at,
+).order_by(Item.id)
+
+
+@router.post(
+    "/",
+    response_model=ItemResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": ItemAccepted}},
+)
 def create_item(
-    item_data: ItemCreate, db: Session = Depends(get_db)
-) -> ItemResponse:
-    """Create a new item."""
-    db_item = Item(
-        title=item_data.title,
-        description=item_data.description,
-        price=item_data.price,
-        is_active=item_data.is_active,
-    )
+    item_data: ItemCreate,
+    prefer: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Create a new item with a single INSERT ... RETURNING.
+
+    With ``Prefer: respond-async`` and write-behind enabled, the item (which
+    then needs a ``client_id``) is queued and written in a later batch, and
+    ``202`` is returned at once; see ``core.writebehind``.
+    """
+    if respond_async(prefer):
+        row = queued_item(item_data)
+        return accepted(
+            row, item_writer.put(row, settings.write_behind_enqueue_timeout)
+        )
 
-    db.add(db_item)
+    stmt = insert(Item).values(**item_data.model_dump()).returning(Item)
+    try:
+        item = db.execute(stmt).scalar_one()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An item with this client_id exists",
+        ) from None
+    result = ItemResponse.model_validate(item)
     db.commit()
-    db.refresh(db_item)
 
-    return ItemResponse.model_validate(db_item)
+    return model_response(result, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=ItemBulkResponse)
+def bulk_create_items(
+    items_data: List[ItemCreate], db: Session = Depends(get_db)
+) -> Response:
+    """Create many items, one multi-row INSERT per chunk."""
+    return model_response(crud.bulk_create_items(db, items_data))
+
+
+@router.patch("/bulk", response_model=ItemBulkResponse)
+def bulk_update_items(
+    items_data: List[ItemBulkUpdate], db: Session = Depends(get_db)
+) -> Response:
+    """Update many items, one executemany UPDATE per chunk."""
+    result = crud.bulk_update_items(db, items_data)
+    item_cache.invalidate(*(item.id for item in result.items))
+    flights.forget("item", *(item.id for item in result.items))
+    return model_response(result)
+
+
+@router.delete("/bulk", response_model=ItemBulkDeleteResponse)
+def bulk_delete_items(
+    delete_data: ItemBulkDelete, db: Session = Depends(get_db)
+) -> Response:
+    """Delete many items, one DELETE ... WHERE id IN per chunk."""
+    result = crud.bulk_delete_items(db, delete_data.ids)
+    item_cache.invalidate(*result.deleted)
+    flights.forget("item", *result.deleted)
+    return model_response(result)
 
 
 @router.get("/", response_model=List[ItemResponse])
 def get_items(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
-) -> List[ItemResponse]:
-    """Get all items with pagination."""
-    items = db.execute(select(Item).offset(skip).limit(limit)).scalars().all()
-    return [ItemResponse.model_validate(item) for item in items]
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: ItemSort = "created_at",
+    filters: ItemFilters = Depends(),
+    include_total: IncludeTotal = "none",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Get items with filters, sorting and pagination.
+
+    Items are sorted by ``sort`` (``created_at`` or ``price``, prefixed with
+    ``-`` for descending order) and every given filter has to match; each
+    combination is served by an index. Pass the ``X-Next-Cursor`` header of
+    a page back as ``cursor``, with the same sort and filters, to fetch the
+    next page by keyset instead of offset; ``skip`` is ignored then.
+    Pages carry an ETag; ``If-None-Match`` is checked against the page's
+    IDs and versions before any full row is loaded. ``include_total``
+    returns the number of matching items in ``X-Total-Count``, counted or
+    estimated from planner statistics (see ``core.counts``).
+    """
+    key, descending = crud.sort_key(sort)
+    dialect = db.get_bind().dialect.name
+
+    def filtered(stmt: Select[Any]) -> Select[Any]:
+        return crud.filter_items(stmt, filters, dialect)
+
+    def page(stmt: Select[Any]) -> Select[Any]:
+        return paginate(filtered(stmt), key, skip, limit, cursor, descending)
+
+    # Counted first: the page's ETag covers it
+    total = total_count(db, filtered(select(Item.id)), include_total)
+    if if_none_match:
+        versions_stmt = page(select(*VERSION_COLUMNS, Item.price))
+        versions = db.execute(versions_stmt).all()
+        etag = list_etag(versions, total)
+        if weak_etag_matches(if_none_match, etag):
+            page_cursor = next_cursor(versions, key, limit)
+            headers = {NEXT_CURSOR_HEADER: page_cursor} if page_cursor else {}
+            return not_modified(etag, {**headers, **total_count_headers(total)})
+
+    items = db.execute(page(select(Item))).scalars().all()
+
+    page_cursor = next_cursor(items, key, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    response.headers[ETAG_HEADER] = list_etag(items, total)
+    set_total_count(response, total)
+
+    return model_response(validate_list(ItemResponse, items), response)
+
+
+@router.get("/search", response_model=List[ItemResponse])
+def search_items(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Full-text search over item titles and descriptions, best match first.
+
+    Pass the ``X-Next-Cursor`` header of a page back as ``cursor`` to fetch
+    the next page.
+    """
+    items, page_cursor = crud.search_items(db, q, limit, cursor)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    return model_response(items, response)
+
+
+@router.get("/export")
+def export_items(
+    request: Request,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+) -> StreamingResponse:
+    """Stream every item as NDJSON or CSV from a server-side cursor."""
+    rows = stream_export(read_engine(request), EXPORT_QUERY, export_format)
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="items.{export_format}"'},
+    )
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)) -> ItemResponse:
+def get_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
     """Get an item by ID."""
-    item = db.execute(select(Item).where(Item.id == item_id)).scalar_one_or_none()
+    # Other workers' caches keep an entry until its TTL, so a client that
+    # just wrote reads past the cache, from the primary
+    cached = None
+    if not reads_from_primary(request):
+        cached = item_cache.get(item_id, ItemResponse)
+    if cached is not None:
+        etag = entity_etag(cached)
+        if weak_etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers[ETAG_HEADER] = etag
+        return model_response(cached, response)
 
-    if not item:
+    if if_none_match:
+        version_stmt = select(*VERSION_COLUMNS).where(Item.id == item_id)
+        version = db.execute(version_stmt).one_or_none()
+        if version and weak_etag_matches(if_none_match, entity_etag(version)):
+            return not_modified(entity_etag(version))
+
+    def load() -> Optional[ItemResponse]:
+        item = db.execute(select(Item).where(Item.id == item_id)).scalar_one_or_none()
+        if item is None:
+            return None
+        result = ItemResponse.model_validate(item)
+        # A lagging replica may return a row older than the last write
+        if on_primary(db):
+            item_cache.set(item_id, result)
+        return result
+
+    # Concurrent requests for the same item share one query and validation
+    result = flights.do(flight_key(request, "item", item_id), load)
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
 
-    return ItemResponse.model_validate(item)
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
 def update_item(
-    item_id: int, item_data: ItemUpdate, db: Session = Depends(get_db)
-) -> ItemResponse:
-    """Update an item."""
-    item = db.execute(select(Item).where(Item.id == item_id)).scalar_one_or_none()
+    item_id: int,
+    item_data: ItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Update an item with a single UPDATE ... RETURNING.
+
+    With ``If-Match`` the row is first locked and the write is refused with
+    412 if it changed since the client read it.
+    """
+    update_data = item_data.model_dump(exclude_unset=True)
+    item: Optional[Item] = None
+
+    if if_match or not update_data:
+        stmt = select(Item).where(Item.id == item_id)
+        if if_match:
+            stmt = stmt.with_for_update()
+        item = db.execute(stmt).scalar_one_or_none()
+        if item:
+            check_weak_if_match(if_match, entity_etag(item))
+
+    if update_data and (item or not if_match):
+        stmt = (
+            update(Item)
+            .where(Item.id == item_id)
+            .values(**update_data)
+            .returning(Item)
+        )
+        item = db.execute(stmt).scalar_one_or_none()
 
     if not item:
         raise HTTPException(
@@ -68,27 +317,27 @@ def update_item(
             detail="Item not found",
         )
 
-    # Update fields if provided
-    update_data = item_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(item, field, value)
-
+    result = ItemResponse.model_validate(item)
     db.commit()
-    db.refresh(item)
+    item_cache.invalidate(item_id)
+    flights.forget("item", item_id)
 
-    return ItemResponse.model_validate(item)
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_item(item_id: int, db: Session = Depends(get_db)) -> None:
-    """Delete an item."""
-    item = db.execute(select(Item).where(Item.id == item_id)).scalar_one_or_none()
+    """Delete an item with a single DELETE ... RETURNING."""
+    stmt = delete(Item).where(Item.id == item_id).returning(Item.id)
+    deleted = db.execute(stmt).scalar_one_or_none()
 
-    if not item:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Item not found",
         )
 
-    db.delete(item)
     db.commit()
+    item_cache.invalidate(item_id)
+    flights.forget("item", item_id)
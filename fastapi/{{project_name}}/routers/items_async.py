@@ -0,0 +1,353 @@
+"""Item management router (async database mode)."""
+
+from typing import Any, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.cache import item_cache
+from ..core.config import settings
+from ..core.counts import (
+    IncludeTotal,
+    set_total_count,
+    total_count,
+    total_count_headers,
+)
+from ..core.database import (
+    async_read_engine,
+    get_async_db,
+    get_async_read_db,
+    on_primary,
+)
+from ..core.etag import (
+    ETAG_HEADER,
+    check_weak_if_match,
+    entity_etag,
+    list_etag,
+    not_modified,
+    weak_etag_matches,
+)
+from ..core.export import MEDIA_TYPES, ExportFormat, stream_export_async
+from ..core.pagination import NEXT_CURSOR_HEADER, next_cursor, paginate
+from ..core.replicas import reads_from_primary
+from ..core.responses import model_response, validate_list
+from ..core.singleflight import flight_key, flights
+from ..core.writebehind import accepted, item_writer, queued_item, respond_async
+from ..crud import items as crud
+from ..models.item import Item
+from ..schemas.item import (
+    ItemAccepted,
+    ItemBulkDelete,
+    ItemBulkDeleteResponse,
+    ItemBulkResponse,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemFilters,
+    ItemResponse,
+    ItemSort,
+    ItemUpdate,
+)
+
+router = APIRouter()
+
+# Columns an ETag is derived from
+VERSION_COLUMNS = (Item.id, Item.created_at, Item.updated_at)
+
+# Column-only select for exports, so rows never become ORM objects
+EXPORT_QUERY = select(
+    Item.id,
+    Item.title,
+    Item.description,
+    Item.price,
+    Item.is_active,
+    Item.client_id,
+    Item.created_at,
+    Item.updated_at,
+).order_by(Item.id)
+
+
+@router.post(
+    "/",
+    response_model=ItemResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": ItemAccepted}},
+)
+async def create_item(
+    item_data: ItemCreate,
+    prefer: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Create a new item with a single INSERT ... RETURNING.
+
+    With ``Prefer: respond-async`` and write-behind enabled, the item (which
+    then needs a ``client_id``) is queued and written in a later batch, and
+    ``202`` is returned at once; see ``core.writebehind``.
+    """
+    if respond_async(prefer):
+        row = queued_item(item_data)
+        return accepted(
+            row, await item_writer.aput(row, settings.write_behind_enqueue_timeout)
+        )
+
+    stmt = insert(Item).values(**item_data.model_dump()).returning(Item)
+    try:
+        item = (await db.execute(stmt)).scalar_one()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An item with this client_id exists",
+        ) from None
+    result = ItemResponse.model_validate(item)
+    await db.commit()
+
+    return model_response(result, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/bulk", response_model=ItemBulkResponse)
+async def bulk_create_items(
+    items_data: List[ItemCreate], db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """Create many items, one multi-row INSERT per chunk."""
+    result = await db.run_sync(crud.bulk_create_items, items_data)
+    return model_response(result)
+
+
+@router.patch("/bulk", response_model=ItemBulkResponse)
+async def bulk_update_items(
+    items_data: List[ItemBulkUpdate], db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """Update many items, one executemany UPDATE per chunk."""
+    result = await db.run_sync(crud.bulk_update_items, items_data)
+    await item_cache.ainvalidate(*(item.id for item in result.items))
+    flights.forget("item", *(item.id for item in result.items))
+    return model_response(result)
+
+
+@router.delete("/bulk", response_model=ItemBulkDeleteResponse)
+async def bulk_delete_items(
+    delete_data: ItemBulkDelete, db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """Delete many items, one DELETE ... WHERE id IN per chunk."""
+    result = await db.run_sync(crud.bulk_delete_items, delete_data.ids)
+    await item_cache.ainvalidate(*result.deleted)
+    flights.forget("item", *result.deleted)
+    return model_response(result)
+
+
+@router.get("/", response_model=List[ItemResponse])
+async def get_items(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: ItemSort = "created_at",
+    filters: ItemFilters = Depends(),
+    include_total: IncludeTotal = "none",
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    """Get items with filters, sorting and pagination.
+
+    Items are sorted by ``sort`` (``created_at`` or ``price``, prefixed with
+    ``-`` for descending order) and every given filter has to match; each
+    combination is served by an index. Pass the ``X-Next-Cursor`` header of
+    a page back as ``cursor``, with the same sort and filters, to fetch the
+    next page by keyset instead of offset; ``skip`` is ignored then.
+    Pages carry an ETag; ``If-None-Match`` is checked against the page's
+    IDs and versions before any full row is loaded. ``include_total``
+    returns the number of matching items in ``X-Total-Count``, counted or
+    estimated from planner statistics (see ``core.counts``).
+    """
+    key, descending = crud.sort_key(sort)
+    dialect = db.get_bind().dialect.name
+
+    def filtered(stmt: Select[Any]) -> Select[Any]:
+        return crud.filter_items(stmt, filters, dialect)
+
+    def page(stmt: Select[Any]) -> Select[Any]:
+        return paginate(filtered(stmt), key, skip, limit, cursor, descending)
+
+    # Counted first: the page's ETag covers it
+    total = None
+    if include_total != "none":
+        count_stmt = filtered(select(Item.id))
+        total = await db.run_sync(total_count, count_stmt, include_total)
+    if if_none_match:
+        versions_stmt = page(select(*VERSION_COLUMNS, Item.price))
+        versions = (await db.execute(versions_stmt)).all()
+        etag = list_etag(versions, total)
+        if weak_etag_matches(if_none_match, etag):
+            page_cursor = next_cursor(versions, key, limit)
+            headers = {NEXT_CURSOR_HEADER: page_cursor} if page_cursor else {}
+            return not_modified(etag, {**headers, **total_count_headers(total)})
+
+    items = (await db.execute(page(select(Item)))).scalars().all()
+
+    page_cursor = next_cursor(items, key, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    response.headers[ETAG_HEADER] = list_etag(items, total)
+    set_total_count(response, total)
+
+    return model_response(validate_list(ItemResponse, items), response)
+
+
+@router.get("/search", response_model=List[ItemResponse])
+async def search_items(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    """Full-text search over item titles and descriptions, best match first.
+
+    Pass the ``X-Next-Cursor`` header of a page back as ``cursor`` to fetch
+    the next page.
+    """
+    items, page_cursor = await db.run_sync(crud.search_items, q, limit, cursor)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    return model_response(items, response)
+
+
+@router.get("/export")
+async def export_items(
+    request: Request,
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+) -> StreamingResponse:
+    """Stream every item as NDJSON or CSV from a server-side cursor."""
+    engine = async_read_engine(request)
+    rows = stream_export_async(engine, EXPORT_QUERY, export_format)
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="items.{export_format}"'
+        },
+    )
+
+
+@router.get("/{item_id}", response_model=ItemResponse)
+async def get_item(
+    item_id: int,
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Response:
+    """Get an item by ID."""
+    # Other workers' caches keep an entry until its TTL, so a client that
+    # just wrote reads past the cache, from the primary
+    cached = None
+    if not reads_from_primary(request):
+        cached = await item_cache.aget(item_id, ItemResponse)
+    if cached is not None:
+        etag = entity_etag(cached)
+        if weak_etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers[ETAG_HEADER] = etag
+        return model_response(cached, response)
+
+    if if_none_match:
+        version_stmt = select(*VERSION_COLUMNS).where(Item.id == item_id)
+        version = (await db.execute(version_stmt)).one_or_none()
+        if version and weak_etag_matches(if_none_match, entity_etag(version)):
+            return not_modified(entity_etag(version))
+
+    async def load() -> Optional[ItemResponse]:
+        stmt = select(Item).where(Item.id == item_id)
+        item = (await db.execute(stmt)).scalar_one_or_none()
+        if item is None:
+            return None
+        result = ItemResponse.model_validate(item)
+        # A lagging replica may return a row older than the last write
+        if on_primary(db):
+            await item_cache.aset(item_id, result)
+        return result
+
+    # Concurrent requests for the same item share one query and validation
+    result = await flights.ado(flight_key(request, "item", item_id), load)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
+
+
+@router.put("/{item_id}", response_model=ItemResponse)
+async def update_item(
+    item_id: int,
+    item_data: ItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Update an item with a single UPDATE ... RETURNING.
+
+    With ``If-Match`` the row is first locked and the write is refused with
+    412 if it changed since the client read it.
+    """
+    update_data = item_data.model_dump(exclude_unset=True)
+    item: Optional[Item] = None
+
+    if if_match or not update_data:
+        stmt = select(Item).where(Item.id == item_id)
+        if if_match:
+            stmt = stmt.with_for_update()
+        item = (await db.execute(stmt)).scalar_one_or_none()
+        if item:
+            check_weak_if_match(if_match, entity_etag(item))
+
+    if update_data and (item or not if_match):
+        stmt = (
+            update(Item).where(Item.id == item_id).values(**update_data).returning(Item)
+        )
+        item = (await db.execute(stmt)).scalar_one_or_none()
+
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
+    result = ItemResponse.model_validate(item)
+    await db.commit()
+    await item_cache.ainvalidate(item_id)
+    flights.forget("item", item_id)
+
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
+
+
+@router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(item_id: int, db: AsyncSession = Depends(get_async_db)) -> None:
+    """Delete an item with a single DELETE ... RETURNING."""
+    stmt = delete(Item).where(Item.id == item_id).returning(Item.id)
+    deleted = (await db.execute(stmt)).scalar_one_or_none()
+
+    if deleted is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item not found",
+        )
+
+    await db.commit()
+    await item_cache.ainvalidate(item_id)
+    flights.forget("item", item_id)
@@ -0,0 +1,18 @@
+"""Prometheus metrics router."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..core.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Request, database, pool and cache metrics in Prometheus text format.
+
+    Rendered on the event loop, where the metrics middleware updates the
+    route metrics, so a scrape never sees them change halfway.
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,123 +1,257 @@
 """User management router."""
 
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.cache import token_cache, user_cache
+from ..core.counts import (
+    IncludeTotal,
+    set_total_count,
+    total_count,
+    total_count_headers,
+)
+from ..core.database import get_db, get_read_db, on_primary
+from ..core.etag import (
+    ETAG_HEADER,
+    check_weak_if_match,
+    entity_etag,
+    list_etag,
+    not_modified,
+    weak_etag_matches,
+)
+from ..core.pagination import NEXT_CURSOR_HEADER, next_cursor, paginate
+from ..core.replicas import reads_from_primary
+from ..core.responses import model_response, validate_list
+from ..core.security import hash_new_password, hash_updated_password
+from ..core.singleflight import flight_key, flights
+from ..crud import users as crud
 from ..models.user import User
 from ..schemas.user import UserCreate, UserResponse, UserUpdate
 
 router = APIRouter()
 
+# Sort key for list pages, backed by ix_users_created_at_id
+SORT_KEY = (User.created_at, User.id)
+
+# Columns an ETag is derived from
+VERSION_COLUMNS = (User.id, User.created_at, User.updated_at)
+
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def create_user(
-    user_data: UserCreate, db: Session = Depends(get_db)
-) -> UserResponse:
-    """Create a new user."""
-    # Check if username already exists
-    result = db.execute(select(User).where(User.username == user_data.username))
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already exists",
-        )
+    user_data: UserCreate,
+    hashed_password: str = Depends(hash_new_password),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Create a new user with a single INSERT ... RETURNING.
 
-    # Check if email already exists
-    result = db.execute(select(User).where(User.email == user_data.email))
-    if result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already exists",
+    Username and email uniqueness is enforced by the unique constraints; the
+    conflicting field is only looked up once the insert was rejected. The
+    password is hashed by a dependency on the password hashing pool.
+    """
+    values = user_data.model_dump(exclude={"password"})
+    values["hashed_password"] = hashed_password
+
+    try:
+        stmt = insert(User).values(**values).returning(User)
+        user = db.execute(stmt).scalar_one()
+        result = UserResponse.model_validate(user)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        detail = crud.duplicate_user_detail(
+            db, user_data.username, user_data.email
         )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+        ) from None
 
-    # Hash password (simplified - in production use proper password hashing)
-    hashed_password = f"hashed_{user_data.password}"
+    return model_response(result, status_code=status.HTTP_201_CREATED)
 
-    # Create user
-    db_user = User(
-        username=user_data.username,
-        email=user_data.email,
-        full_name=user_data.full_name,
-        hashed_password=hashed_password,
-        is_active=user_data.is_active,
-    )
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+@router.get("/", response_model=List[UserResponse])
+def get_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: IncludeTotal = "none",
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Get all users with pagination.
 
-    return UserResponse.model_validate(db_user)
+    Pass the ``X-Next-Cursor`` header of a page back as ``cursor`` to fetch
+    the next page by keyset instead of offset; ``skip`` is ignored then.
+    Pages carry an ETag; ``If-None-Match`` is checked against the page's
+    IDs and versions before any full row is loaded. ``include_total``
+    returns the number of users in ``X-Total-Count``, counted or estimated
+    from planner statistics (see ``core.counts``).
+    """
+    # Counted first: the page's ETag covers it
+    total = total_count(db, select(User.id), include_total)
+    if if_none_match:
+        versions_stmt = paginate(select(*VERSION_COLUMNS), SORT_KEY, skip, limit, cursor)
+        versions = db.execute(versions_stmt).all()
+        etag = list_etag(versions, total)
+        if weak_etag_matches(if_none_match, etag):
+            page_cursor = next_cursor(versions, SORT_KEY, limit)
+            headers = {NEXT_CURSOR_HEADER: page_cursor} if page_cursor else {}
+            return not_modified(etag, {**headers, **total_count_headers(total)})
 
+    stmt = paginate(select(User), SORT_KEY, skip, limit, cursor)
+    users = db.execute(stmt).scalars().all()
 
-@router.get("/", response_model=List[UserResponse])
-def get_users(
-    skip: int = 0, limit: int = 100, db: Session = Depends(get_db)
-) -> List[UserResponse]:
-    """Get all users with pagination."""
-    result = db.execute(select(User).offset(skip).limit(limit))
-    users = result.scalars().all()
-    return [UserResponse.model_validate(user) for user in users]
+    page_cursor = next_cursor(users, SORT_KEY, limit)
+    if page_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page_cursor
+    response.headers[ETAG_HEADER] = list_etag(users, total)
+    set_total_count(response, total)
+
+    return model_response(validate_list(UserResponse, users), response)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, db: Session = Depends(get_db)) -> UserResponse:
+def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+) -> Response:
     """Get a user by ID."""
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Other workers' caches keep an entry until its TTL, so a client that
+    # just wrote reads past the cache, from the primary
+    cached = None
+    if not reads_from_primary(request):
+        cached = user_cache.get(user_id, UserResponse)
+    if cached is not None:
+        etag = entity_etag(cached)
+        if weak_etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers[ETAG_HEADER] = etag
+        return model_response(cached, response)
 
-    if not user:
+    if if_none_match:
+        version_stmt = select(*VERSION_COLUMNS).where(User.id == user_id)
+        version = db.execute(version_stmt).one_or_none()
+        if version and weak_etag_matches(if_none_match, entity_etag(version)):
+            return not_modified(entity_etag(version))
+
+    def load() -> Optional[UserResponse]:
+        user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+        if user is None:
+            return None
+        result = UserResponse.model_validate(user)
+        # A lagging replica may return a row older than the last write
+        if on_primary(db):
+            user_cache.set(user_id, result)
+        return result
+
+    # Concurrent requests for the same user share one query and validation
+    result = flights.do(flight_key(request, "user", user_id), load)
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    return UserResponse.model_validate(user)
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
 def update_user(
-    user_id: int, user_data: UserUpdate, db: Session = Depends(get_db)
-) -> UserResponse:
-    """Update a user."""
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    user_id: int,
+    user_data: UserUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    hashed_password: Optional[str] = Depends(hash_updated_password),
+    db: Session = Depends(get_db),
+) -> Response:
+    """Update a user with a single UPDATE ... RETURNING.
 
+    With ``If-Match`` the row is first locked and the write is refused with
+    412 if it changed since the client read it.
+    """
     # Update fields if provided
     update_data = user_data.model_dump(exclude_unset=True)
 
     if "password" in update_data:
-        update_data["hashed_password"] = f"hashed_{update_data.pop('password')}"
+        del update_data["password"]
+        if hashed_password is not None:
+            update_data["hashed_password"] = hashed_password
+
+    user: Optional[User] = None
+
+    if if_match or not update_data:
+        stmt = select(User).where(User.id == user_id)
+        if if_match:
+            stmt = stmt.with_for_update()
+        user = db.execute(stmt).scalar_one_or_none()
+        if user:
+            check_weak_if_match(if_match, entity_etag(user))
 
-    for field, value in update_data.items():
-        setattr(user, field, value)
+    if update_data and (user or not if_match):
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(User)
+        )
+        try:
+            user = db.execute(stmt).scalar_one_or_none()
+        except IntegrityError:
+            db.rollback()
+            detail = crud.duplicate_user_detail(
+                db, update_data.get("username"), update_data.get("email"), user_id
+            )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=detail
+            ) from None
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
 
+    result = UserResponse.model_validate(user)
     db.commit()
-    db.refresh(user)
+    user_cache.invalidate(user_id)
+    flights.forget("user", user_id)
+    # Cached tokens carry the old user; a deactivated user must be refused
+    token_cache.invalidate_user(user_id)
 
-    return UserResponse.model_validate(user)
+    response.headers[ETAG_HEADER] = entity_etag(result)
+    return model_response(result, response)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_user(user_id: int, db: Session = Depends(get_db)) -> None:
-    """Delete a user."""
-    result = db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    """Delete a user with a single DELETE ... RETURNING."""
+    stmt = delete(User).where(User.id == user_id).returning(User.id)
+    deleted = db.execute(stmt).scalar_one_or_none()
 
-    if not user:
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
-    db.delete(user)
     db.commit()
+    user_cache.invalidate(user_id)
+    flights.forget("user", user_id)
+    token_cache.invalidate_user(user_id)
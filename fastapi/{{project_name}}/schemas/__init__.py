@@ -1,17 +1,38 @@
 """Pydantic schemas for request/response models."""
 
-from .item import Item, ItemCreate, ItemResponse, ItemUpdate
+from .auth import Token
+from .item import (
+    BulkError,
+    Item,
+    ItemBulkDelete,
+    ItemBulkDeleteResponse,
+    ItemBulkResponse,
+    ItemBulkUpdate,
+    ItemCreate,
+    ItemFilters,
+    ItemResponse,
+    ItemUpdate,
+)
 from .user import User, UserCreate, UserResponse, UserUpdate
-from .health import HealthResponse
+from .health import CacheStatus, HealthResponse, PoolStatus
 
 __all__ = [
+    "BulkError",
     "Item",
+    "ItemBulkDelete",
+    "ItemBulkDeleteResponse",
+    "ItemBulkResponse",
+    "ItemBulkUpdate",
     "ItemCreate",
+    "ItemFilters",
     "ItemResponse",
     "ItemUpdate",
+    "Token",
     "User",
     "UserCreate",
     "UserResponse",
     "UserUpdate",
+    "CacheStatus",
     "HealthResponse",
+    "PoolStatus",
 ]
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""Authentication schemas."""
+
+from pydantic import BaseModel, Field
+
+
+class Token(BaseModel):
+    """Access token response schema (OAuth2 password flow)."""
+
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int = Field(description="Seconds until the token expires")
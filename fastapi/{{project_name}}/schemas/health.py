@@ -1,11 +1,54 @@
 """Health check schemas."""
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from pydantic import BaseModel, Field
 
 
+class PoolStatus(BaseModel):
+    """Connection pool metrics schema."""
+
+    pool_class: str = Field(description="Pool implementation")
+    size: int = Field(description="Configured pool size")
+    checked_out: int = Field(description="Connections currently checked out")
+    overflow: int = Field(description="Connections open beyond the pool size")
+    checkouts: int = Field(description="Total checkouts since startup")
+    timeouts: int = Field(description="Checkouts that timed out waiting")
+    connections_opened: int = Field(description="Connections opened since startup")
+    wait_ms_avg: float = Field(description="Mean checkout wait over recent checkouts")
+    wait_ms_p99: float = Field(description="p99 checkout wait over recent checkouts")
+    wait_ms_max: float = Field(description="Max checkout wait over recent checkouts")
+
+
+class CacheStatus(BaseModel):
+    """Entity cache counters schema."""
+
+    enabled: bool = Field(description="Whether the cache is active")
+    backend: Optional[str] = Field(None, description="Cache backend")
+    hits: int = Field(description="Lookups served from the cache")
+    misses: int = Field(description="Lookups that went to the database")
+    hit_ratio: float = Field(description="Hits divided by lookups")
+    invalidations: int = Field(description="Entries dropped by writes")
+    evictions: int = Field(description="Entries evicted by the LRU")
+    size: Optional[int] = Field(None, description="Entries held in process")
+
+
+class DependencyStatus(BaseModel):
+    """Last background check of one dependency."""
+
+    status: str = Field(description="ok, degraded, down or stale")
+    critical: bool = Field(description="Whether the worker is not ready without it")
+    checked_at: datetime = Field(description="When the check ran")
+    age_seconds: float = Field(description="Seconds since the check ran")
+    latency_ms: float = Field(description="Time the check took")
+    detail: Optional[str] = Field(None, description="Why it is not ok")
+    headroom: Optional[float] = Field(None, description="Free share of the pool")
+    lag_seconds: Optional[float] = Field(
+        None, description="Replication lag of a replica"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response schema."""
 
@@ -13,6 +56,15 @@ class HealthResponse(BaseModel):
     timestamp: datetime = Field(description="Current timestamp")
     version: str = Field(description="Application version")
     uptime: Optional[float] = Field(None, description="Uptime in seconds")
+    pools: Optional[Dict[str, PoolStatus]] = Field(
+        None, description="Connection pool metrics by engine"
+    )
+    caches: Optional[Dict[str, CacheStatus]] = Field(
+        None, description="Cache counters by entity (and access tokens)"
+    )
+    dependencies: Optional[Dict[str, DependencyStatus]] = Field(
+        None, description="Cached dependency checks by dependency"
+    )
 
     class Config:
         json_schema_extra = {
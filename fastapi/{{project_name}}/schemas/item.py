@@ -1,10 +1,13 @@
 """Item schemas."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+# Sort orders of the item list; a leading "-" sorts descending
+ItemSort = Literal["created_at", "-created_at", "price", "-price"]
 
 
 class ItemBase(BaseModel):
@@ -14,6 +17,12 @@ class ItemBase(BaseModel):
     description: Optional[str] = None
     price: Decimal = Field(..., ge=0)
     is_active: bool = True
+    client_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=64,
+        description="Producer-assigned unique ID; required with Prefer: respond-async",
+    )
 
 
 class ItemCreate(ItemBase):
@@ -31,6 +40,40 @@ class ItemUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class ItemFilters(BaseModel):
+    """Item list filters; every filter that is set has to match."""
+
+    is_active: Optional[bool] = None
+    min_price: Optional[Decimal] = Field(None, ge=0, description="Inclusive")
+    max_price: Optional[Decimal] = Field(None, ge=0, description="Inclusive")
+    created_after: Optional[datetime] = Field(None, description="Inclusive")
+    created_before: Optional[datetime] = Field(None, description="Exclusive")
+    title_prefix: Optional[str] = Field(
+        None, min_length=1, max_length=200, description="Case-sensitive"
+    )
+    client_id: Optional[str] = Field(None, min_length=1, max_length=64)
+
+    @field_validator("created_after", "created_before")
+    @classmethod
+    def naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        # Timestamps are stored as naive UTC
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+class ItemBulkUpdate(ItemUpdate):
+    """Item bulk update schema."""
+
+    id: int
+
+
+class ItemBulkDelete(BaseModel):
+    """Item bulk delete schema."""
+
+    ids: List[int]
+
+
 class ItemResponse(ItemBase):
     """Item response schema."""
 
@@ -42,6 +85,35 @@ class ItemResponse(ItemBase):
         from_attributes = True
 
 
+class BulkError(BaseModel):
+    """Per-row error in a bulk operation."""
+
+    index: int = Field(description="Position of the row in the request")
+    id: Optional[int] = Field(None, description="Item ID, when known")
+    detail: str
+
+
+class ItemBulkResponse(BaseModel):
+    """Item bulk create/update response schema."""
+
+    items: List[ItemResponse]
+    errors: List[BulkError] = []
+
+
+class ItemAccepted(BaseModel):
+    """Item queued for write-behind creation."""
+
+    client_id: str
+    status: Literal["queued"] = "queued"
+
+
+class ItemBulkDeleteResponse(BaseModel):
+    """Item bulk delete response schema."""
+
+    deleted: List[int]
+    errors: List[BulkError] = []
+
+
 class Item(ItemResponse):
     """Item schema alias for backward compatibility."""
 
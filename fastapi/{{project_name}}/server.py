@@ -0,0 +1,150 @@
+"""Production server: gunicorn managing uvicorn workers.
+
+Run it with::
+
+    python -m {{project_name}}.server
+
+The gunicorn master imports the application once (``preload_app``) and
+forks the workers from it. An import error or bad setting fails the deploy
+before any worker starts, and the workers share the imported code
+copy-on-write. Each worker runs its own event loop with uvloop and httptools
+and runs the lifespan (schema check, shutdown) itself.
+
+* The worker count defaults to the CPUs the process may use: its CPU
+  affinity, capped by the cgroup CPU quota of the container. ``os.cpu_count``
+  reports the CPUs of the host, and a container running that many workers
+  on a 2-CPU quota is throttled.
+* A worker is recycled after ``server_max_requests`` requests plus a random
+  jitter of up to ``server_max_requests_jitter``, so slow leaks are bounded
+  and the workers do not all restart at the same moment.
+* On ``SIGTERM`` a worker stops accepting connections, closes idle
+  keep-alive connections and lets in-flight requests finish for up to
+  ``server_graceful_timeout`` seconds, then runs the lifespan shutdown.
+
+The development server (``python -m {{project_name}}.main``) is unchanged.
+"""
+
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import structlog
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from .core.config import settings
+from .core.database import forget_inherited_connections
+
+logger = structlog.get_logger()
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Time the master gives a worker after the drain to run the lifespan
+# shutdown, before it kills it
+SHUTDOWN_GRACE_SECONDS = 10
+
+
+def cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """CPUs allowed by the cgroup CPU quota, or ``None`` without a quota."""
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" without a quota
+        quota, period = (root / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: a quota of -1 means none
+        cfs_quota = int((root / "cpu" / "cpu.cfs_quota_us").read_text())
+        cfs_period = int((root / "cpu" / "cpu.cfs_period_us").read_text())
+    except (OSError, ValueError):
+        return None
+    return cfs_quota / cfs_period if cfs_quota > 0 else None
+
+
+def available_cpus(root: Path = CGROUP_ROOT) -> float:
+    """CPUs this process may run on, within its cgroup quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus: float = len(os.sched_getaffinity(0))
+    else:  # pragma: no cover - macOS and Windows
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    return min(cpus, limit) if limit is not None else cpus
+
+
+def worker_count(cpus: Optional[float] = None) -> int:
+    """Workers to run: ``server_workers``, or one per available CPU.
+
+    One event loop per CPU keeps every core busy; a fractional quota is
+    rounded up, as workers spend much of their time waiting on the database.
+    """
+    if settings.server_workers:
+        return settings.server_workers
+    return max(1, math.ceil(available_cpus() if cpus is None else cpus))
+
+
+class ProductionWorker(UvicornWorker):
+    """A uvicorn worker on uvloop and httptools that drains on shutdown."""
+
+    # The lifespan is required: a failed schema check must stop the worker
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = settings.server_graceful_timeout
+
+
+def post_fork(_server: Any, _worker: Any) -> None:
+    # Pooled connections opened in the master must not be shared with it
+    forget_inherited_connections()
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    """gunicorn settings derived from the application settings."""
+    graceful_timeout = settings.server_graceful_timeout + SHUTDOWN_GRACE_SECONDS
+    if settings.write_behind_enabled:
+        # The lifespan shutdown also flushes the write-behind queue
+        graceful_timeout += math.ceil(settings.write_behind_shutdown_timeout)
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(),
+        "worker_class": ProductionWorker,
+        "preload_app": True,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "graceful_timeout": graceful_timeout,
+        "keepalive": settings.server_keepalive,
+        "post_fork": post_fork,
+    }
+
+
+class Server(BaseApplication):
+    """gunicorn application serving ``{{project_name}}.main:app``."""
+
+    def __init__(self, options: Dict[str, Any]) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        from .main import app
+
+        return app
+
+
+def main() -> None:
+    options = gunicorn_options()
+    logger.info(
+        "Starting production server",
+        bind=options["bind"],
+        workers=options["workers"],
+        cpus=available_cpus(),
+    )
+    Server(options).run()
+
+
+if __name__ == "__main__":
+    main()